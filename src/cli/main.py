@@ -1,14 +1,25 @@
 import asyncio
 import sys
-from typing import Annotated, Optional
+from functools import cache
+from typing import TYPE_CHECKING, Annotated, Optional
 
 import typer
-from codr import Codr
-from shared.codebase.local.codebase import LocalCodebase
+
+if TYPE_CHECKING:
+    from codr import Codr
 
 cli = typer.Typer()
 
-codr = Codr(codebase=LocalCodebase(), llm="gpt-4o")
+
+@cache
+def get_codr() -> "Codr":
+    """
+    Build Codr on first use, so `codr --help` never imports funcchain, langchain or InquirerPy.
+    """
+    from codr import Codr
+    from shared.codebase.local.codebase import LocalCodebase
+
+    return Codr(codebase=LocalCodebase(), llm="gpt-4o")
 
 
 @cli.command()
@@ -25,7 +36,7 @@ def implement(
     """
     Input a task description and the llm agent will try to solve it.
     """
-    asyncio.run(codr.implement(task=task, debug_cmd=debug_cmd))
+    asyncio.run(get_codr().implement(task=task, debug_cmd=debug_cmd))
 
 
 @cli.command()
@@ -50,7 +61,7 @@ def debug(
     """
     Automatically debug with the llm agent.
     """
-    asyncio.run(codr.debug(command, goal, focus, loop))
+    asyncio.run(get_codr().debug(command, goal, focus, loop))
 
 
 @cli.command()
@@ -71,7 +82,7 @@ def commit(
     """
     Write commit messages and commit changes.
     """
-    asyncio.run(codr.commit(stage, push, no_group))
+    asyncio.run(get_codr().commit(stage, push, no_group))
 
 
 @cli.command()
@@ -85,7 +96,7 @@ def shell(
     """
     Write a shell command to fulfill the instruction.
     """
-    asyncio.run(codr.shell(instruction, auto_execute))
+    asyncio.run(get_codr().shell(instruction, auto_execute))
 
 
 @cli.command()
@@ -95,7 +106,21 @@ def ask(
     """
     Ask a question about the Codebase or relevant libraries.
     """
-    asyncio.run(codr.ask(question))
+    asyncio.run(get_codr().ask(question))
+
+
+@cli.command()
+def search(
+    query: Annotated[str, typer.Argument(help="Keywords or identifiers to search for.")],
+    top: Annotated[int, typer.Option("--top", "-k", help="Number of files to show.")] = 10,
+) -> None:
+    """
+    Search the Codebase for files matching the query, without an LLM call.
+    """
+    from shared.codebase.local.codebase import LocalCodebase
+
+    for path, score in asyncio.run(LocalCodebase().search(query, top)):
+        print(f"{score:7.2f}  {path}")
 
 
 @cli.command()
@@ -103,7 +128,27 @@ def chat(instruction: Annotated[str, typer.Argument(help="Instruction to execute
     """
     Open CLI Chat Interface
     """
-    asyncio.run(codr.chat(instruction))
+    asyncio.run(get_codr().chat(instruction))
+
+
+@cli.command()
+def daemon(
+    poll: Annotated[
+        bool,
+        typer.Option("--poll", help="Poll for changes instead of using inotify."),
+    ] = False,
+) -> None:
+    """
+    Watch the Codebase and keep its tree warm for the other commands.
+    """
+
+    from shared.codebase.local.codebase import LocalCodebase
+    from shared.codebase.local.daemon import TreeDaemon, create_watcher
+
+    async def serve() -> None:
+        await TreeDaemon(LocalCodebase()).serve(create_watcher(poll=poll))
+
+    asyncio.run(serve())
 
 
 def auto_linter() -> None:
@@ -120,14 +165,14 @@ def main() -> None:
 
     # > codr
     if len(args) == 0:
-        return asyncio.run(codr.chat())
+        return asyncio.run(get_codr().chat())
 
     # > codr <command>
     if len(args) > 0 and args[0] in cmds:
         return cli()
 
     # > codr <instruction>
-    return asyncio.run(codr.chat(" ".join(args)))
+    return asyncio.run(get_codr().chat(" ".join(args)))
 
 
 if __name__ == "__main__":
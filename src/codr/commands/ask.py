@@ -1,4 +1,3 @@
-from asyncio import gather
 from typing import Annotated
 
 from funcchain import chain, runnable
@@ -7,37 +6,27 @@ from funcchain.syntax.params import Depends
 from rich import print
 from rich.markdown import Markdown
 from shared.codebase.core import Codebase
-from shared.codebase.tree import CodebaseTree
 from shared.schemas import AskCodebase
 
 
 async def exec_ask(codebase: Codebase, llm: LLM, input: AskCodebase) -> None:
     """ask Codebase command wrapper"""
 
-    async def aload_files(paths: list[str]) -> list[str]:
-        return await gather(*[codebase.read_file(path) for path in paths])
+    async def question_tree(input: dict) -> str:
+        return await codebase.tree_view(focus=[input["question"]])
 
-    @runnable(llm=llm)
-    def get_relevant_files(
-        question: str,
-        codebase_tree: Annotated[CodebaseTree, Depends(codebase.tree.load)],
-    ) -> list[str]:
-        """
-        Which files are most relevant to answer the user question?
-        Return a list of strings with ONLY the relevant relative paths,
-        Do not include unrelated files and keep the list short.
-        If no files are relevant, respond with an empty list.
-        """
-        return chain()
+    async def question_code(input: dict) -> str:
+        # the matching functions and classes of the retrieved files instead of whole files picked by the LLM
+        return await codebase.relevant_code(input["question"])
 
     @runnable(llm=llm)
     def codebase_answer(
         question: str,
-        codebase_tree: Annotated[CodebaseTree, Depends(codebase.tree.load)],
-        relevant_files: Annotated[str, Depends(get_relevant_files | aload_files | str)],
+        codebase_tree: Annotated[str, Depends(question_tree)],
+        relevant_code: Annotated[str, Depends(question_code)],
     ) -> str:
         """
-        Answer the question based on the Codebase tree and relevant files.
+        Answer the question based on the Codebase tree and relevant code.
         """
         return chain()
 
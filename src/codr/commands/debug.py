@@ -7,7 +7,6 @@ from funcchain.schema.types import UniversalChatModel as LLM
 from funcchain.syntax.params import Depends
 from pydantic import BaseModel, Field
 from shared.codebase.core import Codebase
-from shared.codebase.tree import CodebaseTree
 from shared.schemas import Debug, Implement
 
 # better debug
@@ -75,11 +74,23 @@ async def exec_debug(codebase: Codebase, llm: LLM, input: Debug) -> None:
         problem_files: list[str] = Field(description="Files mentioned in the console output that are not healthy.")
         task_description: str = Field(description="Detailed, precise plan on how to fix the problem.")
 
+    async def console_tree(values: dict) -> str:
+        # the focus file and the files mentioned in the console output get the most detail
+        focus = [input.focus] if input.focus else []
+        relevant_files = await codebase.relevant_files(values["console_output"])
+        # the dependencies of a failing module are where the cause often is
+        related_files = await codebase.related_files([*focus, *relevant_files])
+        return await codebase.tree_view(focus=[*focus, *relevant_files, *related_files, values["console_output"]])
+
+    async def console_code(values: dict) -> str:
+        return await codebase.relevant_code(values["console_output"])
+
     @runnable(llm=llm)
     def generate_task(
         goal: str,
         console_output: str,
-        codebase_tree: Annotated[CodebaseTree, Depends(codebase.tree.load)],
+        codebase_tree: Annotated[str, Depends(console_tree)],
+        relevant_code: Annotated[str, Depends(console_code)],
     ) -> DebugTask:
         """
         Generate a task to fix the Codebase to produce a healthy console output.
@@ -1,13 +1,16 @@
 import asyncio
-from typing import Annotated
+from contextlib import suppress
+from os import getenv
+from typing import Annotated, AsyncIterator
 
 from funcchain import Depends, chain, runnable
 from funcchain.schema.types import UniversalChatModel as LLM
 from funcchain.syntax import CodeBlock
+from pydantic import ValidationError
 from rich import print
 from shared.codebase.clientio import show_yes_no_select
 from shared.codebase.core import Codebase
-from shared.codebase.tree import CodebaseTree
+from shared.codebase.patch import PatchError, apply_edits, parse_edits
 from shared.schemas import (
     CreatedFile,
     CreateDirectory,
@@ -20,15 +23,34 @@ from shared.schemas import (
     PlannedFileChanges,
     Task,
 )
+from shared.schemas.stream import StreamedItems
 
 
 async def exec_implement(codebase: Codebase, llm: LLM, input: Implement) -> None:
     """implement command wrapper"""
 
+    async def task_tree(values: dict) -> str:
+        description = values["goal"].description
+        relevant_files = await codebase.relevant_files(description)
+        # files importing or imported by the retrieved ones are likely part of the change as well
+        related_files = await codebase.related_files(relevant_files)
+        return await codebase.tree_view(focus=[*relevant_files, *related_files, description])
+
+    async def change_tree(values: dict) -> str:
+        change = values.get("change") or values["planned_file_change"]
+        related_files = await codebase.related_files([change.relative_path])
+        return await codebase.tree_view(focus=[change.relative_path, *related_files, change.description])
+
+    async def change_dependencies(values: dict) -> str:
+        path = values["planned_file_change"].relative_path
+        graph = await codebase.dependency_graph()
+        imports, imported_by = sorted(graph.dependencies(path)), sorted(graph.dependents(path))
+        return f"imports: {', '.join(imports) or '-'}\nimported by: {', '.join(imported_by) or '-'}"
+
     @runnable(llm=llm)
     def plan_file_changes(
         goal: Task,
-        codebase_tree: Annotated[CodebaseTree, Depends(codebase.tree.load)],
+        codebase_tree: Annotated[str, Depends(task_tree)],
     ) -> PlannedFileChanges:
         """
         Which of these files from tree need to be modified to solve task?
@@ -39,10 +61,25 @@ async def exec_implement(codebase: Codebase, llm: LLM, input: Implement) -> None
         """
         return chain()
 
+    @runnable(llm=llm)
+    def stream_plan(
+        goal: Task,
+        codebase_tree: Annotated[str, Depends(task_tree)],
+    ) -> str:
+        """
+        Which of these files from tree need to be modified to solve task?
+        Answer only with a JSON object like {"changes": [...]} without code fences or explanations.
+        Each file change is an object with "relative_path", "method" and "description".
+        Method is one of "create", "modify", "mkdir" and "delete".
+        Path is a relative path starting with ./, make sure path is correct and file exists in codebase.
+        Put the most important changes first.
+        """
+        return chain()
+
     @runnable(llm=llm)
     def create_file_prompt(
         change: PlannedFileChange,
-        codebase_tree: Annotated[CodebaseTree, Depends(codebase.tree.load)],
+        codebase_tree: Annotated[str, Depends(change_tree)],
     ) -> CodeBlock:
         """
         Create a new file as part of solving the task.
@@ -55,16 +92,51 @@ async def exec_implement(codebase: Codebase, llm: LLM, input: Implement) -> None
         overall_task: Task,
         planned_file_change: PlannedFileChange,
         file_content: str,
-        codebase_tree: Annotated[CodebaseTree, Depends(codebase.tree.load)],
+        codebase_tree: Annotated[str, Depends(change_tree)],
+        dependencies: Annotated[str, Depends(change_dependencies)],
     ) -> CodeBlock:
         """
         Modify this file using plan as part of solving main task.
         Do not change anything not related to goal/task, this includes formatting or comments.
         ONLY change what is described in the task.
         Rewrite entire file including changes, do not leave out any lines.
+        Keep the file compatible with the files importing it.
         """
         return chain()
 
+    @runnable(llm=llm)
+    def edit_file_prompt(
+        overall_task: Task,
+        planned_file_change: PlannedFileChange,
+        file_content: str,
+        codebase_tree: Annotated[str, Depends(change_tree)],
+        dependencies: Annotated[str, Depends(change_dependencies)],
+    ) -> str:
+        """
+        Modify this file using plan as part of solving main task.
+        Do not change anything not related to goal/task, this includes formatting or comments.
+        ONLY change what is described in the task.
+        Keep the file compatible with the files importing it.
+        Reply only with search/replace blocks, do not repeat unchanged parts of the file:
+        <<<<<<< SEARCH
+        exact lines copied from the file, enough to be unique
+        =======
+        the lines replacing them
+        >>>>>>> REPLACE
+        """
+        return chain()
+
+    async def modify_file(task: Task, change: PlannedFileChange) -> str:
+        content = change.content
+        values = {"overall_task": task, "planned_file_change": change, "file_content": content}
+        if getenv("EDIT_FORMAT", "diff").lower() == "diff":
+            # only the edited lines are generated, a rewrite costs output tokens for the whole file
+            try:
+                return apply_edits(content, parse_edits(await edit_file_prompt.ainvoke(values)))
+            except PatchError as e:
+                print(f"Edits of {change.relative_path} did not apply ({e}), rewriting the whole file")
+        return (await modify_file_prompt.ainvoke(values)).code
+
     async def solve_task(
         codebase: Codebase,
         task_description: str,
@@ -113,25 +185,77 @@ async def exec_implement(codebase: Codebase, llm: LLM, input: Implement) -> None
         codebase: Codebase,
         task: Task,
     ) -> list[FileChange]:
-        planned_changes = await plan_file_changes.ainvoke({"goal": task})
-        print("\nPlanned changes:\n", planned_changes)
-        # if count_tokens(planned_changes.files) > 32:
-        file_changes = await asyncio.gather(
-            *[
-                generate_change(
-                    codebase=codebase,
-                    task=task,
-                    change=change,
-                )
+        # generation of the first changes overlaps with planning the rest
+        generating: list[asyncio.Future[FileChange]] = []
+        try:
+            async for change in stream_planned_changes(codebase, task):
+                print("Planned change:", change)
+                generating.append(asyncio.ensure_future(generate_change(codebase=codebase, task=task, change=change)))
+        except BaseException:
+            for future in generating:
+                future.cancel()
+            raise
+        if not generating:
+            # the model did not stream usable JSON, fall back to the structured plan
+            planned_changes = await plan_file_changes.ainvoke({"goal": task})
+            await validate_plan(codebase, planned_changes)
+            print("\nPlanned changes:\n", planned_changes)
+            generating = [
+                asyncio.ensure_future(generate_change(codebase=codebase, task=task, change=change))
                 for change in planned_changes.changes
             ]
-        )
+        # if count_tokens(planned_changes.files) > 32:
+        file_changes = await asyncio.gather(*generating)
         return file_changes
         # else:
         #     file_changes = await generate_changes(task, planned_changes)
         #     log("\nFile changes:\n", file_changes)
         # return file_changes
 
+    async def stream_planned_changes(
+        codebase: Codebase,
+        task: Task,
+    ) -> AsyncIterator[PlannedFileChange]:
+        """
+        Planned changes as soon as each one is streamed, parsed and validated.
+        """
+        items = StreamedItems()
+        async for chunk in stream_plan.astream({"goal": task}):
+            for item in items.feed(chunk):
+                try:
+                    change = PlannedFileChange.model_validate(item)
+                except ValidationError as e:
+                    print(f"Skipping invalid planned change {item}: {e}")
+                    continue
+                await validate_change(codebase, change)
+                yield change
+
+    async def validate_plan(
+        codebase: Codebase,
+        planned_changes: PlannedFileChanges,
+    ) -> None:
+        for change in planned_changes.changes:
+            await validate_change(codebase, change)
+
+    async def validate_change(
+        codebase: Codebase,
+        change: PlannedFileChange,
+    ) -> None:
+        """
+        Resolve planned paths against the tree locally, so typos do not turn into new files.
+        """
+        if change.method not in ("modify", "delete"):
+            return
+        try:
+            # deleting a similarly named file is never what the plan meant
+            resolved = await codebase.fix_file_path(change.relative_path, fuzzy=change.method != "delete")
+        except FileNotFoundError:
+            # generate_change creates the file instead
+            return
+        if resolved != change.relative_path:
+            print(f"Resolved {change.relative_path} -> {resolved}")
+            change.relative_path = resolved
+
     async def generate_change(
         codebase: Codebase,
         task: Task,
@@ -146,6 +270,10 @@ async def exec_implement(codebase: Codebase, llm: LLM, input: Implement) -> None
             )
         if change.method == "mkdir":
             return CreateDirectory(relative_path=change.relative_path)
+        if change.method == "delete":
+            with suppress(FileNotFoundError):
+                change.relative_path = await codebase.fix_file_path(change.relative_path, fuzzy=False)
+            return DeletedFile(relative_path=change.relative_path)
         try:
             change.relative_path = await codebase.fix_file_path(
                 change.relative_path,
@@ -158,15 +286,7 @@ async def exec_implement(codebase: Codebase, llm: LLM, input: Implement) -> None
         if change.method == "modify":
             return ModifiedFile(
                 relative_path=change.relative_path,
-                content=(
-                    await modify_file_prompt.ainvoke(
-                        {"overall_task": task, "planned_file_change": change, "file_content": change.content}
-                    )
-                ).code,
-            )
-        if change.method == "delete":
-            return DeletedFile(
-                relative_path=change.relative_path,
+                content=await modify_file(task, change),
             )
         else:
             raise ValueError(f"Invalid method: {change.method}")
@@ -185,6 +305,7 @@ async def exec_implement(codebase: Codebase, llm: LLM, input: Implement) -> None
                 await codebase.delete_file(change.relative_path)
             else:
                 raise ValueError(f"Invalid change: {change}")
+        codebase.invalidate_tree()
 
     async def generate_changes(
         task: Task,
@@ -6,8 +6,8 @@ from typing import Any, Coroutine, Union
 
 import yaml  # type: ignore
 
+from ..walk import scan_dir
 from .file import CodebaseFile
-from .ignore import is_ignored_by_gitignore
 from .node import CodebaseNode
 
 
@@ -43,9 +43,8 @@ class CodebaseTree(CodebaseNode):
     @classmethod
     async def from_path(cls, path: Path) -> "CodebaseTree":
         tasks: list[Coroutine[Any, Any, CodebaseNode]] = [
-            CodebaseFile.from_path(file_path) if file_path.is_file() else cls.from_path(file_path)
-            for file_path in path.iterdir()
-            if not is_ignored_by_gitignore(file_path.as_posix())
+            cls.from_path(file_path) if is_dir else CodebaseFile.from_path(file_path)
+            for file_path, is_dir in scan_dir(path)
         ]
         if len(tasks) > 50:
             input(f"Found {len(tasks)} files in {path}. Press enter to continue...")
@@ -66,26 +65,20 @@ class CodebaseTree(CodebaseNode):
         return await cls.from_path(Path("."))
 
     async def refresh(self) -> "CodebaseTree":
+        listing = scan_dir(self.path)
+        listed_paths = {file_path for file_path, _ in listing}
         # gather new nodes from Codebase not in self.nodes
-        node_paths = [node.path for node in self.nodes]
+        node_paths = {node.path for node in self.nodes}
         new_node_tasks = [
-            CodebaseFile.from_path(file_path) if file_path.is_file() else CodebaseTree.from_path(file_path)
-            for file_path in self.path.iterdir()
-            if not is_ignored_by_gitignore(file_path.as_posix()) and file_path not in node_paths
+            CodebaseTree.from_path(file_path) if is_dir else CodebaseFile.from_path(file_path)
+            for file_path, is_dir in listing
+            if file_path not in node_paths
         ]
         # check node hash and update if necessary
-        node_updates = [
-            node
-            for node in self.nodes
-            if node.path
-            in [file_path for file_path in self.path.iterdir() if not is_ignored_by_gitignore(file_path.as_posix())]
-        ]
+        node_updates = [node for node in self.nodes if node.path in listed_paths]
 
         # delete nodes not in Codebase anymore
-        ignored_nodes = [
-            file_path for file_path in self.path.iterdir() if not is_ignored_by_gitignore(file_path.as_posix())
-        ]
-        deleted_nodes = [node for node in self.nodes if node.path not in ignored_nodes]
+        deleted_nodes = [node for node in self.nodes if node.path not in listed_paths]
 
         # update self.nodes
         self.nodes = [node for node in self.nodes if node not in deleted_nodes]
@@ -0,0 +1,115 @@
+import sqlite3
+import time
+from os import getenv
+from pathlib import Path
+
+
+def default_cache_dir() -> Path:
+    if cache_dir := getenv("SUMMARY_CACHE_DIR"):
+        return Path(cache_dir)
+    return Path(getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "codr"
+
+
+class SummaryCache:
+    """
+    Persistent, content addressed cache for file summaries.
+    Entries are keyed by content sha256 and summarizer version, so renames,
+    branch switches and duplicated files never need a second LLM call.
+    The least recently used entries are evicted above max_bytes.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._db: sqlite3.Connection | None = None
+        # bytes written since the last size check, summing all rows on every write is quadratic
+        self._unchecked_bytes = 0
+
+    @classmethod
+    def from_env(cls) -> "SummaryCache":
+        return cls(
+            default_cache_dir() / "summaries.sqlite",
+            max_bytes=int(getenv("SUMMARY_CACHE_MAX_MB", "64")) * 1024 * 1024,
+        )
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # a lost entry after a power cut only costs a summary, no need to sync every write
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " sha256 TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " summary TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (sha256, version))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS summaries_lru ON summaries (last_used)")
+        return self._db
+
+    def get(self, sha256: str, version: str) -> str | None:
+        row = self.db.execute(
+            "SELECT summary FROM summaries WHERE sha256 = ? AND version = ?", (sha256, version)
+        ).fetchone()
+        if row is None:
+            return None
+        self.db.execute(
+            "UPDATE summaries SET last_used = ? WHERE sha256 = ? AND version = ?", (time.time(), sha256, version)
+        )
+        return row[0]
+
+    def get_many(self, hashes: list[str], version: str) -> dict[str, str]:
+        """
+        Summaries of all cached hashes, one query per batch instead of one per file.
+        """
+        found: dict[str, str] = {}
+        for i in range(0, len(hashes), 500):
+            batch = hashes[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                self.db.execute(
+                    f"SELECT sha256, summary FROM summaries WHERE version = ? AND sha256 IN ({placeholders})",
+                    (version, *batch),
+                )
+            )
+        if found:
+            self.db.executemany(
+                "UPDATE summaries SET last_used = ? WHERE sha256 = ? AND version = ?",
+                [(time.time(), sha256, version) for sha256 in found],
+            )
+        return found
+
+    def set(self, sha256: str, version: str, summary: str) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+            (sha256, version, summary, len(summary.encode()), time.time()),
+        )
+        self._unchecked_bytes += len(summary.encode())
+        if self._unchecked_bytes > self.max_bytes // 64:
+            self.evict()
+
+    def evict(self) -> None:
+        self._unchecked_bytes = 0
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed, oldest = 0, []
+        for sha256, version, size in self.db.execute("SELECT sha256, version, size FROM summaries ORDER BY last_used"):
+            if total - freed <= self.max_bytes:
+                break
+            freed += size
+            oldest.append((sha256, version))
+        self.db.executemany("DELETE FROM summaries WHERE sha256 = ? AND version = ?", oldest)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+summary_cache = SummaryCache.from_env()
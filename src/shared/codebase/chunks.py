@@ -0,0 +1,152 @@
+import ast
+import hashlib
+from collections import Counter
+from pathlib import Path
+from typing import Collection
+
+from pydantic import BaseModel
+
+from .search import SearchIndex, read_indexed, tokenize
+from .structure import _class, _first_line, _function
+from .tree import CodebaseFile
+
+CHUNKS_PATH = ".context/chunks.sqlite"
+# classes longer than this are split into their methods
+MAX_CHUNK_LINES = 80
+# files without a structural parse are cut into windows of this many lines
+WINDOW_LINES = 60
+
+_DEFINITIONS = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+class Chunk(BaseModel):
+    """
+    Lines start to end (1-based, inclusive) of a file.
+    Definitions have their indented signature and first docstring line as signature,
+    module code between definitions and line windows have none.
+    """
+
+    path: str
+    start: int
+    end: int
+    sha256: str
+    summary: str
+    signature: str | None = None
+
+    @property
+    def id(self) -> str:
+        return f"{self.path}:{self.start}-{self.end}"
+
+
+# (start, end, declaration line, summary) with declaration line 0 for plain code
+_Span = tuple[int, int, int, str]
+
+
+def _windows(lines: list[str], first: int, last: int) -> list[_Span]:
+    spans: list[_Span] = []
+    for start in range(first, last + 1, WINDOW_LINES):
+        end = min(start + WINDOW_LINES - 1, last)
+        # blank lines between definitions are not worth a chunk
+        filled = [number for number in range(start, end + 1) if lines[number - 1].strip()]
+        if filled:
+            spans.append((filled[0], filled[-1], 0, _first_line(lines[filled[0] - 1])))
+    return spans
+
+
+def _python_spans(nodes: list[ast.stmt], lines: list[str], first: int, last: int) -> list[_Span]:
+    spans: list[_Span] = []
+    cursor = first
+    for node in nodes:
+        if not isinstance(node, _DEFINITIONS):
+            continue
+        start = min([decorator.lineno for decorator in node.decorator_list], default=node.lineno)
+        end = node.end_lineno or node.lineno
+        spans += _windows(lines, cursor, start - 1)
+        if isinstance(node, ast.ClassDef):
+            summary = _class(node)[0]
+            methods = [child for child in node.body if isinstance(child, _DEFINITIONS)]
+            if end - start >= MAX_CHUNK_LINES and methods:
+                inner = _python_spans(node.body, lines, start, end)
+                # the class line, docstring and attributes before the first method
+                header_start, header_end, _, _ = inner[0]
+                spans += [(header_start, header_end, node.lineno, summary), *inner[1:]]
+            else:
+                spans.append((start, end, node.lineno, summary))
+        else:
+            spans.append((start, end, node.lineno, _function(node)))
+        cursor = end + 1
+    return spans + _windows(lines, cursor, last)
+
+
+def chunk_file(path: str, content: str) -> list[Chunk]:
+    """
+    Chunks of a file in line order: classes, functions and the code between them for Python,
+    line windows for everything else.
+    """
+    lines = content.splitlines()
+    spans: list[_Span] | None = None
+    if path.endswith((".py", ".pyi")):
+        try:
+            spans = _python_spans(ast.parse(content).body, lines, 1, len(lines))
+        except (SyntaxError, ValueError):
+            pass
+    if spans is None:
+        spans = _windows(lines, 1, len(lines))
+    chunks: list[Chunk] = []
+    for start, end, declaration, summary in spans:
+        text = "\n".join(lines[start - 1 : end])
+        line = lines[declaration - 1]
+        chunks.append(
+            Chunk(
+                path=path,
+                start=start,
+                end=end,
+                sha256=hashlib.sha256(text.encode()).hexdigest(),
+                summary=summary,
+                signature=line[: len(line) - len(line.lstrip())] + summary if declaration else None,
+            )
+        )
+    return chunks
+
+
+def render_chunks(content: str, chunks: list[Chunk], selected: set[str]) -> str:
+    """
+    Source of the selected chunks, the other definitions shortened to their signature
+    and all other code to a single ... line.
+    """
+    lines = content.splitlines()
+    rendered: list[str] = []
+    for chunk in chunks:
+        if chunk.id in selected:
+            rendered += lines[chunk.start - 1 : chunk.end]
+        elif chunk.signature is not None:
+            rendered.append(f"{chunk.signature} ...")
+        elif not rendered or rendered[-1] != "...":
+            rendered.append("...")
+    return "\n".join(rendered)
+
+
+class ChunkIndex(SearchIndex):
+    """
+    BM25 index with one document per chunk, so large files are retrieved by their relevant parts.
+    Chunks are re-indexed together with their file and carry their own hash and summary.
+    """
+
+    def __init__(self, path: str | Path = CHUNKS_PATH) -> None:
+        super().__init__(path)
+
+    def documents(self, file: CodebaseFile) -> list[tuple[str, str, Counter[str]]]:
+        content = read_indexed(file)
+        lines = content.splitlines()
+        documents = []
+        for chunk in chunk_file(file.name, content):
+            text = "\n".join(lines[chunk.start - 1 : chunk.end])
+            terms = Counter(tokenize(f"{file.name}\n{chunk.summary}\n{text}"))
+            documents.append((chunk.id, chunk.model_dump_json(), terms))
+        return documents
+
+    def search_chunks(self, query: str, k: int = 8, paths: Collection[str] | None = None) -> list[tuple[Chunk, float]]:
+        """
+        The k best matching chunks with their scores, only of files in paths if given.
+        """
+        return [(Chunk.model_validate_json(meta), score) for _, meta, score in self.rank(query, k, paths)]
@@ -1,14 +1,37 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import AsyncIterator
+from os import getenv
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, TypeVar
 
 from ..codebase.git import CodebaseGit
 from ..schemas import Data
+from .enrich import EnrichmentQueue, background_summaries, enrich
+from .resolve import normalize_path
 from .tree import CodebaseTree
 
+if TYPE_CHECKING:
+    from .chunks import ChunkIndex
+    from .graph import DependencyGraph
+    from .search import SearchIndex
+    from .vectors import VectorIndex
+
+T = TypeVar("T")
+
+# reciprocal rank fusion constant, larger values flatten the differences between ranks
+RRF_K = 60
+
 
 class Codebase(ABC):
     """Interface for the Codebase I/O."""
 
+    _tree_snapshot: "tuple[asyncio.AbstractEventLoop, asyncio.Future[CodebaseTree]] | None" = None
+    _enrichment: "asyncio.Task[int] | None" = None
+    # derived from a tree snapshot, rebuilt once the snapshot is replaced
+    _graph_snapshot: "tuple[CodebaseTree, asyncio.Future[DependencyGraph]] | None" = None
+    _vectors_snapshot: "tuple[CodebaseTree, asyncio.Future[VectorIndex]] | None" = None
+    _search_snapshot: "tuple[CodebaseTree, asyncio.Future[SearchIndex]] | None" = None
+    _chunks_snapshot: "tuple[CodebaseTree, asyncio.Future[ChunkIndex]] | None" = None
+
     # EXTENSIONS
 
     @property
@@ -19,6 +42,157 @@ class Codebase(ABC):
     def git(self) -> CodebaseGit:
         return CodebaseGit(self)
 
+    # TREE SNAPSHOT
+
+    async def load_tree(self, *_: Any) -> CodebaseTree:
+        """
+        Tree snapshot shared by all steps of a command run.
+        Concurrent callers wait for the same load, the snapshot must not be mutated
+        and stays the same until invalidate_tree is called after changing files.
+        """
+        loop = asyncio.get_running_loop()
+        if self._tree_snapshot is None or self._tree_snapshot[0] is not loop:
+            future = asyncio.ensure_future(self.tree.load())
+            future.add_done_callback(self._forget_failed_tree)
+            self._tree_snapshot = (loop, future)
+            if background_summaries() and (self._enrichment is None or self._enrichment.done()):
+                # upgrades queued placeholders while the command runs, until the process exits
+                self._enrichment = asyncio.ensure_future(self._enrich(future))
+        return await asyncio.shield(self._tree_snapshot[1])
+
+    async def _enrich(self, tree: "asyncio.Future[CodebaseTree]") -> int:
+        await asyncio.wait([tree])
+        if tree.cancelled() or tree.exception():
+            return 0
+        return await enrich(EnrichmentQueue.open())
+
+    def prioritize_summaries(self, paths: list[str]) -> None:
+        """
+        Summarize paths next if they are still waiting for their LLM summary.
+        """
+        if background_summaries():
+            EnrichmentQueue.open().prioritize(paths)
+
+    def _forget_failed_tree(self, future: "asyncio.Future[CodebaseTree]") -> None:
+        if (future.cancelled() or future.exception()) and self._tree_snapshot and self._tree_snapshot[1] is future:
+            self._tree_snapshot = None
+
+    def invalidate_tree(self) -> None:
+        self._tree_snapshot = None
+
+    @staticmethod
+    def _derived(
+        cached: "tuple[CodebaseTree, asyncio.Future[T]] | None",
+        tree: CodebaseTree,
+        build: Callable[[CodebaseTree], Awaitable[T]],
+    ) -> "tuple[CodebaseTree, asyncio.Future[T]]":
+        """
+        Cached result of build for the tree snapshot, concurrent callers share one build.
+        """
+        if cached is None or cached[0] is not tree or (cached[1].done() and not _succeeded(cached[1])):
+            return tree, asyncio.ensure_future(build(tree))
+        return cached
+
+    async def tree_view(self, focus: list[str] | None = None, budget_tokens: int | None = None) -> str:
+        """
+        Tree of the current snapshot sized for a prompt, see CodebaseTree.view.
+        """
+        budget_tokens = budget_tokens or int(getenv("TREE_BUDGET_TOKENS", "8000"))
+        return (await self.load_tree()).view(budget_tokens, focus)
+
+    async def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """
+        BM25 keyword search over paths, summaries and contents of all files.
+        """
+        tree = await self.load_tree()
+        self._search_snapshot = self._derived(self._search_snapshot, tree, self._sync_search)
+        index = await asyncio.shield(self._search_snapshot[1])
+        return await asyncio.to_thread(index.search, query, k)
+
+    async def _sync_search(self, tree: CodebaseTree) -> "SearchIndex":
+        from .search import SearchIndex
+
+        index = SearchIndex()
+        await asyncio.to_thread(index.sync, tree)
+        return index
+
+    async def relevant_files(self, query: str, k: int = 5) -> list[str]:
+        """
+        Files for query by keyword search and embedding similarity, no LLM call needed.
+        Both rankings are merged with reciprocal rank fusion.
+        """
+        tree = await self.load_tree()
+        self._vectors_snapshot = self._derived(self._vectors_snapshot, tree, self._sync_vectors)
+        index = await asyncio.shield(self._vectors_snapshot[1])
+        rankings = [await self.search(query, k * 4), await index.search(query, k * 4)]
+        fused: dict[str, float] = {}
+        for ranking in rankings:
+            for rank, (path, _) in enumerate(ranking):
+                fused[path] = fused.get(path, 0.0) + 1 / (RRF_K + rank)
+        relevant = sorted(fused, key=lambda path: -fused[path])[:k]
+        self.prioritize_summaries(relevant)
+        return relevant
+
+    async def _sync_vectors(self, tree: CodebaseTree) -> "VectorIndex":
+        from .vectors import VectorIndex  # numpy is only needed once files are retrieved
+
+        index = VectorIndex()
+        await index.sync(tree)
+        return index
+
+    async def relevant_code(self, query: str, k: int = 8, files: int = 5) -> str:
+        """
+        The k best matching chunks for query grouped by file, the rest of each file
+        is reduced to the signatures around them so large files do not fill the prompt.
+        Chunks are ranked within the relevant_files for query, the first retrieval stage.
+        """
+        from .chunks import chunk_file, render_chunks
+
+        tree = await self.load_tree()
+        self._chunks_snapshot = self._derived(self._chunks_snapshot, tree, self._sync_chunks)
+        paths, index = await asyncio.gather(self.relevant_files(query, files), asyncio.shield(self._chunks_snapshot[1]))
+        ranked = await asyncio.to_thread(index.search_chunks, query, k, set(paths))
+        selected: dict[str, set[str]] = {}
+        for chunk, _ in ranked:
+            selected.setdefault(chunk.path, set()).add(chunk.id)
+        sections = []
+        for path, ids in selected.items():
+            content = await self.read_file(path)
+            sections.append(f"{path}\n```\n{render_chunks(content, chunk_file(path, content), ids)}\n```")
+        return "\n\n".join(sections)
+
+    async def _sync_chunks(self, tree: CodebaseTree) -> "ChunkIndex":
+        from .chunks import ChunkIndex
+
+        index = ChunkIndex()
+        await asyncio.to_thread(index.sync, tree)
+        return index
+
+    async def dependency_graph(self) -> "DependencyGraph":
+        """
+        Import graph of the current snapshot, synced once per snapshot and shared by all callers.
+        """
+        tree = await self.load_tree()
+        self._graph_snapshot = self._derived(self._graph_snapshot, tree, self._sync_graph)
+        return await asyncio.shield(self._graph_snapshot[1])
+
+    async def _sync_graph(self, tree: CodebaseTree) -> "DependencyGraph":
+        from .graph import DependencyGraph
+
+        graph = DependencyGraph()
+        try:
+            await asyncio.to_thread(graph.sync, tree)
+        finally:
+            graph.close()
+        return graph
+
+    async def related_files(self, paths: list[str], hops: int = 1) -> list[str]:
+        """
+        Files importing or imported by paths within hops, closest first.
+        """
+        distances = (await self.dependency_graph()).neighbors(paths, hops)
+        return sorted(distances, key=lambda path: (distances[path], path))
+
     # EXECUTE
 
     @abstractmethod
@@ -62,5 +236,22 @@ class Codebase(ABC):
     async def move(self, path: str, new_path: str) -> None:
         await self.shell(f"mv {path} {new_path}")
 
-    async def fix_file_path(self, path: str) -> str:
-        return path
+    async def fix_file_path(self, path: str, fuzzy: bool = True) -> str:
+        """
+        Resolve a path written by the model to an existing file of the tree.
+        Without fuzzy only the normalized path itself is accepted.
+        Raises FileNotFoundError if no file matches confidently.
+        """
+        tree = await self.load_tree()
+        resolver = tree.file_index.resolver
+        if fuzzy:
+            resolved = resolver.best(path)
+        else:
+            resolved = normalized if (normalized := normalize_path(path)) in resolver.paths else None
+        if resolved is None:
+            raise FileNotFoundError(f"File not found: {path}")
+        return resolved
+
+
+def _succeeded(future: asyncio.Future) -> bool:
+    return not future.cancelled() and future.exception() is None
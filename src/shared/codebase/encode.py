@@ -0,0 +1,27 @@
+# Prompt encoding of the tree, kept apart from the rich markup of CodebaseTree.show.
+# One line per node, nesting by one space per level, folders end with a slash
+# and every name is written exactly once:
+#
+# ./
+#  src/
+#   cli.py: typer command line entrypoint
+#   utils/ (12 files)
+#  README.md
+
+
+def folder_line(name: str, depth: int) -> str:
+    return f"{' ' * depth}{name or '.'}/\n"
+
+
+def rollup_line(name: str, files: int, depth: int) -> str:
+    """
+    Collapsed folder, only its file count is shown.
+    """
+    return f"{' ' * depth}{name or '.'}/ ({files} files)\n"
+
+
+def file_line(name: str, depth: int, summary: str | None = None) -> str:
+    if not summary:
+        return f"{' ' * depth}{name}\n"
+    # summaries must stay on one line, otherwise they would break the nesting
+    return f"{' ' * depth}{name}: {' '.join(summary.split())}\n"
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import getenv
+from pathlib import Path
+from typing import Collection, Iterable, Iterator
+
+ENRICH_PATH = ".context/enrich.sqlite"
+
+_in_background: ContextVar[bool] = ContextVar("summaries_in_background", default=False)
+
+
+def background_summaries() -> bool:
+    """
+    Load trees with structural placeholder summaries and upgrade them to LLM summaries in the background.
+    """
+    return _in_background.get() or getenv("BACKGROUND_SUMMARIES", "false").lower() == "true"
+
+
+@contextmanager
+def summaries_in_background() -> Iterator[None]:
+    """
+    Background summaries for the trees loaded and refreshed inside, whatever BACKGROUND_SUMMARIES says.
+    """
+    token = _in_background.set(True)
+    try:
+        yield
+    finally:
+        _in_background.reset(token)
+
+
+class EnrichmentQueue:
+    """
+    Persistent queue of files waiting for an LLM summary to replace their placeholder.
+    Files are taken by boost (raised by commands that need their summaries), then shallow and small first.
+    Entries stay queued until their summary is cached, so a restarted process picks up where the last one stopped.
+    """
+
+    _instances: dict[str, "EnrichmentQueue"] = {}
+
+    def __init__(self, path: str | Path = ENRICH_PATH) -> None:
+        self.path = Path(path)
+        self._db: sqlite3.Connection | None = None
+
+    @classmethod
+    def open(cls, path: str | Path = ENRICH_PATH) -> "EnrichmentQueue":
+        key = Path(path).absolute().as_posix()
+        if key not in cls._instances:
+            cls._instances[key] = cls(path)
+        return cls._instances[key]
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS queue ("
+                " path TEXT PRIMARY KEY,"
+                " sha256 TEXT NOT NULL,"
+                " boost INTEGER NOT NULL,"
+                " depth INTEGER NOT NULL,"
+                " size INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS queue_order ON queue (boost DESC, depth, size)")
+        return self._db
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+    def push(self, path: str, sha256: str, size: int) -> None:
+        with self.db:
+            self.db.execute(
+                "INSERT INTO queue VALUES (?, ?, 0, ?, ?)"
+                " ON CONFLICT (path) DO UPDATE SET sha256 = excluded.sha256, size = excluded.size",
+                (path, sha256, path.count("/"), size),
+            )
+
+    def push_missing(self, entries: Iterable[tuple[str, str, int]]) -> None:
+        """
+        Queue the (path, sha256, size) entries whose path is not queued, queued paths keep their hash and boost.
+        """
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO queue VALUES (?, ?, 0, ?, ?) ON CONFLICT (path) DO NOTHING",
+                [(path, sha256, path.count("/"), size) for path, sha256, size in entries],
+            )
+
+    def prioritize(self, paths: Iterable[str]) -> None:
+        """
+        Move paths in front of everything queued so far.
+        """
+        with self.db:
+            boost = self.db.execute("SELECT COALESCE(MAX(boost), 0) + 1 FROM queue").fetchone()[0]
+            self.db.executemany("UPDATE queue SET boost = ? WHERE path = ?", [(boost, path) for path in paths])
+
+    def take(self, skip: Collection[str] = ()) -> tuple[str, str] | None:
+        """
+        Next (path, sha256) not in skip, the entry stays queued until done is called.
+        """
+        rows = self.db.execute(
+            "SELECT path, sha256 FROM queue ORDER BY boost DESC, depth, size LIMIT ?", (len(skip) + 1,)
+        )
+        return next(((path, sha256) for path, sha256 in rows if path not in skip), None)
+
+    def done(self, path: str, sha256: str) -> None:
+        # a newer version queued in the meantime stays
+        with self.db:
+            self.db.execute("DELETE FROM queue WHERE path = ? AND sha256 = ?", (path, sha256))
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+async def enrich(queue: EnrichmentQueue, limit: int | None = None) -> int:
+    """
+    Summarize queued files with the LLM until the queue is empty or limit files are done.
+    Summaries only land in the summary cache, trees pick them up with CodebaseTree.upgrade_summaries.
+    Returns the number of files taken off the queue.
+    """
+    from .summarizer import scheduler
+    from .tree import cached_summary
+
+    taken: set[str] = set()
+    failed: set[str] = set()
+    done = 0
+
+    async def worker() -> None:
+        nonlocal done
+        while (limit is None or done + len(taken) < limit) and (item := queue.take(taken | failed)):
+            path, sha256 = item
+            taken.add(path)
+            try:
+                content = await asyncio.to_thread(Path(path).read_text)
+                # changed files are queued again with their new hash by the next refresh
+                if hashlib.sha256(content.encode()).hexdigest() == sha256:
+                    priority = (len(Path(path).parts), len(content))
+                    await cached_summary(content, sha256, priority, Path(path).suffix, fast=False)
+            except (OSError, UnicodeDecodeError):
+                pass
+            except Exception as e:
+                print(f"summary of {path} failed: {e!r}")
+                failed.add(path)
+                continue
+            finally:
+                taken.discard(path)
+            queue.done(path, sha256)
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(scheduler.concurrency)))
+    return done
@@ -189,11 +189,11 @@ async def fix_file_path(relative_path: str, codebase_tree: CodebaseTree | None =
     """Fix file name to absolute path"""
     tree = codebase_tree or await get_tree()
     file_name = relative_path.split("/")[-1]
-    files = [file for file in tree.files if file.name.split("/")[-1] == file_name]
+    files = tree.file_index.find(file_name)
 
     if len(files) > 1:
         raise Exception(f"Duplicate file name: {file_name}, {files}")
     elif len(files) < 1:
         raise FileNotFoundError(f"File not found: {file_name}, {files}")
 
-    return files[0].name
+    return files[0]
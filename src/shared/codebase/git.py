@@ -1,4 +1,10 @@
-from typing import TYPE_CHECKING
+import asyncio
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Iterable
+
+from pydantic import BaseModel
+
+from .ignore import GitIgnore, gitignore
 
 if TYPE_CHECKING:
     from .core import Codebase
@@ -10,3 +16,179 @@ class CodebaseGit:
 
     async def prepare_environment(self, task: str) -> None:
         pass
+
+
+class Changes(BaseModel):
+    """
+    Paths that may have changed, including all their parent directories.
+    None means anything may have changed. Everything below an excluded path
+    may have changed as well, nothing reports on it.
+    """
+
+    paths: set[str] | None = None
+    excluded: set[str] = set()
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[str] | None) -> "Changes":
+        return cls(paths=None if paths is None else _with_parents(paths))
+
+    def contains(self, path: str) -> bool:
+        """
+        True if path or anything below it may have changed.
+        """
+        if self.paths is None or path in self.paths or path in self.excluded:
+            return True
+        return bool(self.excluded) and any(parent.as_posix() in self.excluded for parent in PurePosixPath(path).parents)
+
+
+def _with_parents(paths: Iterable[str]) -> set[str]:
+    expanded = set()
+    for path in paths:
+        expanded.add(path.rstrip("/"))
+        expanded.update(parent.as_posix() for parent in PurePosixPath(path).parents)
+    return expanded
+
+
+class GitChanges(Changes):
+    head: str
+    dirty: list[str]
+
+
+async def _git(*args: str) -> str | None:
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        return None
+    stdout, _ = await process.communicate()
+    return stdout.decode() if process.returncode == 0 else None
+
+
+def _parse_status(status: str) -> list[str]:
+    paths, entries = [], iter(status.split("\0"))
+    for entry in entries:
+        if len(entry) > 3:
+            paths.append(entry[3:])
+            if entry[0] in "RC":
+                paths.append(next(entries, ""))
+    return [path for path in paths if path]
+
+
+async def git_changes(since_head: str | None = None, since_dirty: list[str] | None = None) -> GitChanges | None:
+    """
+    Working tree changes (relative to cwd) since the last recorded git state.
+    Includes dirty and untracked files now and then plus everything committed in between.
+    paths holds every changed path and its parent directories, it is None if git
+    cannot confirm the changes (no previous state or a .gitignore changed).
+    Paths git ignores through .git/info/exclude or core.excludesFile are still in the tree,
+    but git never reports on them, so they are excluded and always refreshed.
+    Returns None outside of git repositories.
+    """
+    if (rev := await _git("rev-parse", "--show-prefix", "HEAD")) is None:
+        return None
+    prefix, head = rev.splitlines()[:2]
+    status, ignored = await asyncio.gather(
+        _git("status", "--porcelain=v1", "-z", "--untracked-files=all"),
+        _git("ls-files", "--others", "--ignored", "--exclude-standard", "--directory", "-z"),
+    )
+    if status is None or ignored is None:
+        return None
+
+    dirty = sorted(
+        path.removeprefix(prefix) for path in _parse_status(status) if path.startswith(prefix) and path != prefix
+    )
+    changes = GitChanges(head=head, dirty=dirty)
+    if since_head is None or since_dirty is None:
+        return changes
+
+    changed = {*dirty, *since_dirty}
+    if since_head != head:
+        if (diff := await _git("diff", "--name-only", "--relative", "-z", since_head, head)) is None:
+            return changes
+        changed.update(path for path in diff.split("\0") if path)
+
+    if any(PurePosixPath(path).name == ".gitignore" for path in changed):
+        return changes
+
+    # files ignored by .gitignore are not in the tree either, the others go unreported
+    excluded = [
+        path.rstrip("/")
+        for path in ignored.split("\0")
+        if path and not gitignore.is_ignored(path.rstrip("/"), path.endswith("/"))
+    ]
+    changes.paths = _with_parents([*changed, *excluded])
+    changes.excluded = set(excluded)
+    return changes
+
+
+class GitIndex:
+    """
+    File listing of the working tree as seen by git.
+    blobs maps every file to its git blob sha, or None if it is untracked or dirty
+    and the content has to be read to know it.
+    """
+
+    def __init__(self, blobs: dict[str, str | None]) -> None:
+        self.blobs = blobs
+        self.children: dict[str, dict[str, bool]] = {".": {}}
+        for path in blobs:
+            child, is_dir = PurePosixPath(path), False
+            while True:
+                siblings = self.children.setdefault(child.parent.as_posix(), {})
+                known = child.as_posix() in siblings
+                siblings[child.as_posix()] = is_dir
+                if known or child.parent.as_posix() == ".":
+                    break
+                child, is_dir = child.parent, True
+
+    def scan(self, path: Path) -> list[tuple[Path, bool]]:
+        """
+        Same as scan_dir but from the index, without touching the filesystem.
+        """
+        children = self.children.get(path.as_posix(), {})
+        return [(Path(child), is_dir) for child, is_dir in sorted(children.items())]
+
+    def blob(self, path: str) -> str | None:
+        return self.blobs.get(path)
+
+
+def _parse_ls_files(output: str) -> dict[str, str | None]:
+    blobs: dict[str, str | None] = {}
+    removed = set()
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        tag, rest = entry[0], entry[2:]
+        if tag == "?":
+            blobs[rest] = None
+            continue
+        info, path = rest.split("\t", 1)
+        mode, blob, stage = info.split(" ")
+        if mode == "160000":
+            # submodules are not part of this codebase
+            continue
+        if tag == "R":
+            removed.add(path)
+        elif tag in "CM" or stage != "0":
+            blobs[path] = None
+        elif path not in blobs:
+            blobs[path] = blob
+    return {path: blob for path, blob in blobs.items() if path not in removed}
+
+
+async def git_index(ignore: GitIgnore | None = None) -> GitIndex | None:
+    """
+    List all tracked and untracked, not ignored files below cwd with one git invocation.
+    git applies the .gitignore rules, only codr's default patterns are checked here.
+    Returns None outside of git repositories.
+    """
+    output = await _git("ls-files", "-s", "-c", "-o", "-m", "-d", "-t", "--exclude-standard", "-z")
+    if output is None:
+        return None
+    ignore = ignore or GitIgnore(load_files=False)
+    blobs = _parse_ls_files(output)
+    return GitIndex({path: blob for path, blob in blobs.items() if not ignore.is_ignored(path, False)})
@@ -0,0 +1,209 @@
+import ast
+import json
+import re
+import sqlite3
+from collections import deque
+from pathlib import Path
+from typing import Iterable
+
+from .search import read_indexed
+from .tree import CodebaseTree
+
+GRAPH_PATH = ".context/graph.sqlite"
+PYTHON_SUFFIXES = (".py", ".pyi")
+SCRIPT_SUFFIXES = (".js", ".jsx", ".mjs", ".ts", ".tsx")
+
+# relative specifiers of import, export ... from, require() and import()
+_SCRIPT_IMPORT = re.compile(r"""(?:\bfrom|\bimport|\brequire\s*\(|\bimport\s*\()\s*["'](\.{1,2}/[^"']*)["']""")
+
+# (module, level, imported names), level counts the leading dots of relative imports
+Import = tuple[str, int, list[str]]
+
+
+def python_imports(content: str) -> list[Import]:
+    try:
+        module = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return []
+    imports: list[Import] = []
+    for node in ast.walk(module):
+        if isinstance(node, ast.Import):
+            imports += [(alias.name, 0, []) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.module or "", node.level, [alias.name for alias in node.names if alias.name != "*"]))
+    return imports
+
+
+def script_imports(content: str) -> list[Import]:
+    # bare specifiers are packages, only relative ones point into the codebase
+    return [(specifier, 0, []) for specifier in _SCRIPT_IMPORT.findall(content)]
+
+
+def parse_imports(path: str, content: str) -> list[Import] | None:
+    """
+    Static imports of a file, None for languages without an import parser.
+    """
+    if path.endswith(PYTHON_SUFFIXES):
+        return python_imports(content)
+    if path.endswith(SCRIPT_SUFFIXES):
+        return script_imports(content)
+    return None
+
+
+def _module_parts(path: str) -> list[str]:
+    parts = path.rsplit(".", 1)[0].split("/")
+    return parts[:-1] if parts[-1] == "__init__" else parts
+
+
+def _common_prefix(a: str, b: str) -> int:
+    common = 0
+    for x, y in zip(a.split("/"), b.split("/")):
+        if x != y:
+            break
+        common += 1
+    return common
+
+
+class DependencyGraph:
+    """
+    Module dependency graph of the codebase from static import parsing.
+    Parsed imports are persisted per file and only re-parsed when its sha256 changed,
+    resolving them against the current files happens in memory on every sync.
+    Queries are dictionary lookups on the resolved adjacency sets.
+    """
+
+    def __init__(self, path: str | Path = GRAPH_PATH) -> None:
+        self.path = Path(path)
+        self._db: sqlite3.Connection | None = None
+        self.imports: dict[str, set[str]] = {}
+        self.importers: dict[str, set[str]] = {}
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, sha256 TEXT NOT NULL, imports TEXT NOT NULL)"
+            )
+        return self._db
+
+    def sync(self, tree: CodebaseTree) -> int:
+        """
+        Re-parse new and changed files and resolve all edges, returns the number of parsed files.
+        """
+        known = {path: (sha256, imports) for path, sha256, imports in self.db.execute("SELECT * FROM files")}
+        parsed: dict[str, list[Import]] = {}
+        changed = []
+        for file in tree.files:
+            if file.name in known and known[file.name][0] == file.sha256:
+                parsed[file.name] = json.loads(known.pop(file.name)[1])
+            elif file.name.endswith(PYTHON_SUFFIXES + SCRIPT_SUFFIXES):
+                imports = parse_imports(file.name, read_indexed(file)) or []
+                known.pop(file.name, None)
+                parsed[file.name] = imports
+                changed.append((file.name, file.sha256, json.dumps(imports)))
+        if changed or known:
+            with self.db:
+                self.db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in known])
+                self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", changed)
+        self._resolve(parsed, tree.file_index.nodes.keys())
+        return len(changed)
+
+    def _resolve(self, parsed: dict[str, list[Import]], paths: Iterable[str]) -> None:
+        files = set(paths)
+        # every dotted suffix of a module path, so imports resolve whatever the source root is
+        modules: dict[str, list[str]] = {}
+        for path in parsed:
+            if path.endswith(PYTHON_SUFFIXES):
+                parts = _module_parts(path)
+                for i in range(len(parts)):
+                    modules.setdefault(".".join(parts[i:]), []).append(path)
+
+        def python_module(importer: str, name: str) -> str | None:
+            candidates = modules.get(name)
+            if not candidates:
+                return None
+            # the copy closest to the importer wins, like a package shadowing a vendored one
+            return min(candidates, key=lambda path: (-_common_prefix(importer, path), len(path), path))
+
+        def package_module(parts: list[str]) -> str | None:
+            base = "/".join(parts)
+            for candidate in (f"{base}.py", f"{base}.pyi", f"{base}/__init__.py"):
+                if candidate in files:
+                    return candidate
+            return None
+
+        def script_module(importer: str, specifier: str) -> str | None:
+            base = Path(importer).parent.joinpath(specifier).as_posix()
+            parts: list[str] = []
+            for part in base.split("/"):
+                if part == "..":
+                    if not parts:
+                        return None
+                    parts.pop()
+                elif part not in (".", ""):
+                    parts.append(part)
+            base = "/".join(parts)
+            candidates = [base, *(base + suffix for suffix in SCRIPT_SUFFIXES)]
+            candidates += [f"{base}/index{suffix}" for suffix in SCRIPT_SUFFIXES]
+            return next((candidate for candidate in candidates if candidate in files), None)
+
+        self.imports = {path: set() for path in parsed}
+        self.importers = {path: set() for path in parsed}
+        for importer, imports in parsed.items():
+            package = _module_parts(importer)[:-1] if not importer.endswith("__init__.py") else _module_parts(importer)
+            for module, level, names in imports:
+                targets: list[str | None] = []
+                if importer.endswith(SCRIPT_SUFFIXES):
+                    targets.append(script_module(importer, module))
+                elif level:
+                    base = package[: len(package) - level + 1] if level <= len(package) + 1 else None
+                    if base is not None:
+                        parts = [*base, *module.split(".")] if module else base
+                        # from . import name imports submodules as often as attributes
+                        submodules = [package_module([*parts, name]) for name in names]
+                        targets += submodules if any(submodules) else [package_module(parts)]
+                else:
+                    submodules = [python_module(importer, f"{module}.{name}") for name in names]
+                    targets += submodules if any(submodules) else [python_module(importer, module)]
+                for target in targets:
+                    if target and target != importer:
+                        self.imports[importer].add(target)
+                        self.importers.setdefault(target, set()).add(importer)
+
+    def dependencies(self, path: str) -> set[str]:
+        """
+        Files imported by path.
+        """
+        return self.imports.get(path, set())
+
+    def dependents(self, path: str) -> set[str]:
+        """
+        Files importing path.
+        """
+        return self.importers.get(path, set())
+
+    def neighbors(self, paths: Iterable[str], hops: int = 1) -> dict[str, int]:
+        """
+        Files within hops imports of any of paths in either direction, with their distance.
+        The paths themselves are not included.
+        """
+        distances = dict.fromkeys(paths, 0)
+        queue = deque(distances)
+        while queue:
+            path = queue.popleft()
+            if distances[path] == hops:
+                continue
+            for neighbor in self.dependencies(path) | self.dependents(path):
+                if neighbor not in distances:
+                    distances[neighbor] = distances[path] + 1
+                    queue.append(neighbor)
+        return {path: distance for path, distance in distances.items() if distance}
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,281 @@
+import os
+import re
+from pathlib import Path
+from typing import Iterable
+
+IGNORED: set[str] = {
+    ".context",
+    ".git",
+    "node_modules",
+    "__pycache__",
+    "venv",
+    ".venv",
+    ".ruff_cache",
+    "poetry.lock",
+    "package-lock.json",
+    "yarn.lock",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".vscode",
+    ".idea",
+    ".DS_Store",
+    "*.pyc",
+    "Cargo.lock",
+}
+
+_GLOB_CHARS = re.compile(r"[*?\[\\]")
+
+
+def _normalize(path: str) -> str:
+    path = path.replace(os.sep, "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return "" if path == "." else path.rstrip("/")
+
+
+def _parent(path: str) -> str:
+    return path.rsplit("/", 1)[0] if "/" in path else ""
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """
+    Translate a gitignore glob (without leading/trailing slash) into a regex.
+    """
+    i, n, out = 0, len(pattern), []
+    while i < n:
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and (end := pattern.find("]", i + 2)) != -1:
+            body = pattern[i + 1 : end]
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+class _Bucket:
+    """
+    Compiled patterns of the same kind: literal names, name suffixes and globs.
+    """
+
+    def __init__(self) -> None:
+        self.names: set[str] = set()
+        self.suffixes: dict[int, set[str]] = {}
+        self.name_globs: list[str] = []
+        self.path_globs: list[str] = []
+        self.name_regex: re.Pattern[str] | None = None
+        self.path_regex: re.Pattern[str] | None = None
+
+    def add(self, pattern: str, anchored: bool) -> None:
+        if anchored:
+            self.path_globs.append(_glob_to_regex(pattern))
+        elif not _GLOB_CHARS.search(pattern):
+            self.names.add(pattern)
+        elif pattern.startswith("*") and not _GLOB_CHARS.search(pattern[1:]):
+            self.suffixes.setdefault(len(pattern) - 1, set()).add(pattern[1:])
+        else:
+            self.name_globs.append(_glob_to_regex(pattern))
+
+    def compile(self) -> None:
+        if self.name_globs:
+            self.name_regex = re.compile("|".join(f"(?:{g})" for g in self.name_globs))
+        if self.path_globs:
+            self.path_regex = re.compile("|".join(f"(?:{g})" for g in self.path_globs))
+
+    def __bool__(self) -> bool:
+        return bool(self.names or self.suffixes or self.name_globs or self.path_globs)
+
+    def match(self, rel_path: str, name: str) -> bool:
+        if name in self.names:
+            return True
+        for length, suffixes in self.suffixes.items():
+            if len(name) >= length and name[-length:] in suffixes:
+                return True
+        if self.name_regex and self.name_regex.fullmatch(name):
+            return True
+        return bool(self.path_regex and self.path_regex.fullmatch(rel_path))
+
+
+class _Group:
+    """
+    Consecutive patterns sharing the same negation, so their order is irrelevant.
+    """
+
+    def __init__(self, negated: bool) -> None:
+        self.negated = negated
+        self.any = _Bucket()
+        self.dirs = _Bucket()
+
+    def match(self, rel_path: str, name: str, is_dir: bool) -> bool:
+        return self.any.match(rel_path, name) or (is_dir and bool(self.dirs) and self.dirs.match(rel_path, name))
+
+
+class IgnoreRules:
+    """
+    Compiled patterns of a single .gitignore file, scoped to its directory.
+    """
+
+    def __init__(self, base: str, patterns: Iterable[str]) -> None:
+        self.base = _normalize(base)
+        self.groups: list[_Group] = []
+        self.has_dir_rules = False
+        for line in patterns:
+            self._add(line)
+        for group in self.groups:
+            group.any.compile()
+            group.dirs.compile()
+
+    def _add(self, line: str) -> None:
+        line = line.rstrip("\n")
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        if not line or line.startswith("#"):
+            return
+        negated = line.startswith("!")
+        if negated or line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+        anchored = "/" in line
+        line = line.removeprefix("/")
+
+        if not self.groups or self.groups[-1].negated != negated:
+            self.groups.append(_Group(negated))
+        group = self.groups[-1]
+        (group.dirs if dir_only else group.any).add(line, anchored)
+        self.has_dir_rules |= dir_only
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """
+        Returns True/False for the last matching pattern or None if no pattern matches.
+        """
+        name = rel_path.rsplit("/", 1)[-1]
+        for group in reversed(self.groups):
+            if group.match(rel_path, name, is_dir):
+                return not group.negated
+        return None
+
+
+class GitIgnore:
+    """
+    Directory scoped gitignore matcher.
+    Every .gitignore only applies to paths below its own directory,
+    deeper files take precedence and the last matching pattern wins.
+    With load_files, .gitignore files are read lazily the first time
+    a path inside their directory is checked.
+    """
+
+    def __init__(self, root: str | Path = ".", patterns: Iterable[str] = IGNORED, load_files: bool = True) -> None:
+        self.root = Path(root)
+        self.defaults = IgnoreRules("", patterns)
+        self.load_files = load_files
+        self.rules: dict[str, IgnoreRules] = {}
+        self._loaded: set[str] = set()
+        self._chains: dict[str, list[IgnoreRules]] = {}
+        self._ignored_dirs: dict[str, bool] = {"": False}
+
+    def add_patterns(self, base: str, patterns: Iterable[str]) -> None:
+        rules = IgnoreRules(base, patterns)
+        self.rules[rules.base] = rules
+        self._loaded.add(rules.base)
+        self._chains.clear()
+        self._ignored_dirs = {"": False}
+
+    def clear(self) -> None:
+        """
+        Forget all .gitignore files, they are read again on the next check.
+        """
+        self.rules.clear()
+        self._loaded.clear()
+        self._chains.clear()
+        self._ignored_dirs = {"": False}
+
+    def discover(self, directory: str, has_file: bool) -> None:
+        """
+        Directory walkers report whether a directory has a .gitignore, which saves the lookup.
+        """
+        directory = _normalize(directory)
+        if self.load_files and directory not in self._loaded:
+            if has_file:
+                self._load(directory)
+            else:
+                self._loaded.add(directory)
+
+    def _load(self, directory: str) -> None:
+        self._loaded.add(directory)
+        try:
+            with open(self.root / directory / ".gitignore", "r") as f:
+                self.rules[directory] = IgnoreRules(directory, f.readlines())
+        except (FileNotFoundError, NotADirectoryError, UnicodeDecodeError):
+            pass
+
+    def add_file(self, gitignore_file: str | Path) -> None:
+        gitignore_file = Path(gitignore_file)
+        with open(self.root / gitignore_file, "r") as f:
+            self.add_patterns(gitignore_file.parent.as_posix(), f.readlines())
+
+    def _chain(self, directory: str) -> list[IgnoreRules]:
+        if (chain := self._chains.get(directory)) is None:
+            if self.load_files and directory not in self._loaded:
+                self._load(directory)
+            chain = [self.rules[directory]] if directory in self.rules else []
+            chain += self._chain(_parent(directory)) if directory else [self.defaults]
+            self._chains[directory] = chain
+        return chain
+
+    def _match(self, path: str, is_dir: bool | None) -> bool:
+        directory = _parent(path)
+        chain = self._chain(directory)
+        if is_dir is None:
+            is_dir = any(r.has_dir_rules for r in chain) and (self.root / path).is_dir()
+        for rules in chain:
+            rel_path = path[len(rules.base) + 1 :] if rules.base else path
+            if (ignored := rules.match(rel_path, is_dir)) is not None:
+                return ignored
+        return False
+
+    def _is_dir_ignored(self, directory: str) -> bool:
+        if (ignored := self._ignored_dirs.get(directory)) is None:
+            ignored = self._is_dir_ignored(_parent(directory)) or self._match(directory, True)
+            self._ignored_dirs[directory] = ignored
+        return ignored
+
+    def is_ignored(self, path: str | Path, is_dir: bool | None = None) -> bool:
+        """
+        Checks if a path (relative to root) or one of its parent directories is ignored.
+        """
+        path = _normalize(path if isinstance(path, str) else path.as_posix())
+        if not path:
+            return False
+        if is_dir:
+            return self._is_dir_ignored(path)
+        return self._is_dir_ignored(_parent(path)) or self._match(path, is_dir)
+
+
+gitignore = GitIgnore()
+
+
+def is_ignored_by_gitignore(file_path: str, is_dir: bool | None = None) -> bool:
+    """
+    Checks if a file is ignored by .gitignore
+    """
+    return gitignore.is_ignored(file_path, is_dir)
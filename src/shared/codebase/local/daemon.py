@@ -0,0 +1,280 @@
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import struct
+import sys
+from os import getenv
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ..enrich import EnrichmentQueue, enrich, summaries_in_background
+from ..git import Changes
+from ..ignore import gitignore, is_ignored_by_gitignore
+from ..store import TreeStore
+from ..tree import CodebaseTree
+from ..walk import walk
+
+if TYPE_CHECKING:
+    from .codebase import LocalCodebase
+
+SOCKET_PATH = ".context/daemon.sock"
+
+# inotify(7) event masks
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Portable watcher comparing the stat of all not ignored files every interval.
+    """
+
+    def __init__(self, root: str | Path = ".", interval: float = 1.0) -> None:
+        self.root = Path(root)
+        self.interval = interval
+        self._stats = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        stats = {}
+        for directory, entries in walk(self.root):
+            for entry in entries:
+                if entry.is_dir():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                stats[(directory / entry.name).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    async def wait(self) -> set[str] | None:
+        while True:
+            await asyncio.sleep(self.interval)
+            stats = await asyncio.to_thread(self._scan)
+            changed = {path for path in stats.keys() | self._stats.keys() if stats.get(path) != self._stats.get(path)}
+            self._stats = stats
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify watcher with one watch per not ignored directory.
+    """
+
+    def __init__(self, root: str | Path = ".") -> None:
+        self.root = Path(root)
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, Path] = {}
+        self._queue: asyncio.Queue[set[str] | None] = asyncio.Queue()
+        self.watch(self.root)
+        asyncio.get_running_loop().add_reader(self.fd, self._read)
+
+    def watch(self, directory: Path) -> None:
+        """
+        Watch directory and all not ignored directories below it.
+        """
+        for path, _ in walk(directory):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd >= 0:
+                self.dirs[wd] = path
+
+    def _read(self) -> None:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        changed: set[str] | None = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                changed = None
+                continue
+            if (directory := self.dirs.get(wd)) is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            is_dir = bool(mask & IN_ISDIR)
+            if is_ignored_by_gitignore(path.as_posix(), is_dir):
+                continue
+            if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                self.watch(path)
+            if changed is not None:
+                changed.add(path.as_posix())
+        if changed is None or changed:
+            self._queue.put_nowait(changed)
+
+    async def wait(self) -> set[str] | None:
+        return await self._queue.get()
+
+    def close(self) -> None:
+        asyncio.get_running_loop().remove_reader(self.fd)
+        os.close(self.fd)
+
+
+Watcher = InotifyWatcher | PollingWatcher
+
+
+def create_watcher(root: str | Path = ".", poll: bool = False) -> Watcher:
+    """
+    inotify on Linux, polling everywhere else or if inotify is not available.
+    """
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval=float(getenv("DAEMON_POLL_INTERVAL", "1.0")))
+
+
+class TreeDaemon:
+    """
+    Keeps the codebase tree in memory and up to date with the file system.
+    Bursts of events are debounced into one incremental refresh
+    and CLI commands fetch the latest snapshot over a Unix socket.
+    Changed files get placeholder summaries right away, their LLM summaries
+    come from the enrichment queue without holding up the next refresh.
+    """
+
+    def __init__(
+        self,
+        codebase: "LocalCodebase",
+        socket_path: str | Path = SOCKET_PATH,
+        debounce: float = 0.2,
+        max_delay: float = 2.0,
+        enrich_interval: float = 5.0,
+    ) -> None:
+        self.codebase = codebase
+        self.socket_path = Path(socket_path)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.enrich_interval = enrich_interval
+        self.tree: CodebaseTree | None = None
+        self.snapshot = b""
+        self.refreshes = 0
+        self._queued = asyncio.Event()
+
+    async def serve(self, watcher: Watcher | None = None) -> None:
+        if await fetch_tree(self.socket_path) is not None:
+            print(f"codr daemon is already running on {self.socket_path}")
+            return
+        with summaries_in_background():
+            self.tree = await self.codebase.tree.load(daemon=False)  # type: ignore
+        self.snapshot = self.tree.model_dump_json(exclude_none=True).encode()
+        watcher = watcher or create_watcher()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        print(f"codr daemon watching {Path.cwd()} ({type(watcher).__name__})")
+        enrichment = asyncio.create_task(self._enrich())
+        try:
+            async with server:
+                await self._watch(watcher)
+        finally:
+            enrichment.cancel()
+            watcher.close()
+            self.socket_path.unlink(missing_ok=True)
+
+    async def _enrich(self, batch: int = 32) -> None:
+        """
+        Upgrade placeholder summaries in batches and serve each batch as soon as it is done.
+        Refreshes wake it up, otherwise the queue is checked every enrich_interval.
+        """
+        queue = EnrichmentQueue.open()
+        while True:
+            try:
+                if not await enrich(queue, limit=batch):
+                    self._queued.clear()
+                    try:
+                        await asyncio.wait_for(self._queued.wait(), self.enrich_interval)
+                    except TimeoutError:
+                        pass
+                    continue
+                assert self.tree is not None
+                if self.tree.upgrade_summaries(TreeStore.open()):
+                    self.snapshot = self.tree.model_dump_json(exclude_none=True).encode()
+            except Exception as e:
+                print(f"codr daemon enrichment failed: {e!r}")
+                await asyncio.sleep(self.enrich_interval)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            if (await reader.readline()).strip() == b"tree":
+                writer.write(self.snapshot)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _watch(self, watcher: Watcher) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            changed = await watcher.wait()
+            deadline = loop.time() + self.max_delay
+            # debounce bursts like git checkout or formatter runs into one refresh
+            while loop.time() < deadline:
+                try:
+                    more = await asyncio.wait_for(watcher.wait(), self.debounce)
+                except TimeoutError:
+                    break
+                changed = None if changed is None or more is None else changed | more
+            try:
+                await self.refresh(changed)
+            except Exception as e:
+                # files can vanish while refreshing, the next events trigger another pass
+                print(f"codr daemon refresh failed: {e!r}")
+
+    async def refresh(self, changed: set[str] | None) -> None:
+        """
+        Refresh the subtrees containing changed paths, everything if changed is None.
+        Changed files are served with placeholder summaries and queued for their LLM summary.
+        """
+        assert self.tree is not None
+        if changed is None or any(Path(path).name == ".gitignore" for path in changed):
+            gitignore.clear()
+            changed = None
+        with summaries_in_background():
+            await self.tree.refresh(store=TreeStore.open(), changes=Changes.from_paths(changed))
+        self.snapshot = self.tree.model_dump_json(exclude_none=True).encode()
+        self.refreshes += 1
+        self._queued.set()
+
+
+async def fetch_tree(socket_path: str | Path = SOCKET_PATH, timeout: float = 2.0) -> dict | None:
+    """
+    Fetch the current tree snapshot from a running daemon, None if there is none.
+    """
+    if not Path(socket_path).exists():
+        return None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_unix_connection(socket_path), timeout)
+    except (OSError, TimeoutError):
+        return None
+    try:
+        writer.write(b"tree\n")
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), timeout)
+    except (OSError, TimeoutError):
+        return None
+    finally:
+        writer.close()
+    return json.loads(data) if data else None
@@ -0,0 +1,165 @@
+import difflib
+import re
+
+# a search block still matches lines this similar (difflib ratio), models misremember details
+MIN_SIMILARITY = 0.9
+# one or two lines carry too little context, return foo(a, b) must not match return foo(a, c)
+SHORT_BLOCK_LINES = 2
+MIN_SHORT_SIMILARITY = 0.97
+# a runner-up this close to the best match makes the block ambiguous
+AMBIGUITY_MARGIN = 0.05
+
+_BLOCK = re.compile(
+    r"^<{5,9} SEARCH[^\n]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} REPLACE[^\n]*$",
+    re.MULTILINE | re.DOTALL,
+)
+
+# (search, replace), an empty search appends the replacement
+Edit = tuple[str, str]
+
+
+class PatchError(ValueError):
+    """
+    An edit does not match the file.
+    """
+
+
+def _hunks(text: str) -> list[Edit]:
+    lines = text.splitlines()
+    edits: list[Edit] = []
+    search: list[str] | None = None
+    replace: list[str] = []
+
+    def flush() -> None:
+        if search is not None and (search or replace):
+            edits.append(("".join(f"{line}\n" for line in search), "".join(f"{line}\n" for line in replace)))
+
+    for i, line in enumerate(lines):
+        if line.startswith("@@"):
+            flush()
+            search, replace = [], []
+        elif line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            flush()
+            search = None
+        elif search is None or line.startswith(("+++ ", "\\")):
+            continue
+        elif line.startswith("+"):
+            replace.append(line[1:])
+        elif line.startswith("-"):
+            search.append(line[1:])
+        elif line.startswith(" ") or not line:
+            # models often drop the space in front of empty context lines
+            search.append(line[1:])
+            replace.append(line[1:])
+        else:
+            flush()
+            search = None
+    flush()
+    return edits
+
+
+def parse_edits(text: str) -> list[Edit]:
+    """
+    Search/replace blocks of a model reply, or the hunks of a unified diff if there are none.
+    """
+    return _BLOCK.findall(text) or _hunks(text)
+
+
+def _indent(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _locate(lines: list[str], search: list[str]) -> int:
+    """
+    Start of the lines matching search ignoring indentation, else of the most similar lines.
+    Raises PatchError if several places match, none is similar enough or the runner-up is almost as similar.
+    """
+    stripped = [line.strip() for line in lines]
+    wanted = [line.strip() for line in search]
+    target = "\n".join(wanted)
+    size = len(wanted)
+    starts = [start for start in range(len(lines) - size + 1) if stripped[start : start + size] == wanted]
+    if len(starts) > 1:
+        raise PatchError(f"{len(starts)} places match:\n{target}")
+    if starts:
+        return starts[0]
+    best, second, best_start = 0.0, 0.0, -1
+    for start in range(len(lines) - size + 1):
+        matcher = difflib.SequenceMatcher(None, "\n".join(stripped[start : start + size]), target, autojunk=False)
+        # only windows that can beat the runner-up are worth the full ratio
+        if (
+            matcher.real_quick_ratio() > second
+            and matcher.quick_ratio() > second
+            and (ratio := matcher.ratio()) > second
+        ):
+            if ratio > best:
+                best, second, best_start = ratio, best, start
+            else:
+                second = ratio
+    if best < (MIN_SHORT_SIMILARITY if size <= SHORT_BLOCK_LINES else MIN_SIMILARITY):
+        raise PatchError(f"no lines match:\n{target}")
+    if best - second < AMBIGUITY_MARGIN:
+        raise PatchError(f"several places almost match:\n{target}")
+    return best_start
+
+
+def _reindent(lines: list[str], found: str, written: str) -> list[str]:
+    # the model wrote the block at another indentation than the file uses
+    if found == written:
+        return lines
+    if found.startswith(written):
+        extra = found[len(written) :]
+        return [extra + line if line.strip() else line for line in lines]
+    if written.startswith(found):
+        cut = len(written) - len(found)
+        return [line[cut:] if line.startswith(written[:cut]) else line.lstrip() for line in lines]
+    return lines
+
+
+def _matches(content: str, search: str) -> list[int]:
+    """
+    Offsets where search matches whole lines of content.
+    """
+    found, start = [], content.find(search)
+    while start != -1:
+        end = start + len(search)
+        if (start == 0 or content[start - 1] == "\n") and (
+            end == len(content) or search.endswith("\n") or content[end] == "\n"
+        ):
+            found.append(start)
+        start = content.find(search, start + 1)
+    return found
+
+
+def apply_edit(content: str, search: str, replace: str) -> str:
+    if not search.strip():
+        separator = "" if not content or content.endswith("\n") else "\n"
+        return content + separator + replace
+    found = _matches(content, search)
+    if len(found) > 1:
+        raise PatchError(f"{len(found)} places match:\n{search}")
+    if found:
+        return content[: found[0]] + replace + content[found[0] + len(search) :]
+    lines = content.splitlines(keepends=True)
+    # blank lines around the block are not worth failing over
+    search_lines = search.strip("\n").splitlines(keepends=True)
+    start = _locate(lines, search_lines)
+    end = start + len(search_lines)
+    replace_lines = replace.strip("\n").splitlines(keepends=True)
+    if replace_lines and not replace_lines[-1].endswith("\n") and lines[end - 1].endswith("\n"):
+        replace_lines[-1] += "\n"
+    replace_lines = _reindent(replace_lines, _indent(lines[start]), _indent(search_lines[0]))
+    return "".join([*lines[:start], *replace_lines, *lines[end:]])
+
+
+def apply_edits(content: str, edits: list[Edit]) -> str:
+    """
+    Apply edits in order. Search text matches whole lines, verbatim, ignoring indentation or,
+    as a last resort, by the most similar lines. Raises PatchError if an edit does not apply
+    or matches in several places.
+    """
+    if not edits:
+        raise PatchError("no edits found")
+    for search, replace in edits:
+        content = apply_edit(content, search, replace)
+    return content
@@ -0,0 +1,204 @@
+import heapq
+import re
+from collections import Counter
+from typing import Any, Iterable
+
+from pydantic import BaseModel
+
+# resolved paths below this confidence are treated as not found
+MIN_CONFIDENCE = 0.8
+# a path missing leading directories is still a good match, but not a perfect one
+SUFFIX_PENALTY = 0.95
+# shorter basenames one edit apart are siblings (v1.py, v2.py, router.py, routes.py), not typos
+BASENAME_TYPO_MIN_CHARS = 12
+
+_DIGITS = re.compile(r"\d+")
+
+
+class PathMatch(BaseModel):
+    path: str
+    confidence: float
+
+    def __str__(self) -> str:
+        return f"{self.path} ({self.confidence:.0%})"
+
+
+def normalize_path(path: str) -> str:
+    """
+    Strip the usual LLM decorations: quotes, backticks, backslashes, ./ and leading slashes.
+    """
+    path = path.strip().strip("`'\"").strip().replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path.strip("/")
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """
+    Edit distance of a and b counting swapped neighbours as one edit,
+    or bound + 1 as soon as it must be larger than bound.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    before: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        if min(current) > bound:
+            return bound + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _bigrams(text: str) -> set[str]:
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def _bound(segment: str) -> int:
+    return max(1, min(3, len(segment) // 5))
+
+
+def basename_matches(written: str, existing: str) -> bool:
+    """
+    Whether a written basename can mean an existing one: the same name,
+    or one edit away for long names with the same numbers and extension.
+    """
+    if written == existing:
+        return True
+    if min(len(written), len(existing)) < BASENAME_TYPO_MIN_CHARS:
+        return False
+    if _DIGITS.findall(written) != _DIGITS.findall(existing):
+        return False
+    if written.rsplit(".", 1)[-1] != existing.rsplit(".", 1)[-1]:
+        return False
+    return edit_distance(written, existing, 1) <= 1
+
+
+class PathResolver:
+    """
+    Resolves paths written by the model to existing files.
+    Exact paths and basenames are dictionary lookups, typos are found by walking a segment trie
+    with a bounded edit distance per segment and missing leading directories by suffix matching.
+    Directories may be misspelled, basenames only barely (see basename_matches),
+    so a missing file never resolves to a sibling with a similar name.
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        self.paths: set[str] = set()
+        self.basenames: dict[str, list[str]] = {}
+        self.trie: dict[str, Any] = {}
+        for path in paths:
+            self.paths.add(path)
+            parts = path.split("/")
+            self.basenames.setdefault(parts[-1], []).append(path)
+            node = self.trie
+            for part in parts:
+                node = node.setdefault(part, {})
+            node[""] = path
+        self._bigrams: dict[str, list[str]] | None = None
+
+    def _walk(self, parts: list[str]) -> list[str]:
+        """
+        Cheapest paths with one trie level per query segment (uniform cost search).
+        Levels only expand children within the remaining edit budget, so exact segments cost nothing.
+        """
+        budget = sum(_bound(part) for part in parts) // 2 or 1
+        heap: list[tuple[int, int, int, dict]] = [(0, 0, 0, self.trie)]
+        found: list[str] = []
+        found_cost, counter = budget, 0
+        while heap:
+            cost, depth, _, node = heapq.heappop(heap)
+            if cost > found_cost:
+                break
+            if depth == len(parts):
+                if "" in node:
+                    found.append(node[""])
+                    found_cost = cost
+                continue
+            segment = parts[depth]
+            bound = min(_bound(segment), found_cost - cost)
+            for name, child in node.items():
+                if name and (distance := edit_distance(segment, name, bound)) <= bound:
+                    counter += 1
+                    heapq.heappush(heap, (cost + distance, depth + 1, counter, child))
+        return found
+
+    def _fuzzy_basenames(self, basename: str) -> list[str]:
+        if self._bigrams is None:
+            # built on the first typo without usable directories
+            self._bigrams = {}
+            for name in self.basenames:
+                for bigram in _bigrams(name):
+                    self._bigrams.setdefault(bigram, []).append(name)
+        # without directories to narrow it down only close typos are worth the scan
+        bound, bigrams = min(_bound(basename), 2), _bigrams(basename)
+        # an edit destroys at most three bigrams (swaps), so closer names share all others
+        shared = Counter(name for bigram in bigrams for name in self._bigrams.get(bigram, ()))
+        return [
+            name
+            for name, count in shared.items()
+            if count >= len(bigrams) - 3 * bound
+            and abs(len(name) - len(basename)) <= bound
+            and edit_distance(basename, name, bound) <= bound
+        ]
+
+    def _score(self, parts: list[str], path: str) -> float:
+        # align from the end, the basename is the most reliable part of a model written path
+        if path.endswith("/" + "/".join(parts)):
+            return SUFFIX_PENALTY
+        path_parts = path.split("/")
+        if not basename_matches(parts[-1], path_parts[-1]):
+            return 0.0
+        distance = chars = 0
+        for i in range(1, len(parts) + 1):
+            segment = parts[-i]
+            other = path_parts[-i] if i <= len(path_parts) else ""
+            length = max(len(segment), len(other))
+            distance += edit_distance(segment, other, length)
+            chars += length
+        score = 1 - distance / chars if chars else 0.0
+        return score * SUFFIX_PENALTY if len(path_parts) > len(parts) else score
+
+    def candidates(self, path: str) -> set[str]:
+        normalized = normalize_path(path)
+        parts = normalized.split("/")
+        found = set(self._walk(parts))
+        same_basename = self.basenames.get(parts[-1], [])
+        # prefer files ending with the whole path over files that only share the basename
+        found.update([match for match in same_basename if match.endswith("/" + normalized)] or same_basename)
+        if not found:
+            for name in self._fuzzy_basenames(parts[-1]):
+                found.update(self.basenames[name])
+        return found
+
+    def resolve(self, path: str, limit: int = 5) -> list[PathMatch]:
+        """
+        Ranked candidates for path, an exact match has confidence 1.
+        Ties at the top divide the confidence, so ambiguous paths do not resolve.
+        """
+        normalized = normalize_path(path)
+        if normalized in self.paths:
+            return [PathMatch(path=normalized, confidence=1.0)]
+        parts = normalized.split("/")
+        scored = [(self._score(parts, candidate), candidate) for candidate in self.candidates(normalized)]
+        scored = [(score, candidate) for score, candidate in scored if score]
+        if not scored:
+            return []
+        top = max(score for score, _ in scored)
+        ties = sum(score == top for score, _ in scored)
+        ranked = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], len(item[1]), item[1]))
+        return [PathMatch(path=candidate, confidence=round(score / ties, 4)) for score, candidate in ranked]
+
+    def best(self, path: str) -> str | None:
+        """
+        The resolved path if the top candidate is confident enough.
+        """
+        matches = self.resolve(path, limit=1)
+        return matches[0].path if matches and matches[0].confidence >= MIN_CONFIDENCE else None
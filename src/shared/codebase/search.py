@@ -0,0 +1,169 @@
+import hashlib
+import heapq
+import math
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Collection, Iterator
+
+from .tree import CodebaseFile, CodebaseTree
+
+SEARCH_PATH = ".context/search.sqlite"
+# files above this size are only indexed by their beginning
+MAX_INDEXED_BYTES = 512 * 1024
+# BM25 term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+
+_IDENTIFIER = re.compile(r"\w+")
+_PART = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_SUFFIXES = ("ing", "ed", "es", "s", "e")
+
+
+def _stem(word: str) -> str:
+    # just enough stemming for validate, validates and validated to meet
+    if len(word) > 4 and word.isalpha():
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix):
+                return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """
+    Lowercased, stemmed identifiers and, for camelCase and snake_case identifiers, also their parts.
+    """
+    for identifier in _IDENTIFIER.findall(text):
+        yield _stem(identifier.lower())
+        parts = _PART.findall(identifier)
+        if len(parts) > 1:
+            for part in parts:
+                yield _stem(part.lower())
+
+
+def _document_key(file: CodebaseFile) -> str:
+    return f"{file.sha256}:{hashlib.sha256(file.summary.encode()).hexdigest()[:16]}"
+
+
+def read_indexed(file: CodebaseFile) -> str:
+    try:
+        with open(file.path, "rb") as f:
+            return f.read(MAX_INDEXED_BYTES).decode(errors="ignore")
+    except OSError:
+        return ""
+
+
+class SearchIndex:
+    """
+    Persistent BM25 inverted index over file paths, summaries and contents.
+    Documents are keyed by content sha256 and summary, syncing with the tree
+    only re-indexes files whose key changed and drops files that are gone.
+    Subclasses index several documents per file by overriding documents.
+    """
+
+    schema_version = 2
+
+    def __init__(self, path: str | Path = SEARCH_PATH) -> None:
+        self.path = Path(path)
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            # assigned once complete, threads sharing the index never see a half created schema
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            if db.execute("PRAGMA user_version").fetchone()[0] != self.schema_version:
+                # an index in an older layout is cheaper to rebuild than to migrate
+                db.execute("DROP TABLE IF EXISTS docs")
+                db.execute("DROP TABLE IF EXISTS postings")
+                db.execute(f"PRAGMA user_version = {self.schema_version}")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                " id TEXT PRIMARY KEY,"
+                " path TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " length INTEGER,"
+                " meta TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS docs_path ON docs (path)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                " term TEXT NOT NULL,"
+                " id TEXT NOT NULL,"
+                " tf INTEGER NOT NULL,"
+                " PRIMARY KEY (term, id)) WITHOUT ROWID"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS postings_id ON postings (id)")
+            self._db = db
+        return self._db
+
+    def documents(self, file: CodebaseFile) -> list[tuple[str, str, Counter[str]]]:
+        """
+        Documents of file as (id, meta, terms), the whole file by default.
+        """
+        return [(file.name, "", Counter(tokenize(f"{file.name}\n{file.summary}\n{read_indexed(file)}")))]
+
+    def sync(self, tree: CodebaseTree) -> int:
+        """
+        Bring the index up to date with tree, returns the number of (re)indexed files.
+        """
+        known = dict(self.db.execute("SELECT DISTINCT path, key FROM docs"))
+        changed = [file for file in tree.files if known.pop(file.name, None) != _document_key(file)]
+        if not changed and not known:
+            return 0
+        documents = [(file, self.documents(file)) for file in changed]
+        with self.db:
+            for path in [*known, *(file.name for file in changed)]:
+                self.db.execute("DELETE FROM postings WHERE id IN (SELECT id FROM docs WHERE path = ?)", (path,))
+                self.db.execute("DELETE FROM docs WHERE path = ?", (path,))
+            self.db.executemany(
+                "INSERT INTO docs VALUES (?, ?, ?, ?, ?)",
+                [
+                    (id, file.name, _document_key(file), sum(terms.values()), meta)
+                    for file, docs in documents
+                    for id, meta, terms in docs
+                ],
+            )
+            self.db.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?)",
+                [(term, id, tf) for _, docs in documents for id, _, terms in docs for term, tf in terms.items()],
+            )
+        return len(changed)
+
+    def rank(self, query: str, k: int = 10, paths: Collection[str] | None = None) -> list[tuple[str, str, float]]:
+        """
+        The k best BM25 matching documents as (id, meta, score), only of files in paths if given.
+        """
+        documents, average_length = self.db.execute("SELECT COUNT(*), AVG(length) FROM docs").fetchone()
+        if not documents:
+            return []
+        scores: dict[str, float] = {}
+        metas: dict[str, str] = {}
+        for term in set(tokenize(query)):
+            postings = self.db.execute(
+                "SELECT id, path, tf, length, meta FROM postings JOIN docs USING (id) WHERE term = ?", (term,)
+            ).fetchall()
+            idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+            for id, path, tf, length, meta in postings:
+                if paths is not None and path not in paths:
+                    continue
+                norm = K1 * (1 - B + B * length / average_length)
+                scores[id] = scores.get(id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+                metas[id] = meta
+        ranked = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(id, metas[id], score) for id, score in ranked]
+
+    def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """
+        The k best BM25 matches for query with their scores.
+        """
+        return [(id, score) for id, _, score in self.rank(query, k)]
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,113 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+import yaml  # type: ignore
+
+if TYPE_CHECKING:
+    from .tree import CodebaseNode
+
+STORE_PATH = ".context/tree.sqlite"
+
+
+def _parent(name: str) -> str:
+    return Path(name).parent.as_posix() if name != "." else ""
+
+
+class TreeStore:
+    """
+    Embedded SQLite store for the codebase tree with one row per node path.
+    Changes are written as incremental upserts and deletes inside a transaction,
+    WAL mode keeps concurrent readers safe while a refresh writes.
+    """
+
+    _instances: dict[str, "TreeStore"] = {}
+
+    def __init__(self, path: str | Path = STORE_PATH) -> None:
+        self.path = Path(path)
+        self._db: sqlite3.Connection | None = None
+
+    @classmethod
+    def open(cls, path: str | Path = STORE_PATH) -> "TreeStore":
+        key = Path(path).absolute().as_posix()
+        if key not in cls._instances:
+            cls._instances[key] = cls(path)
+        return cls._instances[key]
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY, parent TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (parent)")
+        return self._db
+
+    def is_empty(self) -> bool:
+        return self.db.execute("SELECT 1 FROM nodes LIMIT 1").fetchone() is None
+
+    def load(self) -> dict | None:
+        """
+        Load all rows as the nested dict format of CodebaseTree.from_dict.
+        """
+        children: dict[str, list[dict]] = {}
+        root = None
+        for path, parent, data in self.db.execute("SELECT path, parent, data FROM nodes ORDER BY path"):
+            node = json.loads(data)
+            if "summary" not in node:
+                node["nodes"] = children.setdefault(path, [])
+            if path == ".":
+                root = node
+            else:
+                children.setdefault(parent, []).append(node)
+        return root
+
+    def write(self, upserts: Iterable["CodebaseNode"] = (), deletes: Iterable[str] = ()) -> None:
+        """
+        Upsert nodes (without their children) and delete paths including everything below them.
+        """
+        rows = [
+            (node.name, _parent(node.name), json.dumps(node.model_dump(exclude={"nodes"}, exclude_none=True)))
+            for node in upserts
+        ]
+        with self.db:
+            for path in deletes:
+                # "/" + 1 == "0", so the range covers exactly the paths below
+                self.db.execute(
+                    "DELETE FROM nodes WHERE path = ? OR (path >= ? AND path < ?)",
+                    (path, path + "/", path + "0"),
+                )
+            self.db.executemany("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)", rows)
+
+    def clear(self) -> None:
+        with self.db:
+            self.db.execute("DELETE FROM nodes")
+
+    def import_yaml(self, yaml_path: str | Path) -> bool:
+        """
+        One way import of a legacy tree.yaml, returns False if there was nothing to import.
+        """
+        with open(yaml_path, "r") as f:
+            data = yaml.safe_load(f)
+        if not data:
+            return False
+
+        rows: list[tuple[str, str, str]] = []
+        stack = [data]
+        while stack:
+            node = dict(stack.pop())
+            stack.extend(node.pop("nodes", None) or [])
+            rows.append((node["name"], _parent(node["name"]), json.dumps(node)))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)", rows)
+        return True
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,103 @@
+import ast
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from os import getenv
+
+# smaller files are parsed in the event loop, shipping them to a worker costs more than parsing
+POOL_MIN_BYTES = 4096
+MAX_DOC_CHARS = 120
+PARSED_SUFFIXES = (".py", ".pyi")
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _first_line(doc: str | None) -> str:
+    line = doc.strip().split("\n", 1)[0].strip() if doc else ""
+    return line if len(line) <= MAX_DOC_CHARS else line[: MAX_DOC_CHARS - 3] + "..."
+
+
+def _function(node: ast.FunctionDef | ast.AsyncFunctionDef, prefix: str = "") -> str:
+    keyword = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    signature = f"{keyword} {prefix}{node.name}({ast.unparse(node.args)}){returns}"
+    return f"{signature}: {doc}" if (doc := _first_line(ast.get_docstring(node))) else signature
+
+
+def _class(node: ast.ClassDef) -> list[str]:
+    bases = ", ".join(ast.unparse(base) for base in [*node.bases, *node.keywords])
+    signature = f"class {node.name}({bases})" if bases else f"class {node.name}"
+    definitions = [f"{signature}: {doc}" if (doc := _first_line(ast.get_docstring(node))) else signature]
+    for child in node.body:
+        # private helpers and dunders besides __init__ are implementation details
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and (
+            not child.name.startswith("_") or child.name == "__init__"
+        ):
+            definitions.append(_function(child, f"{node.name}."))
+    return definitions
+
+
+def python_structure(content: str) -> tuple[str, list[str]] | None:
+    """
+    Module docstring and definitions (classes, methods and functions with signatures
+    and the first docstring line), None if the content is not valid Python.
+    """
+    try:
+        module = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    definitions: list[str] = []
+    for node in module.body:
+        if isinstance(node, ast.ClassDef):
+            definitions += _class(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            definitions.append(_function(node))
+    return _first_line(ast.get_docstring(module)), definitions
+
+
+def structure(content: str, suffix: str) -> tuple[str, list[str]] | None:
+    """
+    Local purpose (may be empty) and definitions for parseable languages, None otherwise.
+    """
+    if suffix in PARSED_SUFFIXES:
+        return python_structure(content)
+    return None
+
+
+def fast_purpose(content: str, definitions: list[str], doc: str = "") -> str:
+    """
+    Purpose without an LLM: the module docstring, the defined names or the first line of the file.
+    """
+    if doc:
+        return doc
+    if definitions:
+        signatures = (definition.split("(", 1)[0].split(":", 1)[0] for definition in definitions)
+        # methods are named Class.method
+        names = [name for signature in signatures if "." not in (name := signature.split(" ")[-1])]
+        more = f" and {len(names) - 3} more" if len(names) > 3 else ""
+        return f"Defines {', '.join(names[:3])}{more}."
+    return _first_line(next((line for line in content.splitlines() if line.strip()), ""))
+
+
+def fast_summaries() -> bool:
+    return getenv("FAST_SUMMARIES", "false").lower() == "true"
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # forkserver workers do not inherit the threads of the event loop process
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+        _pool = ProcessPoolExecutor(mp_context=context)
+    return _pool
+
+
+async def parse_structure(content: str, suffix: str) -> tuple[str, list[str]] | None:
+    """
+    structure in a process pool, so parsing many files uses all cores.
+    """
+    # languages without a parser return None right away, no worker round trip needed
+    if len(content) < POOL_MIN_BYTES or suffix not in PARSED_SUFFIXES:
+        return structure(content, suffix)
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), structure, content, suffix)
@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import random
+import sys
+import time
+from collections import deque
+from os import getenv
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# prompt instructions and the structured answer on top of the file content
+REQUEST_OVERHEAD_TOKENS = 300
+# request timeout, conflict, rate limit and server errors can succeed on the next attempt
+RETRY_STATUS_CODES = (408, 409, 429)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate (~4 chars per token), good enough for rate budgeting.
+    """
+    return len(text) // 4 + REQUEST_OVERHEAD_TOKENS
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Rate limits, timeouts and connection errors, which are worth retrying.
+    Validation or authentication errors fail the same way on every attempt.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRY_STATUS_CODES or status >= 500
+    try:
+        from openai import APIConnectionError  # timeouts are connection errors too
+    except ImportError:
+        return False
+    return isinstance(error, APIConnectionError)
+
+
+class SummaryScheduler:
+    """
+    Bounded scheduler for summarization LLM calls.
+    Limits concurrent requests and tokens per minute, retries transient failures
+    with exponential backoff and starts waiting requests by priority.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        tokens_per_minute: int = 200_000,
+        retries: int = 3,
+        backoff: float = 1.0,
+        interactive: bool | None = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.retries = retries
+        self.backoff = backoff
+        self.interactive = sys.stdin.isatty() if interactive is None else interactive
+        self._running = 0
+        self._waiting: list[tuple[tuple, int, asyncio.Future[None]]] = []
+        self._counter = 0
+        self._window: deque[tuple[float, int]] = deque()
+        self._window_tokens = 0
+
+    @classmethod
+    def from_env(cls) -> "SummaryScheduler":
+        return cls(
+            concurrency=int(getenv("SUMMARY_CONCURRENCY", "8")),
+            tokens_per_minute=int(getenv("SUMMARY_TOKENS_PER_MINUTE", "200000")),
+            retries=int(getenv("SUMMARY_RETRIES", "3")),
+            interactive=False if getenv("NON_INTERACTIVE", "false").lower() == "true" else None,
+        )
+
+    async def _acquire(self, priority: tuple) -> None:
+        if self._running < self.concurrency and not self._waiting:
+            self._running += 1
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._counter += 1
+        heapq.heappush(self._waiting, (priority, self._counter, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        while self._waiting:
+            _, _, future = heapq.heappop(self._waiting)
+            if not future.done():
+                # hand the slot over without decrementing _running
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    async def _reserve_tokens(self, tokens: int) -> None:
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] >= 60:
+                self._window_tokens -= self._window.popleft()[1]
+            if self._window_tokens + tokens <= self.tokens_per_minute:
+                self._window.append((now, tokens))
+                self._window_tokens += tokens
+                return
+            await asyncio.sleep(60 - (now - self._window[0][0]))
+
+    async def run(
+        self,
+        fn: Callable[..., Awaitable[T]],
+        *args: Any,
+        priority: tuple = (),
+        tokens: int = REQUEST_OVERHEAD_TOKENS,
+    ) -> T:
+        """
+        Run fn(*args) once a slot and enough token budget are free.
+        Lower priority tuples are started first.
+        """
+        await self._acquire(priority)
+        try:
+            attempt = 0
+            while True:
+                await self._reserve_tokens(tokens)
+                try:
+                    return await fn(*args)
+                except Exception as e:
+                    if attempt >= self.retries or not is_transient(e):
+                        raise
+                    await asyncio.sleep(self.backoff * 2**attempt * (1 + random.random()))
+                    attempt += 1
+        finally:
+            self._release()
+
+    def confirm(self, message: str) -> None:
+        """
+        Ask the user to continue, non-interactive runs just log the message.
+        """
+        if self.interactive:
+            input(f"{message} Press enter to continue...")
+        else:
+            print(message)
+
+
+scheduler = SummaryScheduler.from_env()
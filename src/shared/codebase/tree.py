@@ -1,33 +1,23 @@
 import asyncio
-import fnmatch
 import hashlib
 import os
-from pathlib import Path
-from typing import Any, Union
+from bisect import bisect_left
+from os import getenv
+from pathlib import Path, PurePosixPath
+from typing import Any, Coroutine, Iterator, Union
 
 import yaml  # type: ignore
-from funcchain import achain
-from pydantic import BaseModel, Field
-
-IGNORED: set[str] = {
-    ".context",
-    ".git",
-    "node_modules",
-    "__pycache__",
-    "venv",
-    ".venv",
-    ".ruff_cache",
-    "poetry.lock",
-    "package-lock.json",
-    "yarn.lock",
-    ".mypy_cache",
-    ".pytest_cache",
-    ".vscode",
-    ".idea",
-    ".DS_Store",
-    "*.pyc",
-    "Cargo.lock",
-}
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .cache import summary_cache
+from .encode import file_line, folder_line
+from .enrich import EnrichmentQueue, background_summaries
+from .git import Changes, GitChanges, GitIndex, git_changes
+from .resolve import PathResolver
+from .store import STORE_PATH, TreeStore
+from .structure import fast_purpose, fast_summaries, parse_structure
+from .summarizer import estimate_tokens, scheduler
+from .walk import scan_dir
 
 
 class FileSummary(BaseModel):
@@ -41,40 +31,109 @@ async def summarize_file(
     """
     Create an abstract representation of the file content.
     """
+    from funcchain import achain  # heavy, only needed once a file gets summarized
+
+    return await achain()
+
+
+async def summarize_purpose(
+    file_content: str,
+) -> str:
+    """
+    One sentence summary of the purpose of the file.
+    """
+    from funcchain import achain
+
     return await achain()
 
 
-def load_gitignore() -> None:
+# bump when the summarize_file prompt or FileSummary schema changes
+SUMMARIZER_VERSION = "2"
+
+_pending_summaries: dict[tuple[str, bool], asyncio.Task[str]] = {}
+
+
+async def _summarize(content: str, content_hash: str, priority: tuple, suffix: str, fast: bool) -> str:
+    parsed = await parse_structure(content, suffix)
+    if parsed is None and not fast:
+        abstract = await scheduler.run(
+            summarize_file,
+            content,
+            priority=priority,
+            tokens=estimate_tokens(content),
+        )
+    else:
+        # definitions come from the parser, the LLM only writes the purpose
+        doc, definitions = parsed or ("", [])
+        if fast:
+            purpose = fast_purpose(content, definitions, doc)
+        else:
+            purpose = await scheduler.run(
+                summarize_purpose,
+                content,
+                priority=priority,
+                tokens=estimate_tokens(content),
+            )
+        abstract = FileSummary(purpose=purpose, definitions=definitions)
+    summary = abstract.__str__()
+    summary_cache.set(content_hash, summary_version(fast), summary)
+    return summary
+
+
+def placeholder_summaries() -> bool:
     """
-    Loads the patterns from .gitignore and updates the global IGNORED set.
+    Whether new files get a placeholder summary, with fast summaries there is nothing to upgrade it to.
     """
-    gitignore_files = [file for file in Path(".").rglob(".gitignore")]
-    for gitignore_file in gitignore_files:
-        with open(gitignore_file, "r") as f:
-            for line in f.readlines():
-                pattern = line.strip().split("#")[0]
-                if pattern and pattern != "*":
-                    pattern = pattern.removesuffix("/")
-                    IGNORED.add(pattern)
+    return background_summaries() and not fast_summaries()
 
 
-load_gitignore()
+def summary_version(fast: bool) -> str:
+    return f"{SUMMARIZER_VERSION}-fast" if fast else SUMMARIZER_VERSION
 
 
-def is_ignored_by_gitignore(file_path: str) -> bool:
+async def cached_summary(
+    content: str, content_hash: str, priority: tuple = (), suffix: str = "", fast: bool | None = None
+) -> str:
+    """
+    Summarize the content unless an identical blob was summarized before.
+    Concurrent requests for the same content share one LLM call.
+    Fast summaries never call the LLM and are cached apart from the full ones.
     """
-    Checks if a file is ignored by .gitignore
+    fast = fast_summaries() if fast is None else fast
+    if (summary := summary_cache.get(content_hash, summary_version(fast))) is not None:
+        return summary
+    key = (content_hash, fast)
+    if (task := _pending_summaries.get(key)) is None:
+        task = asyncio.ensure_future(_summarize(content, content_hash, priority, suffix, fast))
+        _pending_summaries[key] = task
+        task.add_done_callback(lambda _: _pending_summaries.pop(key, None))
+    return await task
+
+
+class Fragment:
     """
-    return any(
-        fnmatch.fnmatch(file_path, pattern) or fnmatch.fnmatch(os.path.basename(file_path), pattern)
-        for pattern in IGNORED
-    )
+    Rendered text of a node together with the key it was rendered for.
+    """
+
+    __slots__ = ("key", "text")
+
+    def __init__(self, key: tuple, text: str) -> None:
+        self.key = key
+        self.text = text
 
 
 class CodebaseNode(BaseModel):
     name: str
     sha256: str
     embedding: list[float] | None = None
+    _fragment: Fragment | None = PrivateAttr(default=None)
+    _encoded: Fragment | None = PrivateAttr(default=None)
+
+    def __eq__(self, other: object) -> bool:
+        # private attributes only cache renderings and the file index, equality is over the fields
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
 
     @property
     def path(self) -> Path:
@@ -84,12 +143,25 @@ class CodebaseNode(BaseModel):
     def path(self, value: Union[str, Path]) -> None:
         self.name = Path(value).relative_to(Path.cwd()).as_posix()
 
-    def __str__(self, indent: int = 0) -> str:
+    def render(self, indent: int = 0) -> str:
         return " " * indent + f"Node: {self.path.name}"
 
+    def encode(self, depth: int = 0) -> str:
+        return file_line(self.path.name, depth)
+
+    def __str__(self, indent: int = 0) -> str:
+        return self.render(indent)
+
 
 class CodebaseFile(CodebaseNode):
     summary: str
+    size: int | None = None
+    mtime_ns: int | None = None
+    inode: int | None = None
+    # git blob sha, only known for clean tracked files
+    blob: str | None = None
+    # structural summary waiting in the enrichment queue for its LLM summary
+    placeholder: bool | None = None
 
     def __init__(self, path: Path | str, **data: Any) -> None:
         data["name"] = Path(path).as_posix()
@@ -101,23 +173,61 @@ class CodebaseFile(CodebaseNode):
         return cls(path, **data)
 
     @classmethod
-    async def from_path(cls, path: Path) -> "CodebaseFile":
+    async def from_path(cls, path: Path, blob: str | None = None) -> "CodebaseFile":
+        stat: os.stat_result | None = None
         try:
+            stat = path.stat()
             content = path.read_text()
             content_hash = hashlib.sha256(content.encode()).hexdigest()
-            abstract = await summarize_file(content)
-            summary = abstract.__str__()
+            priority = (len(path.parts), len(content))
+            placeholder = placeholder_summaries()
+            if placeholder and (summary := summary_cache.get(content_hash, SUMMARIZER_VERSION)) is not None:
+                placeholder = False
+            elif placeholder:
+                # usable right away, the LLM summary follows from the enrichment queue
+                summary = await cached_summary(content, content_hash, priority, path.suffix, fast=True)
+                EnrichmentQueue.open().push(path.as_posix(), content_hash, len(content))
+            else:
+                summary = await cached_summary(content, content_hash, priority, path.suffix)
         except Exception as e:
             print(e)
             summary = "N/A"
             content_hash = "error"
-        return cls(
+            placeholder = False
+        file = cls(
             path=path,
             sha256=content_hash,
             summary=summary,
+            blob=blob,
+            placeholder=placeholder or None,
         )
+        if stat:
+            file.update_stat(stat)
+        return file
 
-    async def refresh(self) -> "CodebaseFile":
+    def stat_changed(self, stat: os.stat_result) -> bool:
+        """
+        Cheap change detection, the content only needs to be hashed if size, mtime or inode differ.
+        """
+        return (self.size, self.mtime_ns, self.inode) != (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    @property
+    def stat_key(self) -> tuple:
+        return (self.sha256, self.size, self.mtime_ns, self.inode, self.blob)
+
+    def update_stat(self, stat: os.stat_result) -> None:
+        self.size, self.mtime_ns, self.inode = stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    async def refresh(self, paranoid: bool = False, blob: str | None = None) -> "CodebaseFile":
+        """
+        Refresh the file if it changed, paranoid mode always hashes the content.
+        A known git blob sha is used as change key without touching the file.
+        """
+        if blob and not paranoid:
+            return self if blob == self.blob else await CodebaseFile.from_path(self.path, blob)
+        stat = self.path.stat()
+        if not paranoid and not self.stat_changed(stat):
+            return self
         try:
             content = self.path.read_text()
         except UnicodeDecodeError:
@@ -125,16 +235,36 @@ class CodebaseFile(CodebaseNode):
         content_hash = hashlib.sha256(content.encode()).hexdigest()
         if self.sha256 != content_hash:
             return await CodebaseFile.from_path(self.path)
+        self.update_stat(stat)
         return self
 
-    def __str__(self, indent: int = 0) -> str:
-        return (
-            " " * indent + f"<file {self.path.name}>" + f": [green]{self.summary}[/green] </endfile {self.path.name}>"
-        )
+    def render(self, indent: int = 0) -> str:
+        key = (self.sha256, self.summary, indent)
+        if self._fragment is None or self._fragment.key != key:
+            name = self.name.rsplit("/", 1)[-1]
+            text = f"{' ' * indent}<file {name}>: [green]{self.summary}[/green] </endfile {name}>"
+            self._fragment = Fragment(key, text)
+        return self._fragment.text
+
+    def encode(self, depth: int = 0) -> str:
+        """
+        Compact prompt line without markup, see encode.py.
+        """
+        key = (self.sha256, self.summary, depth)
+        if self._encoded is None or self._encoded.key != key:
+            self._encoded = Fragment(key, file_line(self.name.rsplit("/", 1)[-1], depth, self.summary))
+        return self._encoded.text
 
 
 class CodebaseTree(CodebaseNode):
     nodes: list[Union["CodebaseFile", "CodebaseTree"]] = []
+    # own mtime, changes when entries are added, removed or renamed
+    mtime_ns: int | None = None
+    # git state of the last refresh, only set on the root
+    git_head: str | None = None
+    git_dirty: list[str] | None = None
+    # shared with all subtrees once built, kept up to date by refresh
+    _file_index: "FileIndex | None" = PrivateAttr(default=None)
 
     def __init__(self, path: Path | str, **data: Any) -> None:
         data["name"] = Path(path).as_posix()
@@ -145,110 +275,289 @@ class CodebaseTree(CodebaseNode):
         path = data.pop("name")
         nodes_data = data.pop("nodes")
         nodes = [
-            CodebaseFile.from_dict(node_data) if "summary" in node_data else CodebaseTree.from_dict(node_data)
+            CodebaseFile.from_dict(node_data) if "summary" in node_data else cls.from_dict(node_data)
             for node_data in nodes_data
         ]
         return cls(path, nodes=nodes, **data)
 
     @classmethod
-    async def load(cls, *, path: str = ".context/tree.yaml") -> "CodebaseTree":
-        if Path(path).exists():
-            with open(path, "r") as f:
-                data = yaml.safe_load(f)
-                if not data:
-                    return await cls.new()
-                tree = cls.from_dict(data)
-                return await tree.refresh()
+    async def load(
+        cls,
+        *_: Any,
+        path: str = STORE_PATH,
+        paranoid: bool = False,
+        index: GitIndex | None = None,
+    ) -> "CodebaseTree":
+        store = TreeStore.open(path)
+        if store.is_empty() and (legacy_yaml := Path(path).with_name("tree.yaml")).exists():
+            store.import_yaml(legacy_yaml)
+        data = store.load()
+        if not data:
+            return await cls.new(store=store, index=index)
+        tree = cls.from_dict(data)
+        paranoid = paranoid or getenv("PARANOID_REFRESH", "false").lower() == "true"
+        index = None if paranoid else index
+        changes = None if paranoid or index else await git_changes(tree.git_head, tree.git_dirty)
+        await tree.refresh(paranoid, store=store, changes=changes, index=index)
+        tree.record_git_state(changes, store)
+        if placeholder_summaries():
+            tree.upgrade_summaries(store)
         else:
-            return await cls.new()
+            await tree.summarize_placeholders(store)
+        return tree
 
     @classmethod
-    async def from_path(cls, path: Path) -> "CodebaseTree":
+    async def from_path(
+        cls,
+        path: Path,
+        store: TreeStore | None = None,
+        index: GitIndex | None = None,
+    ) -> "CodebaseTree":
+        store = store or TreeStore.open()
         tasks = [
-            CodebaseFile.from_path(file_path) if file_path.is_file() else cls.from_path(file_path)
-            for file_path in path.iterdir()
-            if not is_ignored_by_gitignore(file_path.as_posix())
+            cls.from_path(file_path, store, index)
+            if is_dir
+            else CodebaseFile.from_path(file_path, index.blob(file_path.as_posix()) if index else None)
+            for file_path, is_dir in (index.scan(path) if index else scan_dir(path))
         ]
         if len(tasks) > 50:
-            input(f"Found {len(tasks)} files in {path}. Press enter to continue...")
+            scheduler.confirm(f"Found {len(tasks)} files in {path}.")
         nodes: list["CodebaseNode"] = await asyncio.gather(*tasks)
 
-        folder_hash = hashlib.sha256(("".join(str(node.sha256) for node in nodes)).encode()).hexdigest()
+        folder_hash = _folder_hash(nodes)
 
         tree = cls(
             path=path,
             sha256=folder_hash,
             nodes=nodes,
         )
-        tree.to_yaml(".context/tree.yaml")
+        tree.mtime_ns = os.stat(path).st_mtime_ns
+        # subtrees already stored their own rows
+        store.write(upserts=[*(node for node in nodes if isinstance(node, CodebaseFile)), tree])
         return tree
 
     @classmethod
-    async def new(cls) -> "CodebaseTree":
-        return await cls.from_path(Path("."))
-
-    async def refresh(self) -> "CodebaseTree":
-        # gather new nodes from Codebase not in self.nodes
-        node_paths = [node.path for node in self.nodes]
-        new_node_tasks = [
-            CodebaseFile.from_path(file_path) if file_path.is_file() else CodebaseTree.from_path(file_path)
-            for file_path in self.path.iterdir()
-            if not is_ignored_by_gitignore(file_path.as_posix()) and file_path not in node_paths
-        ]
-        # check node hash and update if necessary
-        node_updates = [
-            node
-            for node in self.nodes
-            if node.path
-            in [file_path for file_path in self.path.iterdir() if not is_ignored_by_gitignore(file_path.as_posix())]
-        ]
+    async def new(cls, store: TreeStore | None = None, index: GitIndex | None = None) -> "CodebaseTree":
+        store = store or TreeStore.open()
+        store.clear()
+        changes = None if index else await git_changes()
+        tree = await cls.from_path(Path("."), store, index)
+        tree.record_git_state(changes, store)
+        return tree
 
-        # delete nodes not in Codebase anymore
-        ignored_nodes = [
-            file_path for file_path in self.path.iterdir() if not is_ignored_by_gitignore(file_path.as_posix())
-        ]
-        deleted_nodes = [node for node in self.nodes if node.path not in ignored_nodes]
-
-        # update self.nodes
-        self.nodes = [node for node in self.nodes if node not in deleted_nodes]
-        self.nodes = [node for node in self.nodes if node not in node_updates]
-        self.nodes.extend(
-            await asyncio.gather(  # type: ignore
-                *new_node_tasks, *[node.refresh() for node in node_updates]
-            )
-        )
+    def record_git_state(self, changes: GitChanges | None, store: TreeStore) -> None:
+        # without changes the recorded state is outdated and must not be used to skip subtrees
+        head, dirty = (changes.head, changes.dirty) if changes else (None, None)
+        if (self.git_head, self.git_dirty) != (head, dirty):
+            self.git_head, self.git_dirty = head, dirty
+            store.write(upserts=[self])
+
+    async def refresh(
+        self,
+        paranoid: bool = False,
+        store: TreeStore | None = None,
+        changes: Changes | None = None,
+        index: GitIndex | None = None,
+    ) -> "CodebaseTree":
+        """
+        Refresh the subtree, unchanged subtrees are skipped when git (or a file watcher)
+        confirms that nothing below them changed and their own mtime is the same.
+        Skipping needs changes: directory mtimes do not change with the content of the files
+        below them, so without git or a watcher every subtree is listed and its files stat'ed.
+        With a git index the listing and file change keys come from git instead.
+        """
+        store = store or TreeStore.open()
+        stat = os.stat(self.path)
+        if not paranoid and changes and not changes.contains(self.name) and stat.st_mtime_ns == self.mtime_ns:
+            return self
+
+        # reconcile one directory listing against the known nodes by path
+        known_nodes: dict[str, CodebaseNode] = {node.name: node for node in self.nodes}
+        stat_keys: dict[str, tuple] = {}
+        tasks: list[Coroutine[Any, Any, CodebaseNode]] = []
+        previous_nodes: list[CodebaseNode | None] = []
+        for file_path, is_dir in index.scan(self.path) if index else scan_dir(self.path):
+            node = known_nodes.pop(file_path.as_posix(), None)
+            if node is None or is_dir != isinstance(node, CodebaseTree):
+                if node is not None:
+                    # file turned into a directory or vice versa
+                    known_nodes[node.name] = node
+                previous_nodes.append(None)
+                if is_dir:
+                    tasks.append(type(self).from_path(file_path, store, index))
+                else:
+                    tasks.append(CodebaseFile.from_path(file_path, index.blob(file_path.as_posix()) if index else None))
+            elif isinstance(node, CodebaseFile):
+                stat_keys[node.name] = node.stat_key
+                previous_nodes.append(node)
+                tasks.append(node.refresh(paranoid, index.blob(node.name) if index else None))
+            else:
+                assert isinstance(node, CodebaseTree)
+                previous_nodes.append(node)
+                tasks.append(node.refresh(paranoid, store, changes, index))
+
+        # nodes left over are not in the Codebase anymore
+        deleted_paths = list(known_nodes)
+        if deleted_paths:
+            store.write(deletes=deleted_paths)
+
+        refreshed_nodes: list[CodebaseNode] = await asyncio.gather(*tasks)
+        self.nodes = refreshed_nodes  # type: ignore
+
+        if self._file_index is not None:
+            for path in deleted_paths:
+                self._file_index.remove(path)
+            for previous, node in zip(previous_nodes, refreshed_nodes):
+                if previous is not node:
+                    self._file_index.replace(node)
 
         # update self.sha256
-        folder_hash = hashlib.sha256(("".join(str(node.sha256) for node in self.nodes)).encode()).hexdigest()
+        folder_hash = _folder_hash(self.nodes)
+
+        mtime_ns, self.mtime_ns = self.mtime_ns, stat.st_mtime_ns
 
-        if self.sha256 != folder_hash:
+        # persist only what changed, subtrees store their own rows
+        upserts: list[CodebaseNode] = [
+            node
+            for node in refreshed_nodes
+            if isinstance(node, CodebaseFile) and stat_keys.get(node.name) != node.stat_key
+        ]
+        if self.sha256 != folder_hash or mtime_ns != self.mtime_ns:
             self.sha256 = folder_hash
-            self.to_yaml(".context/tree.yaml")
+            upserts.append(self)
+        if upserts:
+            store.write(upserts=upserts)
 
         return self
 
+    def upgrade_summaries(self, store: TreeStore | None = None) -> int:
+        """
+        Replace placeholder summaries by LLM summaries the enrichment queue put into the cache,
+        returns the number of upgraded files.
+        Placeholders still waiting are queued again if their entry got lost, e.g. done for content
+        that changed and changed back before the next refresh.
+        """
+        placeholders = [file for file in self.files if file.placeholder]
+        if not placeholders:
+            return 0
+        found = summary_cache.get_many([file.sha256 for file in placeholders], SUMMARIZER_VERSION)
+        self._replace_summaries([(file, found[file.sha256]) for file in placeholders if file.sha256 in found], store)
+        waiting = [file for file in placeholders if file.placeholder]
+        if waiting and placeholder_summaries():
+            EnrichmentQueue.open().push_missing((file.name, file.sha256, file.size or 0) for file in waiting)
+        return len(placeholders) - len(waiting)
+
+    async def summarize_placeholders(self, store: TreeStore | None = None) -> int:
+        """
+        Summarize placeholders inline, they are stale once nothing upgrades them in the background.
+        Refresh keeps them as long as their content is unchanged, even in subtrees it skips.
+        Returns the number of summarized files.
+        """
+
+        async def summarize(file: CodebaseFile) -> str | None:
+            try:
+                content = await asyncio.to_thread(file.path.read_text)
+            except (OSError, UnicodeDecodeError):
+                return None
+            # changed content gets its summary with the next refresh
+            if hashlib.sha256(content.encode()).hexdigest() != file.sha256:
+                return None
+            priority = (len(file.path.parts), len(content))
+            return await cached_summary(content, file.sha256, priority, file.path.suffix)
+
+        placeholders = [file for file in self.files if file.placeholder]
+        summaries = await asyncio.gather(*(summarize(file) for file in placeholders))
+        found = [(file, summary) for file, summary in zip(placeholders, summaries) if summary is not None]
+        self._replace_summaries(found, store)
+        return len(found)
+
+    def _replace_summaries(self, summaries: list[tuple[CodebaseFile, str]], store: TreeStore | None) -> None:
+        for file, summary in summaries:
+            file.summary, file.placeholder = summary, None
+            # folder renderings are keyed by sha256, which a new summary leaves unchanged
+            for folder in self.file_index.ancestors(file.name):
+                folder._fragment = folder._encoded = None
+        if summaries:
+            (store or TreeStore.open()).write(upserts=[file for file, _ in summaries])
+
+    @property
+    def file_index(self) -> "FileIndex":
+        if self._file_index is None:
+            FileIndex(self)
+        assert self._file_index is not None
+        return self._file_index
+
     @property
     def files(self) -> list[CodebaseFile]:
-        files = []
+        return self.file_index.files(self.name)
+
+    def render(self, indent: int = 0) -> str:
+        """
+        Prompt representation, cached per subtree by its sha256.
+        Only subtrees that changed since the last render are assembled again.
+        """
+        if self._fragment is not None and self._fragment.key == (self.sha256, indent):
+            return self._fragment.text
+        pad, name = " " * indent, self.path.name
+        parts = [f"{pad}<folder {name}>\n"]
         for node in self.nodes:
-            if isinstance(node, CodebaseFile):
-                files.append(node)
-            else:
-                files.extend(node.files)
-        return files
+            parts.append(node.render(indent + 2))
+            parts.append("\n")
+        parts.append(f"{pad}</endfolder {name}>\n")
+        self._fragment = Fragment((self.sha256, indent), "".join(parts))
+        return self._fragment.text
 
-    def __str__(self, indent: int = 0) -> str:
-        folder_str = " " * indent + f"<folder {self.path.name}>\n"
+    def stream(self, indent: int = 0) -> Iterator[str]:
+        """
+        Render piece by piece, cached subtrees are yielded as one piece.
+        A fully consumed stream caches the result like render.
+        """
+        key = (self.sha256, indent)
+        if self._fragment is not None and self._fragment.key == key:
+            yield self._fragment.text
+            return
+        parts: list[str] = []
+        for part in self._stream(indent):
+            parts.append(part)
+            yield part
+        self._fragment = Fragment(key, "".join(parts))
+
+    def _stream(self, indent: int) -> Iterator[str]:
+        pad, name = " " * indent, self.path.name
+        yield f"{pad}<folder {name}>\n"
         for node in self.nodes:
-            folder_str += node.__str__(indent + 2) + "\n"
-        folder_str += " " * indent + f"</endfolder {self.path.name}>\n"
-        return folder_str
+            if isinstance(node, CodebaseTree):
+                yield from node.stream(indent + 2)
+            else:
+                yield node.render(indent + 2)
+            yield "\n"
+        yield f"{pad}</endfolder {name}>\n"
+
+    def encode(self, depth: int = 0) -> str:
+        """
+        Compact prompt encoding of the subtree, cached per subtree by its sha256 like render.
+        """
+        key = (self.sha256, depth)
+        if self._encoded is None or self._encoded.key != key:
+            lines = [folder_line(self.path.name, depth), *(node.encode(depth + 1) for node in self.nodes)]
+            self._encoded = Fragment(key, "".join(lines))
+        return self._encoded.text
 
     def __repr__(self) -> str:
-        return f"CodebaseTree(path={self.path}, files={len(self.files)}, nodes={len(self.nodes)})"
+        files = self.file_index.count(self.name)
+        return f"{type(self).__name__}(path={self.path}, files={files}, nodes={len(self.nodes)})"
 
     def show(self) -> str:
-        return self.__str__()
+        return self.render()
+
+    def view(self, budget_tokens: int, focus: list[str] | None = None) -> str:
+        """
+        Rendering that fits into budget_tokens, unrelated folders are collapsed into one line rollups
+        and file summaries are kept closest to the focus (paths or a free text query) first.
+        """
+        from .view import TreeView
+
+        return TreeView(self, budget_tokens, focus).render()
 
     def to_yaml(self, file_path: Union[str, Path]) -> None:
         """
@@ -259,3 +568,117 @@ class CodebaseTree(CodebaseNode):
 
         with open(file_path, "w+") as f:
             yaml.safe_dump(self.dict(exclude_none=True), f)
+
+
+def _folder_hash(nodes: list) -> str:
+    # names are part of the hash, a renamed file changes the rendered folder
+    return hashlib.sha256("".join(f"{node.name}\0{node.sha256}\n" for node in nodes).encode()).hexdigest()
+
+
+def _sort_key(path: str) -> tuple[str, ...]:
+    # tuples of path parts sort like a depth first walk over name sorted directories
+    return () if path == "." else tuple(path.split("/"))
+
+
+class FileIndex:
+    """
+    Flat index of a tree: path -> node, basename -> file paths and the file count of every directory.
+    Maintained incrementally by CodebaseTree.refresh, only the sorted file order is rebuilt after changes.
+    """
+
+    def __init__(self, tree: CodebaseTree) -> None:
+        self.root = tree.name
+        self.nodes: dict[str, CodebaseNode] = {}
+        self.basenames: dict[str, set[str]] = {}
+        self.counts: dict[str, int] = {}
+        self._sorted: list[tuple[tuple[str, ...], CodebaseFile]] | None = None
+        self._resolver: PathResolver | None = None
+        self.replace(tree)
+
+    def _count(self, path: str, delta: int) -> None:
+        for parent in PurePosixPath(path).parents:
+            directory = parent.as_posix()
+            self.counts[directory] = self.counts.get(directory, 0) + delta
+            if directory == self.root:
+                break
+
+    def replace(self, node: CodebaseNode) -> None:
+        """
+        Add node and everything below it, replacing what was indexed at its path before.
+        """
+        self.remove(node.name)
+        self._sorted = self._resolver = None
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            self.nodes[node.name] = node
+            if isinstance(node, CodebaseTree):
+                node._file_index = self
+                self.counts.setdefault(node.name, 0)
+                stack.extend(node.nodes)
+            else:
+                self.basenames.setdefault(node.path.name, set()).add(node.name)
+                self._count(node.name, 1)
+
+    def remove(self, path: str) -> None:
+        """
+        Remove the node at path and everything below it.
+        """
+        if (node := self.nodes.get(path)) is None:
+            return
+        self._sorted = self._resolver = None
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if self.nodes.get(node.name) is not node:
+                continue
+            del self.nodes[node.name]
+            if isinstance(node, CodebaseTree):
+                self.counts.pop(node.name, None)
+                stack.extend(node.nodes)
+            else:
+                self.basenames[node.path.name].discard(node.name)
+                if not self.basenames[node.path.name]:
+                    del self.basenames[node.path.name]
+                self._count(node.name, -1)
+
+    def get(self, path: str) -> CodebaseNode | None:
+        return self.nodes.get(path)
+
+    def ancestors(self, path: str) -> list[CodebaseNode]:
+        """
+        Folders containing path, innermost first.
+        """
+        parts = _sort_key(path)
+        folders = ("/".join(parts[:depth]) or self.root for depth in range(len(parts) - 1, -1, -1))
+        return [node for folder in folders if (node := self.nodes.get(folder)) is not None]
+
+    def find(self, basename: str) -> list[str]:
+        """
+        Paths of all files with this basename.
+        """
+        return sorted(self.basenames.get(basename, ()))
+
+    @property
+    def resolver(self) -> PathResolver:
+        if self._resolver is None:
+            self._resolver = PathResolver(file.name for file in self.files(self.root))
+        return self._resolver
+
+    def count(self, directory: str = ".") -> int:
+        return self.counts.get(directory, 0)
+
+    def files(self, directory: str = ".") -> list[CodebaseFile]:
+        """
+        All files below directory in tree order.
+        """
+        if self._sorted is None:
+            files = (node for node in self.nodes.values() if isinstance(node, CodebaseFile))
+            self._sorted = sorted(((_sort_key(file.name), file) for file in files), key=lambda item: item[0])
+        if directory == self.root:
+            return [file for _, file in self._sorted]
+        # files below a directory are one contiguous range in tree order
+        prefix = _sort_key(directory)
+        start = bisect_left(self._sorted, prefix, key=lambda item: item[0])
+        end = bisect_left(self._sorted, (*prefix[:-1], prefix[-1] + "\0"), key=lambda item: item[0])
+        return [file for _, file in self._sorted[start:end]]
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from os import getenv
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .tree import CodebaseFile, CodebaseTree
+
+VECTORS_PATH = ".context/vectors.npy"
+
+_FEATURE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_IDENTIFIER = re.compile(r"\w+")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+class Embedder(ABC):
+    """
+    Turns texts into vectors, rows of the result are normalized float32.
+    """
+
+    name = "embedder"
+    dimensions = 0
+
+    @abstractmethod
+    async def embed(self, texts: list[str]) -> np.ndarray: ...
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        return (await self.embed([text]))[0]
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic offline embedder hashing words and identifier parts into signed buckets.
+    """
+
+    def __init__(self, dimensions: int = 256) -> None:
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+        self._buckets: dict[str, tuple[int, float]] = {}
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        if (bucket := self._buckets.get(feature)) is None:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            bucket = self._buckets[feature] = (digest % self.dimensions, 1.0 if digest >> 63 else -1.0)
+        return bucket
+
+    def _features(self, text: str) -> list[str]:
+        identifiers = _IDENTIFIER.findall(text)
+        return [word.lower() for identifier in identifiers for word in {identifier, *_FEATURE.findall(identifier)}]
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vector = vectors[row]
+            for feature in self._features(text):
+                column, sign = self._bucket(feature)
+                vector[column] += sign
+        # dampen words repeated all over a file
+        return _normalize(np.sign(vectors) * np.log1p(np.abs(vectors)))
+
+
+class LangchainEmbedder(Embedder):
+    """
+    Adapter for langchain embeddings, like OpenAIEmbeddings.
+    """
+
+    def __init__(self, embeddings: Any, name: str) -> None:
+        self.embeddings = embeddings
+        self.name = name
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = _normalize(np.array(await self.embeddings.aembed_documents(texts), dtype=np.float32))
+        self.dimensions = vectors.shape[1]
+        return vectors
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        return _normalize(np.array([await self.embeddings.aembed_query(text)], dtype=np.float32))[0]
+
+
+def default_embedder() -> Embedder:
+    """
+    OpenAI embeddings if EMBEDDING_MODEL is set, the offline hashing embedder otherwise.
+    """
+    if model := getenv("EMBEDDING_MODEL"):
+        from langchain_openai import OpenAIEmbeddings
+
+        return LangchainEmbedder(OpenAIEmbeddings(model=model), name=model)
+    return HashingEmbedder()
+
+
+def embedding_text(file: CodebaseFile) -> str:
+    return f"{file.name}\n{file.summary}"
+
+
+class VectorIndex:
+    """
+    Embeddings of all files as one contiguous float32 matrix, memory mapped from .context/vectors.npy.
+    A json sidecar maps rows to paths and the hash of the embedded text,
+    so syncing with the tree only embeds new or changed files.
+    Queries are brute force cosine similarity, a matrix vector product over all rows.
+    """
+
+    def __init__(self, path: str | Path = VECTORS_PATH, embedder: Embedder | None = None) -> None:
+        self.path = Path(path)
+        self.embedder = embedder or default_embedder()
+        self.paths: list[str] = []
+        self.keys: list[str] = []
+        self.matrix: np.ndarray = np.zeros((0, self.embedder.dimensions), dtype=np.float32)
+        self._load()
+
+    @property
+    def sidecar(self) -> Path:
+        return self.path.with_suffix(".json")
+
+    def _load(self) -> None:
+        try:
+            meta = json.loads(self.sidecar.read_text())
+            matrix = np.load(self.path, mmap_mode="r")
+        except (FileNotFoundError, ValueError, OSError):
+            return
+        # written by another embedder or torn by a concurrent write, rebuilt on the next sync
+        if meta.get("embedder") != self.embedder.name or len(meta["rows"]) != len(matrix):
+            return
+        self.paths = [path for path, _ in meta["rows"]]
+        self.keys = [key for _, key in meta["rows"]]
+        self.matrix = matrix
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp.npy")
+        np.save(tmp, self.matrix)
+        os.replace(tmp, self.path)
+        meta = {"embedder": self.embedder.name, "rows": list(zip(self.paths, self.keys))}
+        self.sidecar.write_text(json.dumps(meta))
+        self.matrix = np.load(self.path, mmap_mode="r")
+
+    async def sync(self, tree: CodebaseTree) -> int:
+        """
+        Match the rows to the files of tree, returns the number of embedded texts.
+        Unchanged files and files with a known embedded text (renames, copies) reuse their vector.
+        """
+        known = {key: row for row, key in enumerate(self.keys)}
+        files = tree.files
+        texts = [embedding_text(file) for file in files]
+        keys = [hashlib.sha256(text.encode()).hexdigest() for text in texts]
+        if [file.name for file in files] == self.paths and keys == self.keys:
+            return 0
+
+        missing = [i for i, key in enumerate(keys) if key not in known]
+        embedded = await self.embedder.embed([texts[i] for i in missing]) if missing else None
+        matrix = np.empty((len(files), embedded.shape[1] if embedded is not None else self.matrix.shape[1]), np.float32)
+        reused = [(i, known[key]) for i, key in enumerate(keys) if key in known]
+        if reused:
+            rows, old_rows = zip(*reused)
+            matrix[list(rows)] = self.matrix[list(old_rows)]
+        if embedded is not None:
+            matrix[missing] = embedded
+        self.paths, self.keys, self.matrix = [file.name for file in files], keys, matrix
+        self._save()
+        return len(missing)
+
+    async def search(self, query: str, k: int = 5) -> list[tuple[str, float]]:
+        """
+        The k most similar files with their cosine similarity.
+        """
+        if not self.paths:
+            return []
+        scores = self.matrix @ await self.embedder.embed_query(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(self.paths[row], float(scores[row])) for row in top[np.argsort(-scores[top])]]
@@ -0,0 +1,167 @@
+import heapq
+import math
+import re
+from typing import Callable, Iterator
+
+from .encode import file_line, folder_line, rollup_line
+from .resolve import normalize_path
+from .tree import CodebaseFile, CodebaseNode, CodebaseTree
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Conservative estimate of ~4 chars per token, rounded up.
+    Rounding up per line means the sum over lines never undercounts the joined text.
+    """
+    return (len(text) + 3) // 4
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def _parts(path: str) -> tuple[str, ...]:
+    return () if path == "." else tuple(path.split("/"))
+
+
+def focus_scores(tree: CodebaseTree, focus: list[str]) -> dict[str, float]:
+    """
+    Relevance in [0, 1] of every file for the focus entries.
+    Entries naming a file or folder score files by their distance in the tree,
+    anything else is a query scored by the idf weighted share of its words in path and summary.
+    """
+    index = tree.file_index
+    files = index.files(tree.name)
+    scores = dict.fromkeys((file.name for file in files), 0.0)
+    paths: list[tuple[str, ...]] = []
+    queries: list[set[str]] = []
+    for entry in focus:
+        path: str | None = normalize_path(entry)
+        if path not in index.nodes and path:
+            # a single word can still be a misspelled path, text with spaces is a query
+            path = None if any(c.isspace() for c in path) else index.resolver.best(path)
+        if path:
+            paths.append(_parts(path))
+        elif words := _words(entry):
+            queries.append(words)
+
+    for target in paths:
+        for file in files:
+            parts = _parts(file.name)
+            if parts[: len(target)] == target:
+                scores[file.name] = 1.0
+                continue
+            common = 0
+            while common < min(len(parts), len(target)) and parts[common] == target[common]:
+                common += 1
+            # siblings of a focused file are one step away from each other
+            distance = len(parts) + len(target) - 2 * common - 1
+            scores[file.name] = max(scores[file.name], 1 / (1 + distance))
+
+    if queries:
+        documents = {file.name: _words(file.name) | _words(file.summary) for file in files}
+        frequency: dict[str, int] = {}
+        for words in documents.values():
+            for word in words:
+                frequency[word] = frequency.get(word, 0) + 1
+        for query in queries:
+            idf = {word: math.log(1 + len(files) / (1 + frequency.get(word, 0))) for word in query}
+            total = sum(idf.values())
+            for name, words in documents.items():
+                if matched := sum(weight for word, weight in idf.items() if word in words):
+                    scores[name] = max(scores[name], matched / total)
+    return scores
+
+
+class TreeView:
+    """
+    Token budgeted prompt encoding of a tree.
+    Starts from a one line rollup of the root and greedily expands the most relevant
+    folders and file summaries while they fit, everything else stays a rollup or a bare name.
+    """
+
+    def __init__(
+        self,
+        tree: CodebaseTree,
+        budget_tokens: int,
+        focus: list[str] | None = None,
+        count: Callable[[str], int] = count_tokens,
+    ) -> None:
+        self.tree = tree
+        self.budget_tokens = budget_tokens
+        self.count = count
+        self.scores = focus_scores(tree, focus or [])
+        # a folder is as relevant as the most relevant file below it
+        for name, score in list(self.scores.items()):
+            parts = _parts(name)
+            for depth in range(len(parts) - 1, -1, -1):
+                folder = "/".join(parts[:depth]) or tree.name
+                if self.scores.get(folder, -1.0) >= score:
+                    break
+                self.scores[folder] = score
+        self.expanded: set[str] = set()
+        self.summarized: set[str] = set()
+
+    def _name(self, node: CodebaseNode) -> str:
+        return node.path.name
+
+    def _rollup(self, tree: CodebaseTree, depth: int) -> str:
+        return rollup_line(self._name(tree), self.tree.file_index.count(tree.name), depth)
+
+    def _line(self, node: CodebaseNode, depth: int) -> str:
+        if isinstance(node, CodebaseTree):
+            return self._rollup(node, depth)
+        return file_line(self._name(node), depth)
+
+    def _cost(self, node: CodebaseNode, depth: int) -> int:
+        """
+        Additional tokens of expanding a folder or summarizing a file.
+        """
+        if isinstance(node, CodebaseTree):
+            lines = [folder_line(self._name(node), depth), *(self._line(child, depth + 1) for child in node.nodes)]
+            return sum(self.count(line) for line in lines) - self.count(self._rollup(node, depth))
+        return self.count(node.encode(depth)) - self.count(self._line(node, depth))
+
+    def _lines(self, node: CodebaseNode, depth: int) -> Iterator[str]:
+        if isinstance(node, CodebaseTree) and node.name in self.expanded:
+            yield folder_line(self._name(node), depth)
+            for child in node.nodes:
+                yield from self._lines(child, depth + 1)
+        elif isinstance(node, CodebaseFile) and node.name in self.summarized:
+            yield node.encode(depth)
+        else:
+            yield self._line(node, depth)
+
+    def render(self) -> str:
+        total = self.count(self._rollup(self.tree, 0))
+        if total > self.budget_tokens:
+            return ""
+        applied: list[str] = []
+        counter = 0
+        heap: list[tuple[float, int, int, CodebaseNode]] = [(-self.scores.get(self.tree.name, 0.0), 0, 0, self.tree)]
+        while heap:
+            _, depth, _, node = heapq.heappop(heap)
+            cost = self._cost(node, depth)
+            if total + cost > self.budget_tokens:
+                continue
+            total += cost
+            applied.append(node.name)
+            if isinstance(node, CodebaseFile):
+                self.summarized.add(node.name)
+                continue
+            assert isinstance(node, CodebaseTree)
+            self.expanded.add(node.name)
+            for child in node.nodes:
+                counter += 1
+                heapq.heappush(heap, (-self.scores.get(child.name, 0.0), depth + 1, counter, child))
+
+        text = "".join(self._lines(self.tree, 0))
+        # custom tokenizers are not additive over lines, undo the last upgrades until it fits
+        while self.count(text) > self.budget_tokens and applied:
+            name = applied.pop()
+            self.expanded.discard(name)
+            self.summarized.discard(name)
+            text = "".join(self._lines(self.tree, 0))
+        return text if self.count(text) <= self.budget_tokens else ""
@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+from typing import Iterator
+
+from .ignore import gitignore
+
+
+def scan_entries(path: Path) -> list[os.DirEntry[str]]:
+    """
+    The not ignored files and directories of path from a single scandir pass, sorted by name.
+    A .gitignore in path is picked up from the same listing before anything is checked.
+    """
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    gitignore.discover(path.as_posix(), any(entry.name == ".gitignore" for entry in entries))
+    listed = []
+    for entry in entries:
+        # DirEntry caches the type from the listing, no extra stat call needed
+        is_dir = entry.is_dir()
+        if not is_dir and not entry.is_file():
+            continue
+        if not gitignore.is_ignored((path / entry.name).as_posix(), is_dir):
+            listed.append(entry)
+    return listed
+
+
+def scan_dir(path: Path) -> list[tuple[Path, bool]]:
+    """
+    List the not ignored files and directories of path as (path, is_dir), sorted by name.
+    """
+    return [(path / entry.name, entry.is_dir()) for entry in scan_entries(path)]
+
+
+def walk(root: str | Path = ".") -> Iterator[tuple[Path, list[os.DirEntry[str]]]]:
+    """
+    Pruned walk yielding every not ignored directory with its entries, ignored directories are never entered.
+    """
+    dirs = [Path(root)]
+    while dirs:
+        directory = dirs.pop()
+        try:
+            entries = scan_entries(directory)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        yield directory, entries
+        dirs.extend(directory / entry.name for entry in reversed(entries) if entry.is_dir())
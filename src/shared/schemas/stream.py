@@ -0,0 +1,55 @@
+import json
+from typing import Any
+
+
+class StreamedItems:
+    """
+    Incremental scanner for JSON streamed by a model.
+    Returns the elements of the first array, like the changes of {"changes": [...]},
+    as soon as each one is complete, without waiting for the rest of the document.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self._position = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        # stack depth inside the first array, None before it opened and after it closed
+        self._depth: int | None = None
+        self._closed = False
+        self._start: int | None = None
+
+    def feed(self, chunk: str) -> list[Any]:
+        self.buffer += chunk
+        items = []
+        for i in range(self._position, len(self.buffer)):
+            char = self.buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                # quotes in text around the document do not open strings
+                self._in_string = bool(self._stack)
+            elif char in "{[":
+                if self._depth is not None and len(self._stack) == self._depth and self._start is None:
+                    self._start = i
+                self._stack.append(char)
+                if char == "[" and self._depth is None and not self._closed:
+                    self._depth = len(self._stack)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if self._depth is not None and len(self._stack) == self._depth and self._start is not None:
+                    try:
+                        items.append(json.loads(self.buffer[self._start : i + 1]))
+                    except ValueError:
+                        pass
+                    self._start = None
+                elif self._depth is not None and len(self._stack) < self._depth:
+                    self._depth, self._closed = None, True
+        self._position = len(self.buffer)
+        return items
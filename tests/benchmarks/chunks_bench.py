@@ -0,0 +1,72 @@
+"""
+Benchmark: prompt tokens of retrieved code, whole files vs. chunks.
+
+Indexes a copy of this repo's own sources in fast mode (no LLM) and answers a few
+questions the way ask did before (the 3 best files, sent whole) and the way it does now
+(the 8 best chunks with the signatures around them). Tokens use the chars/4 estimate.
+
+Run with: python tests/benchmarks/chunks_bench.py
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from shared.codebase import tree
+from shared.codebase.cache import SummaryCache
+from shared.codebase.chunks import ChunkIndex, chunk_file, render_chunks
+from shared.codebase.search import SearchIndex
+from shared.codebase.store import TreeStore
+from shared.codebase.tree import CodebaseTree
+from shared.codebase.view import count_tokens
+
+SOURCES = Path(__file__).parents[2] / "src"
+QUESTIONS = [
+    "how are summaries cached?",
+    "where is the tree rendered for prompts?",
+    "how does path resolution handle typos?",
+    "how is the token budget of the tree view enforced?",
+]
+
+
+def chunked(index: ChunkIndex, question: str) -> str:
+    selected: dict[str, set[str]] = {}
+    for chunk, _ in index.search_chunks(question, 8):
+        selected.setdefault(chunk.path, set()).add(chunk.id)
+    sections = []
+    for path, ids in selected.items():
+        content = Path(path).read_text()
+        sections.append(f"{path}\n```\n{render_chunks(content, chunk_file(path, content), ids)}\n```")
+    return "\n\n".join(sections)
+
+
+def main() -> None:
+    os.environ["FAST_SUMMARIES"] = "true"
+    tree.scheduler.interactive = False
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(SOURCES, Path(tmp) / "src")
+        os.chdir(tmp)
+        tree.summary_cache = SummaryCache(Path(tmp) / ".context" / "summaries.sqlite")
+        store = TreeStore(Path(tmp) / ".context" / "tree.sqlite")
+        built = asyncio.run(CodebaseTree.new(store=store))
+        store.close()
+
+        files, chunks = SearchIndex(), ChunkIndex()
+        files.sync(built)
+        start = time.perf_counter()
+        chunks.sync(built)
+        print(f"{built.file_index.count()} files, chunk index built in {time.perf_counter() - start:.2f} s")
+        print(f"{'question':<52} {'files':>7} {'chunks':>7}")
+        for question in QUESTIONS:
+            whole = "\n\n".join(Path(path).read_text() for path, _ in files.search(question, 3))
+            print(f"{question:<52} {count_tokens(whole):>7} {count_tokens(chunked(chunks, question)):>7}")
+        files.close()
+        chunks.close()
+        os.chdir("/")
+
+
+if __name__ == "__main__":
+    main()
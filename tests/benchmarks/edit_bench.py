@@ -0,0 +1,81 @@
+"""
+Benchmark: output tokens and wall time of whole file rewrites vs. search/replace edits.
+
+The fixes of the example codebases (and a one line change to this repo's tree.py as a large file)
+are written both ways, like the model would reply. Generation time is estimated from the output
+tokens at DECODE_TOKENS_PER_SECOND (default 50). The local patch applier is timed for verbatim
+blocks, blocks at the wrong indentation and blocks with a misremembered character (similarity search,
+with two lines of context as short fuzzy blocks are rejected).
+
+Run with: python tests/benchmarks/edit_bench.py
+"""
+
+import os
+import time
+from pathlib import Path
+
+from shared.codebase.patch import apply_edits, parse_edits
+from shared.codebase.view import count_tokens
+
+ROOT = Path(__file__).parents[2]
+EXAMPLES = ROOT / "tests" / "codebases" / "examples"
+# (file, search, replace)
+FIXES = [
+    (EXAMPLES / "fix_random_numbers/main.py", "        total = num\n", "        total += num\n"),
+    (
+        EXAMPLES / "fix_string/main.py",
+        '    print(f"The original string was: {string_to_revers}")\n',
+        '    print(f"The original string was: {string_to_reverse}")\n',
+    ),
+    (EXAMPLES / "fix_fastapi/main.py", "    books_db[book_id] = None\n", "    del books_db[book_id]\n"),
+    (ROOT / "src/shared/codebase/tree.py", 'SUMMARIZER_VERSION = "2"\n', 'SUMMARIZER_VERSION = "3"\n'),
+]
+RUNS = 100
+
+
+def block(search: str, replace: str) -> str:
+    return f"<<<<<<< SEARCH\n{search}=======\n{replace}>>>>>>> REPLACE\n"
+
+
+def timed(content: str, reply: str) -> tuple[str, float]:
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        result = apply_edits(content, parse_edits(reply))
+    return result, (time.perf_counter() - start) / RUNS * 1000
+
+
+def main() -> None:
+    rate = float(os.getenv("DECODE_TOKENS_PER_SECOND", "50"))
+    print(f"generation estimated at {rate:.0f} output tokens/s")
+    print(f"{'file':<32} {'rewrite':>14} {'edit':>14} {'verbatim':>9} {'indented':>9} {'typo':>9}")
+    totals = [0, 0]
+    for path, search, replace in FIXES:
+        content = path.read_text()
+        fixed = content.replace(search, replace, 1)
+        rewrite = count_tokens(f"```python\n{fixed}```")
+        reply = block(search, replace)
+        timings = []
+        middle = len(search) // 2
+        before = content[: content.index(search)].splitlines(keepends=True)
+        context = "".join(before[-2:])
+        for variant in (
+            reply,
+            block("  " + search, "  " + replace),
+            block(context + search[:middle] + search[middle + 1 :], context + replace),
+        ):
+            result, ms = timed(content, variant)
+            assert result == fixed
+            timings.append(ms)
+        edit = count_tokens(reply)
+        totals[0] += rewrite
+        totals[1] += edit
+        name = path.relative_to(ROOT).as_posix().removeprefix("tests/codebases/examples/")
+        print(
+            f"{name:<32} {rewrite:>5} tok {rewrite / rate:>5.1f}s {edit:>5} tok {edit / rate:>5.1f}s"
+            + "".join(f" {ms:>7.2f}ms" for ms in timings)
+        )
+    print(f"{'total':<32} {totals[0]:>5} tok {totals[0] / rate:>5.1f}s {totals[1]:>5} tok {totals[1] / rate:>5.1f}s")
+
+
+if __name__ == "__main__":
+    main()
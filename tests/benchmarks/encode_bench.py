@@ -0,0 +1,69 @@
+"""
+Benchmark: prompt tokens per file of the repo's own tree.
+
+Compares the rich markup of CodebaseTree.__str__ with the compact prompt encoding.
+Summaries are synthetic FileSummary strings listing the top level definitions of each file,
+so no LLM is needed. Tokens are counted with tiktoken (cl100k_base) if its encoding
+can be loaded, otherwise with the chars/4 estimate of view.count_tokens.
+
+Run with: python tests/benchmarks/encode_bench.py
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Callable
+
+from shared.codebase.tree import CodebaseFile, CodebaseTree, FileSummary
+from shared.codebase.view import count_tokens
+from shared.codebase.walk import scan_dir
+
+ROOT = Path(__file__).parents[2]
+DEFINITION = re.compile(r"^(?:async def|def|class) (\w+)", re.MULTILINE)
+
+
+def synthetic_tree(path: Path) -> CodebaseTree:
+    nodes: list[CodebaseFile | CodebaseTree] = []
+    for child, is_dir in scan_dir(path):
+        if is_dir:
+            nodes.append(synthetic_tree(child))
+            continue
+        try:
+            definitions = DEFINITION.findall(child.read_text())
+        except UnicodeDecodeError:
+            definitions = []
+        summary = FileSummary(
+            purpose=f"Implements the {child.stem} part of the codebase.",
+            definitions=[f"{name}: does what {name} says" for name in definitions],
+        )
+        nodes.append(CodebaseFile(child, sha256=child.as_posix(), summary=str(summary)))
+    return CodebaseTree(path, sha256=path.as_posix(), nodes=nodes)
+
+
+def tokenizer() -> tuple[str, Callable[[str], int]]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return "cl100k_base", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "chars/4 estimate", count_tokens
+
+
+def main() -> None:
+    os.chdir(ROOT)
+    tree = synthetic_tree(Path("."))
+    files = tree.file_index.count()
+    name, count = tokenizer()
+    markup, compact = count(str(tree)), count(tree.encode())
+    # everything but the summaries themselves: names, tags and indentation
+    summaries = sum(count(file.summary) for file in tree.files)
+    print(f"{files} files, tokens counted with {name}")
+    print(f"{'':>16} {'tokens':>8} {'per file':>9} {'overhead per file':>18}")
+    for label, tokens in (("__str__ markup", markup), ("compact encode", compact)):
+        print(f"{label:>16} {tokens:>8} {tokens / files:>9.1f} {(tokens - summaries) / files:>18.1f}")
+    print(f"{'saved':>16} {1 - compact / markup:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
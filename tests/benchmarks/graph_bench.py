@@ -0,0 +1,61 @@
+"""
+Benchmark: dependency graph of this repo's own sources.
+
+Builds the graph cold (every file parsed), warm (imports loaded from .context/graph.sqlite)
+and times k-hop neighbor and reverse dependent queries on the synced graph.
+
+Run with: python tests/benchmarks/graph_bench.py
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from shared.codebase import tree
+from shared.codebase.cache import SummaryCache
+from shared.codebase.graph import DependencyGraph
+from shared.codebase.store import TreeStore
+from shared.codebase.tree import CodebaseTree
+
+SOURCES = Path(__file__).parents[2] / "src"
+QUERIES = 10_000
+
+
+def main() -> None:
+    os.environ["FAST_SUMMARIES"] = "true"
+    tree.scheduler.interactive = False
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(SOURCES, Path(tmp) / "src")
+        os.chdir(tmp)
+        tree.summary_cache = SummaryCache(Path(tmp) / ".context" / "summaries.sqlite")
+        store = TreeStore(Path(tmp) / ".context" / "tree.sqlite")
+        built = asyncio.run(CodebaseTree.new(store=store))
+        store.close()
+
+        for label in ("cold", "warm"):
+            graph = DependencyGraph()
+            start = time.perf_counter()
+            parsed = graph.sync(built)
+            print(f"{label} sync: {(time.perf_counter() - start) * 1000:.1f} ms ({parsed} files parsed)")
+            graph.close()
+        os.chdir("/")
+
+    edges = sum(len(targets) for targets in graph.imports.values())
+    print(f"{len(graph.imports)} modules, {edges} import edges")
+    target = max(graph.importers, key=lambda path: len(graph.importers[path]))
+    for label, query in (
+        ("dependents", lambda: graph.dependents(target)),
+        ("neighbors k=1", lambda: graph.neighbors([target], 1)),
+        ("neighbors k=2", lambda: graph.neighbors([target], 2)),
+    ):
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            result = query()
+        print(f"{label:>14}: {(time.perf_counter() - start) / QUERIES * 1e6:.1f} us ({len(result)} files)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark: compiled gitignore matcher vs. per-pattern fnmatch scanning.
+
+Run with: python tests/benchmarks/ignore_bench.py
+"""
+
+import fnmatch
+import os
+import random
+import time
+from typing import Callable
+
+from shared.codebase.ignore import GitIgnore
+
+
+def fnmatch_is_ignored(file_path: str, patterns: list[str]) -> bool:
+    return any(
+        fnmatch.fnmatch(file_path, pattern) or fnmatch.fnmatch(os.path.basename(file_path), pattern)
+        for pattern in patterns
+    )
+
+
+def make_patterns(count: int) -> list[str]:
+    kinds = [
+        lambda i: f"build_{i}",
+        lambda i: f"*.ext{i}",
+        lambda i: f"cache_{i}_*.tmp",
+        lambda i: f"/out_{i}/",
+        lambda i: f"docs/**/draft_{i}.md",
+    ]
+    return [kinds[i % len(kinds)](i) for i in range(count)]
+
+
+def make_paths(count: int) -> list[str]:
+    rng = random.Random(42)
+    dirs = ["src", "src/shared", "src/shared/codebase", "tests", "docs/api"]
+    exts = ["py", "md", "txt", "json", "ext3"]
+    return [f"{rng.choice(dirs)}/file_{i}.{rng.choice(exts)}" for i in range(count)]
+
+
+def timeit(fn: Callable[[str], bool], paths: list[str]) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        fn(path)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    paths = make_paths(2_000)
+    print(f"{'patterns':>10} {'fnmatch (ms)':>14} {'compiled (ms)':>14} {'speedup':>9}")
+    for count in (10, 50, 100, 500, 1_000, 2_000):
+        patterns = make_patterns(count)
+        gitignore = GitIgnore(patterns=patterns)
+
+        legacy = timeit(lambda p: fnmatch_is_ignored(p, patterns), paths)
+        compiled = timeit(lambda p: gitignore.is_ignored(p, is_dir=False), paths)
+
+        print(f"{count:>10} {legacy * 1000:>14.1f} {compiled * 1000:>14.1f} {legacy / compiled:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
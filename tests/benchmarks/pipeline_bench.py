@@ -0,0 +1,85 @@
+"""
+Benchmark: end-to-end time of implement with and without streaming the plan.
+
+The model is simulated with sleeps: the plan streams at DECODE_TOKENS_PER_SECOND (default 50)
+after a first token latency, the planned changes then take EDIT_SECONDS (cycled) to edit,
+as files and edits differ in size. Waiting for the whole plan is compared with dispatching every
+change as soon as StreamedItems returns it. Times are scaled down by SCALE and reported unscaled.
+Pipelining saves the planning time after a change was streamed, so it gains the most
+when the early changes are the long ones and nothing when the last change dominates.
+
+Run with: python tests/benchmarks/pipeline_bench.py
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator
+
+from shared.schemas import PlannedFileChange, PlannedFileChanges
+from shared.schemas.stream import StreamedItems
+
+SCALE = 0.05
+FIRST_TOKEN_SECONDS = 0.8
+EDIT_SECONDS = [6.0, 2.0, 3.0, 1.5]
+# tokens per simulated chunk, fewer sleeps keep the timer overhead out of the result
+CHUNK_TOKENS = 5
+
+
+def plan(files: int) -> str:
+    changes = [
+        {"relative_path": f"./pkg/module_{i}.py", "method": "modify", "description": f"Use the new client in {i}."}
+        for i in range(files)
+    ]
+    return json.dumps({"changes": changes}, indent=2)
+
+
+async def stream(text: str, rate: float) -> AsyncIterator[str]:
+    await asyncio.sleep(FIRST_TOKEN_SECONDS * SCALE)
+    # ~4 chars per token
+    for i in range(0, len(text), 4 * CHUNK_TOKENS):
+        await asyncio.sleep(CHUNK_TOKENS * SCALE / rate)
+        yield text[i : i + 4 * CHUNK_TOKENS]
+
+
+async def generate(change: PlannedFileChange, seconds: float) -> str:
+    await asyncio.sleep(seconds * SCALE)
+    return change.relative_path
+
+
+async def sequential(text: str, rate: float, edits: list[float]) -> float:
+    start = time.perf_counter()
+    streamed = "".join([chunk async for chunk in stream(text, rate)])
+    planned = PlannedFileChanges.model_validate_json(streamed)
+    await asyncio.gather(*(generate(change, edits[i % len(edits)]) for i, change in enumerate(planned.changes)))
+    return (time.perf_counter() - start) / SCALE
+
+
+async def pipelined(text: str, rate: float, edits: list[float]) -> float:
+    start = time.perf_counter()
+    items, generating = StreamedItems(), []
+    async for chunk in stream(text, rate):
+        for item in items.feed(chunk):
+            change = PlannedFileChange.model_validate(item)
+            generating.append(asyncio.ensure_future(generate(change, edits[len(generating) % len(edits)])))
+    await asyncio.gather(*generating)
+    return (time.perf_counter() - start) / SCALE
+
+
+async def main() -> None:
+    rate = float(os.getenv("DECODE_TOKENS_PER_SECOND", "50"))
+    edits = [float(seconds) for seconds in os.getenv("EDIT_SECONDS", "").split(",") if seconds] or EDIT_SECONDS
+    print(f"plan at {rate:.0f} tok/s, edits take {', '.join(f'{seconds:g}' for seconds in edits)} s")
+    print(f"{'files':>5} {'plan tokens':>12} {'planning':>9} {'sequential':>11} {'pipelined':>10}")
+    for files in (1, 3, 6, 12):
+        text = plan(files)
+        planning = FIRST_TOKEN_SECONDS + len(text) / 4 / rate
+        print(
+            f"{files:>5} {len(text) // 4:>12} {planning:>8.1f}s {await sequential(text, rate, edits):>10.1f}s"
+            f" {await pipelined(text, rate, edits):>9.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Benchmark: CodebaseTree.refresh on synthetic flat directories.
+
+Compares the dict based reconciliation against the previous list based one,
+which is only run for 1k entries because it is quadratic.
+
+Run with: python tests/benchmarks/refresh_bench.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from shared.codebase.ignore import is_ignored_by_gitignore
+from shared.codebase.store import TreeStore
+from shared.codebase.tree import CodebaseFile, CodebaseTree
+
+SIZES = (1_000, 10_000, 50_000)
+LEGACY_MAX = 1_000
+
+
+def make_tree(size: int) -> CodebaseTree:
+    nodes = []
+    for i in range(size):
+        path = Path(f"file_{i:05}.py")
+        path.write_text(f"x = {i}\n")
+        file = CodebaseFile(path, sha256=f"{i}", summary="synthetic file")
+        file.update_stat(os.stat(path))
+        nodes.append(file)
+    return CodebaseTree(".", sha256="", nodes=nodes)
+
+
+def legacy_reconcile(tree: CodebaseTree) -> None:
+    node_paths = [node.path for node in tree.nodes]
+    [
+        file_path
+        for file_path in tree.path.iterdir()
+        if not is_ignored_by_gitignore(file_path.as_posix()) and file_path not in node_paths
+    ]
+    node_updates = [
+        node
+        for node in tree.nodes
+        if node.path
+        in [file_path for file_path in tree.path.iterdir() if not is_ignored_by_gitignore(file_path.as_posix())]
+    ]
+    ignored_nodes = [
+        file_path for file_path in tree.path.iterdir() if not is_ignored_by_gitignore(file_path.as_posix())
+    ]
+    deleted_nodes = [node for node in tree.nodes if node.path not in ignored_nodes]
+    nodes = [node for node in tree.nodes if node not in deleted_nodes]
+    [node for node in nodes if node not in node_updates]
+
+
+def main() -> None:
+    print(f"{'entries':>8} {'refresh (ms)':>13} {'legacy reconcile (ms)':>22}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            tree = make_tree(size)
+            store = TreeStore(Path(tmp) / ".context" / "tree.sqlite")
+            asyncio.run(tree.refresh(store=store))  # persist the directory row once
+
+            start = time.perf_counter()
+            asyncio.run(tree.refresh(store=store))
+            refresh = time.perf_counter() - start
+
+            legacy = "-"
+            if size <= LEGACY_MAX:
+                start = time.perf_counter()
+                legacy_reconcile(tree)
+                legacy = f"{(time.perf_counter() - start) * 1000:.0f}"
+
+            store.close()
+            os.chdir("/")
+        print(f"{size:>8} {refresh * 1000:>13.0f} {legacy:>22}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: rendering a synthetic 50k file tree for prompts.
+
+Compares the cached render against the previous string concatenation,
+cold, warm and after one file changed.
+
+Run with: python tests/benchmarks/render_bench.py
+"""
+
+import time
+
+from shared.codebase.tree import CodebaseFile, CodebaseNode, CodebaseTree
+
+DIRS = 500
+FILES_PER_DIR = 100
+
+
+def make_tree() -> CodebaseTree:
+    dirs = [
+        CodebaseTree(
+            f"pkg_{d:03}",
+            sha256=f"dir{d}",
+            nodes=[
+                CodebaseFile(f"pkg_{d:03}/file_{f:03}.py", sha256=f"{d}:{f}", summary=f"synthetic file {f}")
+                for f in range(FILES_PER_DIR)
+            ],
+        )
+        for d in range(DIRS)
+    ]
+    return CodebaseTree(".", sha256="root", nodes=dirs)
+
+
+def legacy_str(node: CodebaseNode, indent: int = 0) -> str:
+    if isinstance(node, CodebaseFile):
+        return (
+            " " * indent + f"<file {node.path.name}>" + f": [green]{node.summary}[/green] </endfile {node.path.name}>"
+        )
+    assert isinstance(node, CodebaseTree)
+    folder_str = " " * indent + f"<folder {node.path.name}>\n"
+    for child in node.nodes:
+        folder_str += legacy_str(child, indent + 2) + "\n"
+    folder_str += " " * indent + f"</endfolder {node.path.name}>\n"
+    return folder_str
+
+
+def timed(render: object) -> tuple[float, str]:
+    start = time.perf_counter()
+    text = render()  # type: ignore
+    return (time.perf_counter() - start) * 1000, text
+
+
+def main() -> None:
+    tree = make_tree()
+    legacy, expected = timed(lambda: legacy_str(tree))
+    cold, text = timed(tree.show)
+    assert text == expected
+    warm, _ = timed(tree.show)
+
+    # one changed file changes the hashes of its folder and the root
+    changed = tree.nodes[0]
+    assert isinstance(changed, CodebaseTree)
+    changed.nodes[0] = CodebaseFile(changed.nodes[0].name, sha256="changed", summary="changed file")
+    changed.sha256, tree.sha256 = "dir0-changed", "root-changed"
+    incremental, text = timed(tree.show)
+    assert text == legacy_str(tree)
+    streamed, _ = timed(lambda: "".join(tree.stream()))
+
+    print(f"{DIRS * FILES_PER_DIR} files")
+    print(f"{'legacy concat':>16} {legacy:>8.1f} ms")
+    print(f"{'cold render':>16} {cold:>8.1f} ms")
+    print(f"{'warm render':>16} {warm:>8.3f} ms")
+    print(f"{'one file changed':>16} {incremental:>8.1f} ms")
+    print(f"{'warm stream':>16} {streamed:>8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: fuzzy path resolution on a synthetic 100k file tree.
+Realistic names are built from a small vocabulary, so many paths look alike.
+
+Run with: python tests/benchmarks/resolve_bench.py
+"""
+
+import random
+import time
+
+from shared.codebase.resolve import PathResolver
+
+FILES = 100_000
+WORDS = (
+    "api auth billing cache client config core data db events handlers helpers http jobs logging "
+    "mail metrics models orders payments queue reports routes schemas search services session "
+    "storage tasks tests users utils validators views workers"
+).split()
+QUERIES = {
+    "exact": "services/payments/handlers/orders_client.py",
+    "typo in directory": "services/payment/handlers/orders_client.py",
+    "typo in basename": "services/payments/handlers/order_client.py",
+    "missing directories": "handlers/orders_client.py",
+    "typo without directories": "ordres_client.py",
+    "ambiguous basename": "__init__.py",
+    "unknown": "frontend/components/Button.tsx",
+}
+
+
+def make_paths(count: int) -> list[str]:
+    random.seed(0)
+    paths = {"services/payments/handlers/orders_client.py"}
+    while len(paths) < count:
+        directories = random.sample(WORDS, random.randint(1, 4))
+        name = random.choice(["__init__", "_".join(random.sample(WORDS, 2)) + f"_{random.randint(0, 99)}"])
+        paths.add("/".join(directories) + f"/{name}.py")
+    return sorted(paths)
+
+
+def main() -> None:
+    paths = make_paths(FILES)
+    start = time.perf_counter()
+    resolver = PathResolver(paths)
+    print(f"build for {len(paths)} paths: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # the first typo without directories also builds the bigram index
+    print(f"{'query':>26} {'cold ms':>8} {'warm ms':>8}  best match")
+    for name, query in QUERIES.items():
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            matches = resolver.resolve(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:>26} {timings[0]:>8.2f} {timings[1]:>8.2f}  {matches[0] if matches else '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: cold index of a synthetic 5k file Python repo in fast mode.
+
+The files are copies of this repo's own modules (made unique so the summary cache
+cannot deduplicate them). Fast summaries never call the LLM, definitions come
+from the AST and large files are parsed in a process pool.
+
+Run with: python tests/benchmarks/structure_bench.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from shared.codebase import tree
+from shared.codebase.cache import SummaryCache
+from shared.codebase.store import TreeStore
+from shared.codebase.tree import CodebaseTree
+
+FILES = 5_000
+FILES_PER_DIR = 50
+SOURCES = sorted((Path(__file__).parents[2] / "src").rglob("*.py"))
+
+
+def make_repo(root: Path) -> None:
+    sources = [source.read_text() for source in SOURCES if source.stat().st_size]
+    for i in range(FILES):
+        directory = root / f"pkg_{i // FILES_PER_DIR:03}"
+        directory.mkdir(exist_ok=True)
+        (directory / f"module_{i:04}.py").write_text(f"# copy {i}\n{sources[i % len(sources)]}")
+
+
+def main() -> None:
+    os.environ["FAST_SUMMARIES"] = "true"
+    tree.scheduler.interactive = False
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        make_repo(Path(tmp))
+        tree.summary_cache = SummaryCache(Path(tmp) / ".context" / "summaries.sqlite")
+        store = TreeStore(Path(tmp) / ".context" / "tree.sqlite")
+
+        start = time.perf_counter()
+        built = asyncio.run(CodebaseTree.new(store=store))
+        cold = time.perf_counter() - start
+        store.close()
+        os.chdir("/")
+
+    files = built.file_index.count()
+    definitions = sum(file.summary.count("def ") for file in built.files)
+    print(f"{files} files, {definitions} function definitions, no LLM calls")
+    print(f"cold index: {cold:.1f} s ({cold / files * 1000:.2f} ms per file)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: vector index over a synthetic 50k file tree with the hashing embedder.
+
+Measures the initial sync (embedding every file), a warm sync with nothing changed,
+reopening the memory mapped matrix and the brute force top-k query.
+
+Run with: python tests/benchmarks/vectors_bench.py
+"""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from shared.codebase.tree import CodebaseFile, CodebaseTree
+from shared.codebase.vectors import HashingEmbedder, VectorIndex
+
+DIRS = 500
+FILES_PER_DIR = 100
+QUERIES = 100
+
+
+def make_tree() -> CodebaseTree:
+    dirs = [
+        CodebaseTree(
+            f"pkg_{d:03}",
+            sha256=f"dir{d}",
+            nodes=[
+                CodebaseFile(
+                    f"pkg_{d:03}/module_{f:03}.py",
+                    sha256=f"{d}:{f}",
+                    summary=f"purpose='handles feature {d * FILES_PER_DIR + f}' definitions=['Handler{f}: does work']",
+                )
+                for f in range(FILES_PER_DIR)
+            ],
+        )
+        for d in range(DIRS)
+    ]
+    return CodebaseTree(".", sha256="root", nodes=dirs)
+
+
+def main() -> None:
+    tree = make_tree()
+    embedder = HashingEmbedder()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "vectors.npy"
+        index = VectorIndex(path, embedder)
+
+        start = time.perf_counter()
+        asyncio.run(index.sync(tree))
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        asyncio.run(index.sync(tree))
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = VectorIndex(path, embedder)
+        reopen = time.perf_counter() - start
+
+        async def queries() -> None:
+            for i in range(QUERIES):
+                await index.search(f"where is feature {i * 37} handled", k=10)
+
+        start = time.perf_counter()
+        asyncio.run(queries())
+        query = (time.perf_counter() - start) / QUERIES
+
+    print(f"{DIRS * FILES_PER_DIR} files, {embedder.dimensions} dimensions")
+    print(f"{'cold sync':>12} {cold * 1000:>9.0f} ms")
+    print(f"{'warm sync':>12} {warm * 1000:>9.0f} ms")
+    print(f"{'reopen':>12} {reopen * 1000:>9.1f} ms")
+    print(f"{'top-10 query':>12} {query * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: directory walk of a JS style repo with a large node_modules.
+
+Compares the previous rglob(".gitignore") discovery plus iterdir/is_file walk
+against the pruned scandir walker, which never enters ignored directories.
+
+Run with: python tests/benchmarks/walk_bench.py
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from shared.codebase.ignore import GitIgnore, gitignore
+from shared.codebase.walk import walk
+
+TRACKED_FILES = 2_000
+NODE_MODULES_FILES = (10_000, 100_000)
+FILES_PER_DIR = 50
+
+
+def make_files(root: Path, count: int) -> None:
+    for i in range(count):
+        directory = root / f"dir_{i // FILES_PER_DIR:05}"
+        if i % FILES_PER_DIR == 0:
+            directory.mkdir(parents=True)
+        (directory / f"file_{i:06}.js").write_text("")
+
+
+def legacy_walk() -> int:
+    matcher = GitIgnore(load_files=False)
+    for gitignore_file in Path(".").rglob(".gitignore"):
+        matcher.add_file(gitignore_file)
+    count, dirs = 0, [Path(".")]
+    while dirs:
+        for path in dirs.pop().iterdir():
+            if matcher.is_ignored(path.as_posix()):
+                continue
+            if path.is_file():
+                count += 1
+            else:
+                dirs.append(path)
+    return count
+
+
+def pruned_walk() -> int:
+    gitignore.clear()
+    return sum(not entry.is_dir() for _, entries in walk() for entry in entries)
+
+
+def main() -> None:
+    print(f"{'node_modules':>12} {'tracked':>8} {'legacy (ms)':>12} {'pruned (ms)':>12}")
+    for size in NODE_MODULES_FILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            make_files(Path("src"), TRACKED_FILES)
+            make_files(Path("node_modules"), size)
+            Path(".gitignore").write_text("node_modules/\n")
+
+            start = time.perf_counter()
+            legacy_count = legacy_walk()
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pruned_count = pruned_walk()
+            pruned = time.perf_counter() - start
+
+            assert legacy_count == pruned_count
+            os.chdir("/")
+        print(f"{size:>12} {pruned_count:>8} {legacy * 1000:>12.0f} {pruned * 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
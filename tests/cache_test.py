@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from shared.codebase.cache import SummaryCache
+
+
+def test_get_set_by_content_and_version(tmp_path: Path) -> None:
+    cache = SummaryCache(tmp_path / "summaries.sqlite")
+    cache.set("abc", "1", "summary v1")
+
+    assert cache.get("abc", "1") == "summary v1"
+    assert cache.get("abc", "2") is None
+    assert cache.get("def", "1") is None
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    cache = SummaryCache(tmp_path / "summaries.sqlite", max_bytes=20)
+    cache.set("a", "1", "x" * 8)
+    cache.set("b", "1", "x" * 8)
+    assert cache.get("a", "1")
+
+    cache.set("c", "1", "x" * 8)
+
+    assert cache.get("a", "1") and cache.get("c", "1")
+    assert cache.get("b", "1") is None
@@ -0,0 +1,77 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from shared.codebase import chunks
+from shared.codebase.chunks import ChunkIndex, chunk_file, render_chunks
+from shared.codebase.tree import CodebaseTree
+
+SOURCE = '''import os
+
+
+class Client:
+    """HTTP client."""
+
+    timeout = 10
+
+    def get(self, url: str) -> str:
+        return os.getenv(url)
+
+    @staticmethod
+    def post(url: str) -> None:
+        pass
+
+
+def main() -> None:
+    Client().get("HOME")
+'''
+
+
+def test_chunks_follow_definitions(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert [(chunk.start, chunk.end, chunk.signature) for chunk in chunk_file("client.py", SOURCE)] == [
+        (1, 1, None),
+        (4, 14, "class Client: HTTP client."),
+        (17, 18, "def main() -> None"),
+    ]
+    # long classes are split into their methods
+    monkeypatch.setattr(chunks, "MAX_CHUNK_LINES", 5)
+    split = chunk_file("client.py", SOURCE)
+    assert [(chunk.start, chunk.end) for chunk in split] == [(1, 1), (4, 7), (9, 10), (12, 14), (17, 18)]
+    assert split[3].signature == "    def post(url: str) -> None"
+    assert len({chunk.sha256 for chunk in split}) == 5
+
+    assert render_chunks(SOURCE, split, {split[2].id}) == "\n".join(
+        [
+            "...",
+            "class Client: HTTP client. ...",
+            "    def get(self, url: str) -> str:",
+            "        return os.getenv(url)",
+            "    def post(url: str) -> None ...",
+            "def main() -> None ...",
+        ]
+    )
+
+    monkeypatch.setattr(chunks, "WINDOW_LINES", 8)
+    assert [(chunk.start, chunk.end) for chunk in chunk_file("client.js", SOURCE)] == [(1, 7), (9, 14), (17, 18)]
+
+
+def test_index_ranks_chunks(summaries: list[str]) -> None:
+    Path("client.py").write_text(SOURCE)
+    Path("README.md").write_text("# Client\nrun main\n")
+    index = ChunkIndex(".context/chunks.sqlite")
+
+    tree = asyncio.run(CodebaseTree.load())
+    assert index.sync(tree) == 2
+    assert index.sync(tree) == 0
+    (best, _), *_ = index.search_chunks("post a url")
+    assert (best.path, best.start, best.end) == ("client.py", 4, 14)
+
+    Path("client.py").write_text(SOURCE.replace("def post(url", "def put(url"))
+    tree = asyncio.run(CodebaseTree.load())
+    assert index.sync(tree) == 1
+    assert [chunk.path for chunk, _ in index.search_chunks("run main")] == ["README.md", "client.py"]
+    assert index.search_chunks("post") == []
+    # ranked within the files of the first retrieval stage
+    assert [chunk.path for chunk, _ in index.search_chunks("run main", paths={"client.py"})] == ["client.py"]
+    index.close()
@@ -0,0 +1,153 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from shared.codebase.graph import DependencyGraph
+from shared.codebase.local.codebase import LocalCodebase
+from shared.codebase.local.tree import LocalCodebaseTree
+from shared.codebase.search import SearchIndex
+from shared.codebase.tree import CodebaseFile, CodebaseTree
+from shared.codebase.vectors import VectorIndex
+
+
+class FakeLoads:
+    def __init__(self) -> None:
+        self.trees: list[CodebaseTree] = []
+        self.errors: list[Exception] = []
+
+    async def load(self, *_: Any) -> CodebaseTree:
+        await asyncio.sleep(0.01)
+        if self.errors:
+            raise self.errors.pop()
+        self.trees.append(CodebaseTree(".", sha256=str(len(self.trees))))
+        return self.trees[-1]
+
+
+@pytest.fixture
+def loads(monkeypatch: pytest.MonkeyPatch) -> FakeLoads:
+    fake = FakeLoads()
+    monkeypatch.setattr(LocalCodebaseTree, "load", fake.load)
+    return fake
+
+
+def test_load_tree_is_single_flight(loads: FakeLoads) -> None:
+    codebase = LocalCodebase()
+
+    async def main() -> list[CodebaseTree]:
+        return await asyncio.gather(*(codebase.load_tree({"goal": i}) for i in range(5)))
+
+    trees = asyncio.run(main())
+
+    assert len(loads.trees) == 1
+    assert all(tree is loads.trees[0] for tree in trees)
+
+
+def test_load_tree_until_invalidated(loads: FakeLoads) -> None:
+    codebase = LocalCodebase()
+
+    async def main() -> None:
+        first = await codebase.load_tree()
+        assert await codebase.load_tree() is first
+
+        codebase.invalidate_tree()
+        assert await codebase.load_tree() is not first
+        assert len(loads.trees) == 2
+
+        # failed loads are not cached
+        codebase.invalidate_tree()
+        loads.errors.append(OSError("store is locked"))
+        with pytest.raises(OSError):
+            await codebase.load_tree()
+        assert await codebase.load_tree() is loads.trees[2]
+
+    asyncio.run(main())
+
+
+def test_fix_file_path_resolves_locally(monkeypatch: pytest.MonkeyPatch) -> None:
+    utils = CodebaseTree("src/utils", sha256="", nodes=[CodebaseFile("src/utils/helpers.py", sha256="", summary="")])
+    tree = CodebaseTree(".", sha256="", nodes=[CodebaseTree("src", sha256="", nodes=[utils])])
+
+    async def load(*_: Any) -> CodebaseTree:
+        return tree
+
+    monkeypatch.setattr(LocalCodebaseTree, "load", load)
+    codebase = LocalCodebase()
+
+    assert asyncio.run(codebase.fix_file_path("./src/util/helpers.py")) == "src/utils/helpers.py"
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(codebase.fix_file_path("src/new_module.py"))
+    assert asyncio.run(codebase.fix_file_path("./src/utils/helpers.py", fuzzy=False)) == "src/utils/helpers.py"
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(codebase.fix_file_path("src/util/helpers.py", fuzzy=False))
+
+
+def test_dependency_graph_per_snapshot(loads: FakeLoads, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.chdir(tmp_path)
+    syncs: list[CodebaseTree] = []
+
+    def sync(self: DependencyGraph, tree: CodebaseTree) -> int:
+        syncs.append(tree)
+        return 0
+
+    monkeypatch.setattr(DependencyGraph, "sync", sync)
+    codebase = LocalCodebase()
+
+    async def main() -> None:
+        graphs = await asyncio.gather(*(codebase.dependency_graph() for _ in range(3)))
+        assert await codebase.related_files(["main.py"]) == []
+        assert all(graph is graphs[0] for graph in graphs) and syncs == loads.trees
+
+        codebase.invalidate_tree()
+        assert await codebase.dependency_graph() is not graphs[0]
+        assert syncs == loads.trees and len(syncs) == 2
+
+    asyncio.run(main())
+
+
+def test_vector_index_per_snapshot(loads: FakeLoads, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.chdir(tmp_path)
+    syncs: list[CodebaseTree] = []
+
+    async def sync(self: VectorIndex, tree: CodebaseTree) -> int:
+        syncs.append(tree)
+        return 0
+
+    monkeypatch.setattr(VectorIndex, "sync", sync)
+    codebase = LocalCodebase()
+
+    async def main() -> None:
+        assert await codebase.relevant_files("websocket") == []
+        assert await codebase.relevant_files("client") == []
+        assert syncs == loads.trees
+
+        codebase.invalidate_tree()
+        await codebase.relevant_files("client")
+        assert syncs == loads.trees and len(syncs) == 2
+
+    asyncio.run(main())
+
+
+def test_search_indexes_per_snapshot(loads: FakeLoads, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.chdir(tmp_path)
+    syncs: list[tuple[str, CodebaseTree]] = []
+
+    def sync(self: SearchIndex, tree: CodebaseTree) -> int:
+        syncs.append((type(self).__name__, tree))
+        return 0
+
+    monkeypatch.setattr(SearchIndex, "sync", sync)
+    codebase = LocalCodebase()
+
+    async def main() -> None:
+        await asyncio.gather(codebase.search("websocket"), codebase.search("client"))
+        assert await codebase.search("daemon") == []
+        await asyncio.gather(codebase.relevant_code("websocket"), codebase.relevant_code("client"))
+        assert syncs == [("SearchIndex", loads.trees[0]), ("ChunkIndex", loads.trees[0])]
+
+        codebase.invalidate_tree()
+        await codebase.search("client")
+        assert syncs[-1] == ("SearchIndex", loads.trees[1]) and len(syncs) == 3
+
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pytest
+
+from shared.codebase import tree
+from shared.codebase.cache import SummaryCache
+from shared.codebase.ignore import gitignore
+from shared.codebase.tree import FileSummary
+
+
+@pytest.fixture(autouse=True)
+def fresh_gitignore() -> None:
+    # the global matcher caches .gitignore files by relative path, every test has its own repo
+    gitignore.clear()
+
+
+@pytest.fixture
+def summaries(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> list[str]:
+    calls: list[str] = []
+
+    async def summarize_file(file_content: str) -> FileSummary:
+        calls.append(file_content)
+        return FileSummary(purpose=file_content, definitions=[])
+
+    async def summarize_purpose(file_content: str) -> str:
+        calls.append(file_content)
+        return file_content
+
+    monkeypatch.setattr(tree, "summarize_file", summarize_file)
+    monkeypatch.setattr(tree, "summarize_purpose", summarize_purpose)
+    monkeypatch.setattr(tree, "summary_cache", SummaryCache(tmp_path / "cache" / "summaries.sqlite"))
+    (tmp_path / "repo").mkdir()
+    monkeypatch.chdir(tmp_path / "repo")
+    return calls
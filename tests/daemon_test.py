@@ -0,0 +1,92 @@
+import asyncio
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from shared.codebase import tree
+from shared.codebase.local.codebase import LocalCodebase
+from shared.codebase.local.daemon import InotifyWatcher, PollingWatcher, TreeDaemon, Watcher, fetch_tree
+from shared.codebase.local.tree import LocalCodebaseTree
+
+
+async def wait_for_refresh(daemon: TreeDaemon, refreshes: int) -> None:
+    for _ in range(200):
+        if daemon.refreshes >= refreshes:
+            return
+        await asyncio.sleep(0.02)
+    raise TimeoutError
+
+
+async def run_daemon(make_watcher: Callable[[], Watcher], burst_delay: float) -> tuple[TreeDaemon, LocalCodebaseTree]:
+    daemon = TreeDaemon(LocalCodebase(), debounce=0.2)
+    task = asyncio.create_task(daemon.serve(make_watcher()))
+    while await fetch_tree() is None:
+        await asyncio.sleep(0.02)
+
+    for name in ["a.py", "b.py", "c.py"]:
+        Path(name).write_text(name)
+        await asyncio.sleep(burst_delay)
+    await wait_for_refresh(daemon, 1)
+    await asyncio.sleep(0.3)
+    tree = await LocalCodebaseTree.load()
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return daemon, tree
+
+
+def test_daemon_serves_refreshed_snapshot(summaries: list[str]) -> None:
+    Path("main.py").write_text("main.py")
+
+    def make_watcher() -> PollingWatcher:
+        return PollingWatcher(interval=0.05)
+
+    _, tree = asyncio.run(run_daemon(make_watcher, 0))
+
+    assert [file.name for file in tree.files] == ["a.py", "b.py", "c.py", "main.py"]
+    assert sorted(summaries) == ["a.py", "b.py", "c.py", "main.py"]
+    assert not Path(".context/daemon.sock").exists()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is linux only")
+def test_daemon_debounces_inotify_bursts(summaries: list[str]) -> None:
+    Path("main.py").write_text("main.py")
+
+    daemon, tree = asyncio.run(run_daemon(InotifyWatcher, 0.05))
+
+    assert daemon.refreshes == 1
+    assert [file.name for file in tree.files] == ["a.py", "b.py", "c.py", "main.py"]
+
+
+def test_refresh_does_not_wait_for_summaries(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    Path("main.py").write_text("main.py")
+
+    async def main() -> None:
+        daemon = TreeDaemon(LocalCodebase(), enrich_interval=0.05)
+        daemon.tree = await LocalCodebaseTree.load(daemon=False)
+        release = asyncio.Event()
+
+        async def summarize_purpose(file_content: str) -> str:
+            await release.wait()
+            summaries.append(file_content)
+            return file_content
+
+        monkeypatch.setattr(tree, "summarize_purpose", summarize_purpose)
+        Path("a.py").write_text('"""Client."""\nimport json\n')
+        await asyncio.wait_for(daemon.refresh({"a.py"}), 1)
+        new_file = daemon.tree.files[0]
+        assert new_file.placeholder and "Client." in new_file.summary
+
+        enrichment = asyncio.create_task(daemon._enrich())
+        release.set()
+        for _ in range(100):
+            if not new_file.placeholder:
+                break
+            await asyncio.sleep(0.02)
+        enrichment.cancel()
+        assert b"placeholder" not in daemon.snapshot
+        assert summaries[-1] == '"""Client."""\nimport json\n'
+
+    asyncio.run(main())
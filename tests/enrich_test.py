@@ -0,0 +1,83 @@
+import asyncio
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from shared.codebase.enrich import EnrichmentQueue, enrich
+from shared.codebase.store import TreeStore
+from shared.codebase.tree import CodebaseTree
+
+
+def test_queue_order_survives_reopening(tmp_path: Path) -> None:
+    queue = EnrichmentQueue(tmp_path / "enrich.sqlite")
+    queue.push("pkg/big.py", "a", 900)
+    queue.push("pkg/small.py", "b", 10)
+    queue.push("main.py", "c", 500)
+    assert queue.take() == ("main.py", "c")
+    assert queue.take({"main.py"}) == ("pkg/small.py", "b")
+
+    queue.prioritize(["pkg/big.py"])
+    queue.push("pkg/big.py", "d", 950)
+    queue.done("main.py", "c")
+    queue.close()
+    queue = EnrichmentQueue(tmp_path / "enrich.sqlite")
+    assert len(queue) == 2
+    assert queue.take() == ("pkg/big.py", "d")
+    # only the summarized version leaves the queue
+    queue.done("pkg/big.py", "a")
+    assert queue.take() == ("pkg/big.py", "d")
+
+
+def test_placeholders_are_upgraded(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("BACKGROUND_SUMMARIES", "true")
+    Path("pkg").mkdir()
+    Path("pkg/ws.py").write_text('"""WebSocket messages."""\n\nclass WSMessage: ...\n')
+    Path("main.py").write_text("print('hello')\n")
+
+    tree = asyncio.run(CodebaseTree.load())
+    assert summaries == []
+    assert all(file.placeholder for file in tree.files)
+    assert "WebSocket messages." in tree.render()
+    queue = EnrichmentQueue.open()
+    assert len(queue) == 2
+
+    queue.prioritize(["pkg/ws.py"])
+    assert asyncio.run(enrich(queue, limit=1)) == 1
+    assert summaries == [Path("pkg/ws.py").read_text()]
+    assert tree.upgrade_summaries() == 1
+    # the cached folder renderings must not keep the placeholder
+    assert 'purpose=\'"""WebSocket messages.' in tree.render()
+    assert 'purpose=\'"""WebSocket messages.' in tree.encode()
+
+    tree = asyncio.run(CodebaseTree.load())
+    assert [file.name for file in tree.files if file.placeholder] == ["main.py"]
+    assert asyncio.run(enrich(queue)) == 1
+    assert len(queue) == 0
+    assert asyncio.run(CodebaseTree.load()).upgrade_summaries() == 0
+
+
+def test_stale_placeholders_are_summarized(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("BACKGROUND_SUMMARIES", "true")
+    Path("pkg").mkdir()
+    Path("pkg/ws.py").write_text("class WSMessage: ...\n")
+    Path("main.py").write_text("print('hello')\n")
+    Path(".gitignore").write_text(".context\n")
+    git = "git -c user.name=codr -c user.email=codr@example.com"
+    subprocess.run(f"git init -q && git add . && {git} commit -q -m init", shell=True, check=True)
+    asyncio.run(CodebaseTree.load())
+
+    # entries done for content that changed and changed back before the next refresh
+    queue = EnrichmentQueue.open()
+    while item := queue.take():
+        queue.done(*item)
+    tree = asyncio.run(CodebaseTree.load())
+    assert all(file.placeholder for file in tree.files)
+    assert len(queue) == len(tree.files) == 3
+
+    # nothing upgrades placeholders without background summaries, even in subtrees git reports unchanged
+    monkeypatch.setenv("BACKGROUND_SUMMARIES", "false")
+    tree = asyncio.run(CodebaseTree.load())
+    assert not any(file.placeholder for file in tree.files)
+    assert sorted(summaries) == [".context\n", "class WSMessage: ...\n", "print('hello')\n"]
+    assert CodebaseTree.from_dict(TreeStore.open().load() or {}) == tree
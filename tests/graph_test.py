@@ -0,0 +1,51 @@
+import asyncio
+from pathlib import Path
+
+from shared.codebase.graph import DependencyGraph, python_imports
+from shared.codebase.tree import CodebaseTree
+
+
+def test_python_imports() -> None:
+    content = "import os.path\nfrom ..schemas import Task\nfrom .models import *\n\ndef f():\n    from . import x\n"
+    assert python_imports(content) == [
+        ("os.path", 0, []),
+        ("schemas", 2, ["Task"]),
+        ("models", 1, []),
+        ("", 1, ["x"]),
+    ]
+    assert python_imports("def broken(:") == []
+
+
+def test_graph_syncs_incrementally(summaries: list[str]) -> None:
+    for folder in ("src/shared/schemas", "src/codr", "web"):
+        Path(folder).mkdir(parents=True)
+    Path("src/shared/__init__.py").write_text("")
+    Path("src/shared/schemas/__init__.py").write_text("from .prompting import Task\n")
+    Path("src/shared/schemas/prompting.py").write_text("import json\n")
+    Path("src/codr/implement.py").write_text("from shared.schemas import prompting\n")
+    Path("src/codr/ask.py").write_text("from shared.schemas import Task\nfrom . import implement\n")
+    Path("web/app.ts").write_text("import { api } from './api'\nimport React from 'react'\n")
+    Path("web/api.ts").write_text("export const api = 1\n")
+    graph = DependencyGraph(".context/graph.sqlite")
+
+    tree = asyncio.run(CodebaseTree.load())
+    assert graph.sync(tree) == 7
+    assert graph.dependents("src/shared/schemas/prompting.py") == {
+        "src/shared/schemas/__init__.py",
+        "src/codr/implement.py",
+    }
+    assert graph.dependencies("src/codr/ask.py") == {"src/shared/schemas/__init__.py", "src/codr/implement.py"}
+    assert graph.dependencies("web/app.ts") == {"web/api.ts"}
+    assert graph.neighbors(["src/shared/schemas/prompting.py"]) == {
+        "src/shared/schemas/__init__.py": 1,
+        "src/codr/implement.py": 1,
+    }
+    assert graph.neighbors(["src/shared/schemas/prompting.py"], hops=2)["src/codr/ask.py"] == 2
+
+    Path("src/codr/implement.py").write_text("import json\n")
+    graph.close()
+    graph = DependencyGraph(".context/graph.sqlite")
+    tree = asyncio.run(CodebaseTree.load())
+    assert graph.sync(tree) == 1
+    assert graph.dependents("src/shared/schemas/prompting.py") == {"src/shared/schemas/__init__.py"}
+    graph.close()
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from shared.codebase.ignore import GitIgnore
+
+
+def make_gitignore(rules: dict[str, list[str]]) -> GitIgnore:
+    gitignore = GitIgnore(patterns=[".git"], load_files=False)
+    for base, patterns in rules.items():
+        gitignore.add_patterns(base, patterns)
+    return gitignore
+
+
+def test_basename_suffix_and_glob() -> None:
+    gitignore = make_gitignore({".": ["dist", "*.log", "temp?.txt", "*.py[co]"]})
+
+    assert gitignore.is_ignored("dist", is_dir=True)
+    assert gitignore.is_ignored("src/dist/bundle.js", is_dir=False)
+    assert gitignore.is_ignored("src/debug.log", is_dir=False)
+    assert gitignore.is_ignored("temp1.txt", is_dir=False)
+    assert gitignore.is_ignored("src/cache.pyc", is_dir=False)
+    assert not gitignore.is_ignored("src/main.py", is_dir=False)
+    assert not gitignore.is_ignored("temp10.txt", is_dir=False)
+
+
+def test_anchoring_and_double_star() -> None:
+    gitignore = make_gitignore({".": ["/build", "docs/*.md", "**/generated/**"]})
+
+    assert gitignore.is_ignored("build", is_dir=True)
+    assert not gitignore.is_ignored("src/build", is_dir=True)
+    assert gitignore.is_ignored("docs/index.md", is_dir=False)
+    assert not gitignore.is_ignored("docs/api/index.md", is_dir=False)
+    assert gitignore.is_ignored("src/generated/schema.py", is_dir=False)
+
+
+def test_negation_last_match_wins() -> None:
+    gitignore = make_gitignore({".": ["*.env", "!example.env", "secrets/"]})
+
+    assert gitignore.is_ignored("prod.env", is_dir=False)
+    assert not gitignore.is_ignored("example.env", is_dir=False)
+    assert gitignore.is_ignored("secrets", is_dir=True)
+    assert not gitignore.is_ignored("secrets", is_dir=False)
+
+
+def test_directory_scope() -> None:
+    gitignore = make_gitignore({".": ["*.tmp"], "web": ["/out", "!keep.tmp"]})
+
+    assert gitignore.is_ignored("web/out", is_dir=True)
+    assert not gitignore.is_ignored("out", is_dir=True)
+    assert not gitignore.is_ignored("web/keep.tmp", is_dir=False)
+    assert gitignore.is_ignored("keep.tmp", is_dir=False)
+    assert gitignore.is_ignored(".git/config", is_dir=False)
+
+
+def test_lazy_gitignore_files(tmp_path: Path) -> None:
+    (tmp_path / "web" / "dist").mkdir(parents=True)
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    (tmp_path / "web" / ".gitignore").write_text("dist/\n!keep.log\n")
+    gitignore = GitIgnore(root=tmp_path)
+
+    assert gitignore.is_ignored("debug.log")
+    assert gitignore.is_ignored("web/dist/app.js")
+    assert not gitignore.is_ignored("web/keep.log")
+    assert not gitignore.is_ignored("dist/app.js")
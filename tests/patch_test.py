@@ -0,0 +1,54 @@
+import pytest
+
+from shared.codebase.patch import PatchError, apply_edits, parse_edits
+
+SOURCE = """def calculate_average(numbers):
+    total = 0
+    for num in numbers:
+        total = num
+    return total / len(numbers)
+"""
+
+
+def test_parse_edits() -> None:
+    blocks = "Fix:\n<<<<<<< SEARCH\n        total = num\n=======\n        total += num\n>>>>>>> REPLACE\n"
+    assert parse_edits(blocks) == [("        total = num\n", "        total += num\n")]
+    diff = "--- a/main.py\n+++ b/main.py\n@@ -3,3 +3,3 @@\n"
+    diff += "     for num in numbers:\n-        total = num\n+        total += num\n"
+    assert parse_edits(diff) == [
+        ("    for num in numbers:\n        total = num\n", "    for num in numbers:\n        total += num\n")
+    ]
+    assert parse_edits("no edits here") == []
+
+
+def test_apply_edits() -> None:
+    fixed = SOURCE.replace("total = num", "total += num")
+    assert apply_edits(SOURCE, [("        total = num\n", "        total += num\n")]) == fixed
+    # written without indentation
+    loop = "for num in numbers:\n    total = num\n"
+    assert apply_edits(SOURCE, [(loop, loop.replace("total =", "total +="))]) == fixed
+    # misremembered details, with enough lines around them
+    loop = "total = 0\nfor n in numbers:\n    total = n"
+    assert apply_edits(SOURCE, [(loop, "total = 0\nfor num in numbers:\n    total += num")]) == fixed
+    with pytest.raises(PatchError):
+        apply_edits(SOURCE, [("for n in numbers:\n    total = n", "for num in numbers:\n    total += num")])
+    assert apply_edits("", [("", "print('hi')\n")]) == "print('hi')\n"
+    # whole lines only, not the end of another line
+    assert apply_edits("max = 1\nx = 1\n", [("x = 1\n", "x = 2\n")]) == "max = 1\nx = 2\n"
+
+    with pytest.raises(PatchError):
+        apply_edits(SOURCE, [("while True:\n    pass\n", "")])
+    with pytest.raises(PatchError):
+        apply_edits(SOURCE, [])
+    # ambiguous blocks are left to the whole file fallback
+    with pytest.raises(PatchError):
+        apply_edits("def a():\n    return 1\n\ndef b():\n    return 1\n", [("    return 1\n", "    return 2\n")])
+    with pytest.raises(PatchError):
+        apply_edits("if a:\n    x = 1\nif b:\n  x = 1\n", [("x = 1", "x = 2")])
+    # near duplicates are not guessed either
+    near = "def f():\n    return foo(a, c)\n\ndef g():\n    return foo(a, d)\n"
+    with pytest.raises(PatchError):
+        apply_edits(near, [("    return foo(a, b)\n", "    return foo(a, x)\n")])
+    with pytest.raises(PatchError):
+        block = "for item in items:\n    total += item.price\n    count += 1\n"
+        apply_edits(block + block.replace("+= 1", "+= 2"), [(block.replace("+= 1", "+= 3"), "")])
@@ -0,0 +1,57 @@
+from shared.codebase.resolve import PathResolver, edit_distance, normalize_path
+
+PATHS = [
+    "README.md",
+    "src/utils/helpers.py",
+    "src/utils/__init__.py",
+    "src/models/user.py",
+    "src/api/__init__.py",
+    "src/api/routes.py",
+    "src/shared/summarizer.py",
+    "src/v2.py",
+    "src/a.py",
+    "tests/helpers_test.py",
+]
+
+
+def test_edit_distance_is_bounded() -> None:
+    assert edit_distance("util", "utils", 1) == 1
+    assert edit_distance("helpers", "halpers", 2) == 1
+    assert edit_distance("abc", "xyz", 1) == 2
+    assert edit_distance("a", "abcdef", 2) == 3
+
+
+def test_resolve_exact_and_normalized() -> None:
+    resolver = PathResolver(PATHS)
+
+    assert normalize_path("`./src/utils/helpers.py`") == "src/utils/helpers.py"
+    assert [str(match) for match in resolver.resolve("./src/utils/helpers.py")] == ["src/utils/helpers.py (100%)"]
+    assert resolver.best("/README.md") == "README.md"
+
+
+def test_resolve_typos_and_missing_directories() -> None:
+    resolver = PathResolver(PATHS)
+
+    assert resolver.best("src/util/helpers.py") == "src/utils/helpers.py"
+    assert resolver.best("src/modles/user.py") == "src/models/user.py"
+    assert resolver.best("utils/helpers.py") == "src/utils/helpers.py"
+    assert resolver.best("shared/summarizr.py") == "src/shared/summarizer.py"
+
+
+def test_resolve_never_picks_a_sibling() -> None:
+    resolver = PathResolver(PATHS)
+
+    for path in ("src/v1.py", "src/b.py", "src/api/router.py", "src/models/usr.py", "models/users.py"):
+        assert resolver.best(path) is None
+        assert resolver.resolve(path) == []
+
+
+def test_resolve_rejects_ambiguous_and_unknown_paths() -> None:
+    resolver = PathResolver(PATHS)
+
+    matches = resolver.resolve("__init__.py")
+    assert [match.path for match in matches] == ["src/api/__init__.py", "src/utils/__init__.py"]
+    assert matches[0].confidence == matches[1].confidence < 0.5
+    assert resolver.best("__init__.py") is None
+    assert resolver.best("utils/__init__.py") == "src/utils/__init__.py"
+    assert resolver.best("src/services/payment.py") is None
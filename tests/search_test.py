@@ -0,0 +1,37 @@
+import asyncio
+from pathlib import Path
+
+from shared.codebase.search import SearchIndex, tokenize
+from shared.codebase.tree import CodebaseTree
+
+
+def test_tokenize_splits_identifiers() -> None:
+    assert list(tokenize("WSMessage parse_web_socket v2")) == [
+        *("wsmessag", "ws", "messag"),
+        *("parse_web_socket", "pars", "web", "socket"),
+        *("v2", "v", "2"),
+    ]
+    assert {*tokenize("validate validates validated validating")} == {"validat"}
+
+
+def test_index_syncs_incrementally(summaries: list[str]) -> None:
+    Path("pkg").mkdir()
+    Path("pkg/ws.py").write_text("class WSMessage:\n    def validate(self) -> None: ...\n")
+    Path("pkg/http.py").write_text("def send_message(request): ...\n")
+    Path("main.py").write_text("from pkg.ws import WSMessage\nprint('hello')\n")
+    index = SearchIndex(".context/search.sqlite")
+
+    tree = asyncio.run(CodebaseTree.load())
+    assert index.sync(tree) == 3
+    assert index.sync(tree) == 0
+    ranked = [path for path, _ in index.search("where is `WSMessage` validated?")]
+    assert ranked == ["pkg/ws.py", "main.py", "pkg/http.py"]
+    assert index.search("socket") == []
+
+    Path("pkg/http.py").write_text("def validate_request(request): ...\n")
+    Path("main.py").unlink()
+    tree = asyncio.run(CodebaseTree.load())
+    assert index.sync(tree) == 1
+    assert [path for path, _ in index.search("validate request", k=1)] == ["pkg/http.py"]
+    assert "main.py" not in dict(index.search("WSMessage hello"))
+    index.close()
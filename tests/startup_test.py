@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from os import getenv
+from pathlib import Path
+
+SRC = Path(__file__).parents[1] / "src"
+
+# generous enough for slow CI machines, the eager imports took over 1s
+HELP_BUDGET_US = int(getenv("CODR_HELP_IMPORT_BUDGET_MS", "400")) * 1000
+HEAVY_MODULES = ["codr", "funcchain", "langchain_core", "InquirerPy", "shared"]
+
+
+def import_times(*args: str) -> dict[str, tuple[int, int]]:
+    """
+    Nesting depth and cumulative import time in microseconds of every module imported by `codr <args>`,
+    parsed from -X importtime.
+    """
+    code = f"import sys; sys.argv = ['codr', *{list(args)!r}]; from cli.main import main; main()"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines()[1:]:
+        if line.startswith("import time:"):
+            _, cumulative, name = line.removeprefix("import time:").split("|")
+            times[name.strip()] = ((len(name) - len(name.lstrip())) // 2, int(cumulative))
+    return times
+
+
+def test_help_imports_stay_light() -> None:
+    times = import_times("--help")
+
+    assert "cli.main" in times
+    assert [module for module in times if module.split(".")[0] in HEAVY_MODULES] == []
+    # site is the interpreter startup itself and not part of the budget
+    total = sum(cumulative for module, (depth, cumulative) in times.items() if depth == 0 and module != "site")
+    assert total < HELP_BUDGET_US
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import yaml  # type: ignore
+
+from shared.codebase.store import TreeStore
+from shared.codebase.tree import CodebaseFile, CodebaseTree
+
+
+def make_tree() -> CodebaseTree:
+    return CodebaseTree(
+        ".",
+        sha256="root",
+        nodes=[
+            CodebaseFile("main.py", sha256="main", summary="entrypoint"),
+            CodebaseTree("pkg", sha256="pkg", nodes=[CodebaseFile("pkg/util.py", sha256="util", summary="helpers")]),
+        ],
+    )
+
+
+def flatten(tree: CodebaseTree) -> list[CodebaseFile | CodebaseTree]:
+    nodes: list[CodebaseFile | CodebaseTree] = [tree]
+    for node in tree.nodes:
+        nodes.extend(flatten(node) if isinstance(node, CodebaseTree) else [node])
+    return nodes
+
+
+def test_roundtrip_and_subtree_delete(tmp_path: Path) -> None:
+    store = TreeStore(tmp_path / "tree.sqlite")
+    tree = make_tree()
+    store.write(upserts=flatten(tree))
+
+    assert CodebaseTree.from_dict(store.load() or {}) == tree
+
+    store.write(upserts=[CodebaseTree(".", sha256="root2")], deletes=["pkg"])
+
+    assert store.load() == {"name": ".", "sha256": "root2", "nodes": [tree.nodes[0].model_dump(exclude_none=True)]}
+
+
+def test_import_legacy_yaml(tmp_path: Path) -> None:
+    tree = make_tree()
+    tree.to_yaml(tmp_path / "tree.yaml")
+    store = TreeStore(tmp_path / "tree.sqlite")
+
+    assert store.is_empty()
+    assert store.import_yaml(tmp_path / "tree.yaml")
+    assert store.load() == yaml.safe_load((tmp_path / "tree.yaml").read_text())
@@ -0,0 +1,20 @@
+from shared.schemas.stream import StreamedItems
+
+PLAN = """Sure! {"changes": [
+  {"relative_path": "./main.py", "method": "modify", "description": "use \\"{[\\" as separator"},
+  {"relative_path": "./api", "method": "mkdir", "description": "", "tags": [{"a": 1}]}
+], "note": [{"ignored": true}]}"""
+
+
+def test_items_are_returned_once_complete() -> None:
+    items = StreamedItems()
+    streamed = [(i, item) for i, char in enumerate(PLAN) for item in items.feed(char)]
+    assert [item["relative_path"] for _, item in streamed] == ["./main.py", "./api"]
+    assert streamed[0][1]["description"] == 'use "{[" as separator'
+    assert streamed[1][1]["tags"] == [{"a": 1}]
+    # each change is available at its closing brace, long before the document ends
+    assert [i for i, _ in streamed] == [PLAN.index("},\n"), PLAN.index("]}\n") + 1]
+
+    items = StreamedItems()
+    assert items.feed(PLAN[:40]) == []
+    assert len(items.feed(PLAN[40:])) == 2
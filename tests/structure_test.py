@@ -0,0 +1,66 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from shared.codebase import structure
+from shared.codebase.structure import POOL_MIN_BYTES, fast_purpose, parse_structure, python_structure
+from shared.codebase.tree import CodebaseTree
+
+SOURCE = '''
+"""Websocket message handling."""
+
+
+class WSMessage(BaseModel, frozen=True):
+    """A message sent over the websocket.
+
+    More details.
+    """
+
+    def __init__(self, data: bytes) -> None: ...
+
+    def validate(self) -> bool:
+        """Check the payload."""
+
+    def _helper(self): ...
+
+
+async def send(message: WSMessage, retries: int = 3) -> None: ...
+'''
+
+
+def test_python_structure() -> None:
+    assert python_structure(SOURCE) == (
+        "Websocket message handling.",
+        [
+            "class WSMessage(BaseModel, frozen=True): A message sent over the websocket.",
+            "def WSMessage.__init__(self, data: bytes) -> None",
+            "def WSMessage.validate(self) -> bool: Check the payload.",
+            "async def send(message: WSMessage, retries: int=3) -> None",
+        ],
+    )
+    assert python_structure("def broken(:") is None
+    definitions = python_structure(SOURCE.replace('"""Websocket message handling."""', ""))
+    assert definitions and fast_purpose(SOURCE, definitions[1]) == "Defines WSMessage, send."
+
+
+def test_large_files_are_parsed_in_a_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    padding = "\n".join(f"def f{i}(): ..." for i in range(POOL_MIN_BYTES // 10))
+    parsed = asyncio.run(parse_structure(SOURCE + padding, ".py"))
+    assert parsed and parsed[1][-1] == f"def f{POOL_MIN_BYTES // 10 - 1}()"
+    assert asyncio.run(parse_structure(SOURCE, ".js")) is None
+    # large files without a parser never reach the pool
+    monkeypatch.setattr(structure, "_get_pool", None)
+    assert asyncio.run(parse_structure(SOURCE + padding, ".js")) is None
+
+
+def test_fast_mode_never_calls_the_llm(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("FAST_SUMMARIES", "true")
+    Path("ws.py").write_text(SOURCE)
+    Path("README.md").write_text("\n# codr\n\nMore text.")
+    tree = asyncio.run(CodebaseTree.load())
+
+    assert summaries == []
+    readme, ws = tree.nodes
+    assert readme.summary == "purpose='# codr' definitions=[]"  # type: ignore
+    assert ws.summary.startswith("purpose='Websocket message handling.' definitions=['class WSMessage(")  # type: ignore
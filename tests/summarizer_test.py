@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from shared.codebase.summarizer import SummaryScheduler
+
+
+def test_concurrency_cap_and_priority() -> None:
+    scheduler = SummaryScheduler(concurrency=2, interactive=False)
+    running, peak, started = 0, 0, []
+
+    async def summarize(name: str) -> str:
+        nonlocal running, peak
+        started.append(name)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return name
+
+    async def main() -> list[str]:
+        sizes = [50, 40, 30, 20, 10, 0]
+        return await asyncio.gather(*[scheduler.run(summarize, f"file_{size}", priority=(1, size)) for size in sizes])
+
+    assert asyncio.run(main()) == ["file_50", "file_40", "file_30", "file_20", "file_10", "file_0"]
+    assert peak == 2
+    assert started == ["file_50", "file_40", "file_0", "file_10", "file_20", "file_30"]
+
+
+def test_retry_with_backoff() -> None:
+    scheduler = SummaryScheduler(retries=2, backoff=0.001, interactive=False)
+    attempts = 0
+
+    async def flaky() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise TimeoutError("request timed out")
+        return "ok"
+
+    assert asyncio.run(scheduler.run(flaky)) == "ok"
+    assert attempts == 3
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def test_only_transient_errors_are_retried() -> None:
+    scheduler = SummaryScheduler(retries=2, backoff=0.001, interactive=False)
+    attempts = 0
+
+    async def failing(error: Exception) -> str:
+        nonlocal attempts
+        attempts += 1
+        raise error
+
+    with pytest.raises(StatusError):
+        asyncio.run(scheduler.run(failing, StatusError(429)))
+    assert attempts == 3
+
+    for error in (StatusError(401), ValueError("invalid summary")):
+        attempts = 0
+        with pytest.raises(type(error)):
+            asyncio.run(scheduler.run(failing, error))
+        assert attempts == 1
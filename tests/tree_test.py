@@ -0,0 +1,262 @@
+import asyncio
+import subprocess
+from pathlib import Path
+from typing import Iterable
+
+import pytest
+
+from shared.codebase import tree
+from shared.codebase.local.tree import LocalCodebaseTree
+from shared.codebase.store import TreeStore
+from shared.codebase.tree import CodebaseFile, CodebaseTree
+
+
+def test_refresh_skips_unchanged_stat(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    Path("main.py").write_text("print('hello')")
+    file = asyncio.run(CodebaseFile.from_path(Path("main.py")))
+    assert file.size == len("print('hello')") and file.mtime_ns and file.inode
+
+    reads: list[Path] = []
+    read_text = Path.read_text
+
+    def counting_read_text(self: Path) -> str:
+        reads.append(self)
+        return read_text(self)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+
+    assert asyncio.run(file.refresh()) is file
+    assert reads == []
+
+    assert asyncio.run(file.refresh(paranoid=True)) is file
+    assert len(reads) == 1 and len(summaries) == 1
+
+
+def test_refresh_resummarizes_changed_content(summaries: list[str]) -> None:
+    Path("main.py").write_text("print('hello')")
+    file = asyncio.run(CodebaseFile.from_path(Path("main.py")))
+
+    Path("main.py").write_text("print('hello world')")
+    refreshed = asyncio.run(file.refresh())
+
+    assert refreshed is not file
+    assert refreshed.size == len("print('hello world')")
+    assert summaries == ["print('hello')", "print('hello world')"]
+
+
+def test_identical_content_is_summarized_once(summaries: list[str]) -> None:
+    Path("a.py").write_text("x = 1")
+    Path("b.py").write_text("x = 1")
+
+    async def main() -> tuple[CodebaseFile, CodebaseFile]:
+        return await asyncio.gather(CodebaseFile.from_path(Path("a.py")), CodebaseFile.from_path(Path("b.py")))
+
+    a, b = asyncio.run(main())
+    Path("a.py").rename("c.py")
+    c = asyncio.run(CodebaseFile.from_path(Path("c.py")))
+
+    assert a.summary == b.summary == c.summary
+    assert summaries == ["x = 1"]
+
+
+def test_load_writes_only_changed_rows(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    Path("pkg").mkdir()
+    Path("pkg/b.py").write_text("b = 1")
+    Path("a.py").write_text("a = 1")
+    asyncio.run(CodebaseTree.load())
+
+    writes: list[tuple[list[str], list[str]]] = []
+    write = TreeStore.write
+
+    def recording_write(self: TreeStore, upserts: Iterable = (), deletes: Iterable[str] = ()) -> None:
+        writes.append(([node.name for node in upserts], list(deletes)))
+        write(self, upserts, deletes)
+
+    monkeypatch.setattr(TreeStore, "write", recording_write)
+
+    assert asyncio.run(CodebaseTree.load()).files
+    assert writes == []
+
+    Path("pkg/b.py").write_text("b = 2")
+    Path("a.py").unlink()
+    tree = asyncio.run(CodebaseTree.load())
+
+    assert [file.name for file in tree.files] == ["pkg/b.py"]
+    assert sorted(name for upserts, _ in writes for name in upserts) == [".", "pkg", "pkg/b.py"]
+    assert [path for _, deletes in writes for path in deletes] == ["a.py"]
+    assert TreeStore.open().load() == tree.model_dump(exclude_none=True)
+
+
+def test_refresh_reconciles_by_path(summaries: list[str]) -> None:
+    for name in ["a.py", "b.py", "c.py"]:
+        Path(name).write_text(name)
+    tree = asyncio.run(CodebaseTree.load())
+
+    Path("b.py").unlink()
+    Path("b.py").mkdir()
+    Path("b.py/inner.py").write_text("inner")
+    Path("a.py").unlink()
+    Path("d.py").write_text("d.py")
+    tree = asyncio.run(CodebaseTree.load())
+
+    assert [node.name for node in tree.nodes] == ["b.py", "c.py", "d.py"]
+    assert isinstance(tree.nodes[0], CodebaseTree)
+    assert [file.name for file in tree.files] == ["b.py/inner.py", "c.py", "d.py"]
+    assert CodebaseTree.from_dict(TreeStore.open().load() or {}) == tree
+
+
+def test_refresh_only_visits_git_changed_subtrees(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ["src/feature_x/a.py", "src/feature_y/b.py", "docs/c.py"]:
+        Path(name).parent.mkdir(parents=True, exist_ok=True)
+        Path(name).write_text(name)
+    Path(".gitignore").write_text(".context\n")
+    git = "git -c user.name=codr -c user.email=codr@example.com"
+    subprocess.run(f"git init -q && git add . && {git} commit -q -m init", shell=True, check=True)
+    asyncio.run(CodebaseTree.load())
+
+    visited: list[str] = []
+    scan_dir = tree.scan_dir
+
+    def recording_scan_dir(path: Path) -> list[tuple[Path, bool]]:
+        visited.append(path.as_posix())
+        return scan_dir(path)
+
+    monkeypatch.setattr(tree, "scan_dir", recording_scan_dir)
+
+    asyncio.run(CodebaseTree.load())
+    assert visited == []
+
+    Path("src/feature_x/a.py").write_text("changed")
+    asyncio.run(CodebaseTree.load())
+
+    assert visited == [".", "src", "src/feature_x"]
+    assert "changed" in summaries
+
+    visited.clear()
+    subprocess.run(f"git add . && {git} commit -q -m change", shell=True, check=True)
+    loaded = asyncio.run(CodebaseTree.load())
+
+    assert visited == [".", "src", "src/feature_x"]
+    assert CodebaseTree.from_dict(TreeStore.open().load() or {}) == loaded
+
+
+def test_refresh_always_visits_git_excluded_paths(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ["src/a.py", "scratch/notes/b.py", "docs/c.py"]:
+        Path(name).parent.mkdir(parents=True, exist_ok=True)
+        Path(name).write_text(name)
+    Path(".gitignore").write_text(".context\n")
+    git = "git -c user.name=codr -c user.email=codr@example.com"
+    # excluded for git only, codr still lists it
+    subprocess.run("git init -q && echo scratch/ > .git/info/exclude", shell=True, check=True)
+    subprocess.run(f"git add . && {git} commit -q -m init", shell=True, check=True)
+    asyncio.run(CodebaseTree.load())
+
+    visited: list[str] = []
+    scan_dir = tree.scan_dir
+
+    def recording_scan_dir(path: Path) -> list[tuple[Path, bool]]:
+        visited.append(path.as_posix())
+        return scan_dir(path)
+
+    monkeypatch.setattr(tree, "scan_dir", recording_scan_dir)
+
+    Path("scratch/notes/b.py").write_text("changed")
+    loaded = asyncio.run(CodebaseTree.load())
+
+    assert visited == [".", "scratch", "scratch/notes"]
+    assert "changed" in summaries
+    assert "scratch/notes/b.py" in [file.name for file in loaded.files]
+
+
+def test_git_index_refresh_reads_only_dirty_files(summaries: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ["src/a.py", "src/b.py", "c.py", "debug.log"]:
+        Path(name).parent.mkdir(parents=True, exist_ok=True)
+        Path(name).write_text(name)
+    Path(".gitignore").write_text(".context\n*.log\n")
+    git = "git -c user.name=codr -c user.email=codr@example.com"
+    subprocess.run(f"git init -q && git add . && {git} commit -q -m init", shell=True, check=True)
+    first = asyncio.run(LocalCodebaseTree.load())
+    assert [file.name for file in first.files] == [".gitignore", "c.py", "src/a.py", "src/b.py"]
+    assert all(file.blob for file in first.files)
+
+    reads: list[str] = []
+    read_text = Path.read_text
+
+    def counting_read_text(self: Path) -> str:
+        reads.append(self.as_posix())
+        return read_text(self)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+
+    asyncio.run(LocalCodebaseTree.load())
+    assert reads == []
+
+    Path("src/a.py").write_text("changed")
+    Path("src/new.py").write_text("new")
+    Path("c.py").unlink()
+    loaded = asyncio.run(LocalCodebaseTree.load())
+
+    assert set(reads) == {"src/a.py", "src/new.py"}
+    assert [file.name for file in loaded.files] == [".gitignore", "src/a.py", "src/b.py", "src/new.py"]
+    assert [file.blob is None for file in loaded.files] == [False, True, False, True]
+    assert LocalCodebaseTree.from_dict(TreeStore.open().load() or {}) == loaded
+
+
+def test_file_index_follows_refresh(summaries: list[str]) -> None:
+    for name in ["a.py", "pkg/main.py", "pkg/util/main.py", "pkg/z.py"]:
+        Path(name).parent.mkdir(parents=True, exist_ok=True)
+        Path(name).write_text(name)
+    loaded = asyncio.run(CodebaseTree.load())
+    index = loaded.file_index
+    pkg = loaded.nodes[1]
+    assert isinstance(pkg, CodebaseTree)
+
+    assert index.find("main.py") == ["pkg/main.py", "pkg/util/main.py"]
+    assert (index.count(), index.count("pkg"), index.count("pkg/util")) == (4, 3, 1)
+    assert [file.name for file in pkg.files] == ["pkg/main.py", "pkg/util/main.py", "pkg/z.py"]
+    assert repr(loaded) == "CodebaseTree(path=., files=4, nodes=2)"
+
+    Path("pkg/util/main.py").unlink()
+    Path("pkg/util/extra.py").write_text("extra")
+    Path("pkg/z.py").write_text("changed")
+    asyncio.run(loaded.refresh())
+
+    assert loaded.file_index is index
+    assert index.find("main.py") == ["pkg/main.py"]
+    assert index.get("pkg/z.py") is pkg.nodes[2]
+    assert [file.name for file in loaded.files] == ["a.py", "pkg/main.py", "pkg/util/extra.py", "pkg/z.py"]
+    fresh = CodebaseTree.from_dict(loaded.model_dump()).file_index
+    assert (index.nodes.keys(), index.basenames, index.counts) == (fresh.nodes.keys(), fresh.basenames, fresh.counts)
+
+
+def test_render_reuses_unchanged_subtrees(summaries: list[str]) -> None:
+    for name in ["a.py", "pkg/main.py", "lib/util.py"]:
+        Path(name).parent.mkdir(parents=True, exist_ok=True)
+        Path(name).write_text(name)
+    loaded = asyncio.run(CodebaseTree.load())
+    pkg, lib = loaded.nodes[2], loaded.nodes[1]
+    assert isinstance(pkg, CodebaseTree) and isinstance(lib, CodebaseTree)
+
+    shown = loaded.show()
+    assert shown == "".join(loaded.stream())
+    assert loaded.show() is shown
+    summary = "purpose='pkg/main.py' definitions=[]"
+    assert f"  <folder pkg>\n    <file main.py>: [green]{summary}[/green] </endfile main.py>\n" in shown
+
+    lib_text = lib.render(2)
+    Path("pkg/main.py").rename("pkg/app.py")
+    asyncio.run(loaded.refresh())
+    updated = loaded.show()
+
+    assert "<file app.py>" in updated and "<file main.py>" not in updated
+    assert lib.render(2) is lib_text
+    assert updated == CodebaseTree.from_dict(loaded.model_dump()).show()
+
+
+def test_encode_is_compact() -> None:
+    summary = "entry\npoint"
+    pkg = CodebaseTree("pkg", sha256="pkg", nodes=[CodebaseFile("pkg/main.py", sha256="main", summary=summary)])
+    tree = CodebaseTree(".", sha256="root", nodes=[pkg, CodebaseFile("README.md", sha256="readme", summary="docs")])
+
+    assert tree.encode() == "./\n pkg/\n  main.py: entry point\n README.md: docs\n"
+    assert tree.encode() is tree.encode()
@@ -0,0 +1,58 @@
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+from shared.codebase.tree import CodebaseFile, CodebaseTree
+from shared.codebase.vectors import HashingEmbedder, VectorIndex
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self) -> None:
+        super().__init__(dimensions=64)
+        self.texts: list[str] = []
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        self.texts += texts
+        return await super().embed(texts)
+
+
+def make_tree(files: dict[str, str]) -> CodebaseTree:
+    return CodebaseTree(
+        ".", sha256="", nodes=[CodebaseFile(name, sha256=name, summary=summary) for name, summary in files.items()]
+    )
+
+
+def test_hashing_embedder_is_deterministic() -> None:
+    embedder = HashingEmbedder()
+    a, b = asyncio.run(embedder.embed(["parseWebSocketMessage", "parse_web_socket_message"]))
+
+    assert a.dtype == np.float32 and abs(float(np.linalg.norm(a)) - 1) < 1e-6
+    assert np.array_equal(a, asyncio.run(HashingEmbedder().embed_query("parseWebSocketMessage")))
+    assert float(a @ b) > 0.5
+
+
+def test_index_syncs_incrementally(tmp_path: Path) -> None:
+    files = {
+        "src/cache.py": "sqlite cache for file summaries",
+        "src/cli.py": "typer command line entrypoint",
+        "src/git.py": "git status and blob listing",
+    }
+    embedder = CountingEmbedder()
+    index = VectorIndex(tmp_path / "vectors.npy", embedder)
+
+    assert asyncio.run(index.sync(make_tree(files))) == 3
+    assert asyncio.run(index.sync(make_tree(files))) == 0
+    assert [path for path, _ in asyncio.run(index.search("where are summaries cached", k=1))] == ["src/cache.py"]
+
+    files["src/cli.py"] = "typer command line entrypoint with a daemon command"
+    del files["src/git.py"]
+    assert asyncio.run(index.sync(make_tree(files))) == 1
+    assert embedder.texts[-1] == "src/cli.py\ntyper command line entrypoint with a daemon command"
+
+    reopened = VectorIndex(tmp_path / "vectors.npy", CountingEmbedder())
+    assert isinstance(reopened.matrix, np.memmap) and reopened.matrix.dtype == np.float32
+    assert reopened.paths == ["src/cache.py", "src/cli.py"]
+    assert asyncio.run(reopened.search("daemon", k=5))[0][0] == "src/cli.py"
+    # another embedder never reads vectors it did not write
+    assert VectorIndex(tmp_path / "vectors.npy", HashingEmbedder(dimensions=32)).paths == []
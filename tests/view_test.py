@@ -0,0 +1,43 @@
+from shared.codebase.tree import CodebaseFile, CodebaseTree
+from shared.codebase.view import count_tokens
+
+
+def make_tree() -> CodebaseTree:
+    def folder(name: str, summaries: dict[str, str]) -> CodebaseTree:
+        files = [CodebaseFile(f"{name}/{file}", sha256=file, summary=summary) for file, summary in summaries.items()]
+        return CodebaseTree(name, sha256=name, nodes=files)
+
+    return CodebaseTree(
+        ".",
+        sha256="root",
+        nodes=[
+            folder("docs", {f"page_{i}.md": f"documentation page number {i}" for i in range(20)}),
+            folder("src", {"cache.py": "sqlite cache for file summaries", "cli.py": "typer command line entrypoint"}),
+            folder("tests", {f"test_{i}.py": f"unit tests for module {i}" for i in range(20)}),
+        ],
+    )
+
+
+def test_view_fits_budget() -> None:
+    tree = make_tree()
+    assert tree.view(10_000) == tree.view(10_000, focus=[]) and "documentation page number 19" in tree.view(10_000)
+    for budget in (0, 5, 20, 50, 100, 200, 400):
+        assert count_tokens(tree.view(budget)) <= budget
+    assert tree.view(5) == "./ (42 files)\n" and tree.view(3) == ""
+
+
+def test_view_keeps_focus_detailed() -> None:
+    tree = make_tree()
+    view = tree.view(30, focus=["src/cli.py"])
+    lines = [
+        "./",
+        " docs/ (20 files)",
+        " src/",
+        "  cache.py",
+        "  cli.py: typer command line entrypoint",
+        " tests/ (20 files)",
+    ]
+    assert view == "\n".join(lines) + "\n"
+
+    by_query = tree.view(30, focus=["where are summaries cached?"])
+    assert "  cache.py: sqlite cache for file summaries\n  cli.py\n" in by_query
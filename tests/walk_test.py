@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from shared.codebase import walk as walk_module
+from shared.codebase.walk import scan_dir, walk
+
+
+def test_walk_never_enters_ignored_dirs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    for name in ["src/app.js", "node_modules/left-pad/index.js", "web/dist/bundle.js", "web/main.js"]:
+        Path(name).parent.mkdir(parents=True, exist_ok=True)
+        Path(name).write_text(name)
+    Path("web/.gitignore").write_text("dist/\n")
+
+    scanned: list[str] = []
+    scandir = os.scandir
+
+    def recording_scandir(path: Path) -> "os._ScandirIterator[str]":
+        scanned.append(Path(path).as_posix())
+        return scandir(path)
+
+    monkeypatch.setattr(walk_module.os, "scandir", recording_scandir)
+
+    files = [(directory / entry.name).as_posix() for directory, entries in walk() for entry in entries]
+
+    assert sorted(scanned) == [".", "src", "web"]
+    assert files == ["src", "web", "src/app.js", "web/.gitignore", "web/main.js"]
+
+
+def test_scan_dir_reads_only_existing_gitignore_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    Path("pkg").mkdir()
+    Path("pkg/.gitignore").write_text("*.log\n")
+    Path("pkg/debug.log").write_text("log")
+    Path("pkg/main.py").write_text("main")
+
+    opened: list[str] = []
+    real_open = open
+
+    def recording_open(file: str | Path, *args: Any) -> Any:
+        opened.append(Path(file).as_posix())
+        return real_open(file, *args)
+
+    monkeypatch.setattr("builtins.open", recording_open)
+
+    assert scan_dir(Path(".")) == [(Path("pkg"), True)]
+    assert scan_dir(Path("pkg")) == [(Path("pkg/.gitignore"), False), (Path("pkg/main.py"), False)]
+    assert opened == ["pkg/.gitignore"]